@@ -1,11 +1,24 @@
 import streamlit as st
 
+from core import perf
+from core.data import start_warmup
+
 st.set_page_config(
     page_title="음식 영양 정보",
     page_icon="🍔",
     layout="wide",
 )
 
+# 데이터 준비를 백그라운드에서 시작 (페이지는 준비될 때까지 안내 문구만 표시)
+warmup = start_warmup()
+# 헬스 체크: ?health=1 이면 준비 상태만 JSON 으로 (같은 내용이 .cache/health.json 에도 기록됨)
+if st.query_params.get('health') == '1':
+    st.json(warmup.health())
+    st.stop()
+
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('app')
+
 st.title("🍔 음식 영양 정보 대시보드")
 st.markdown("---")
 st.header("환영합니다!")
@@ -22,3 +35,5 @@ st.markdown(
     - **결제_페이지** : drawable_canvas를 활용한 가상의결제페이지입니다 
     """
 )
+
+perf.finish(perf_run)
@@ -0,0 +1,321 @@
+# 페이지별 AppTest 벤치마크: 실제 사용 흐름을 헤드리스로 재생해 cold start, rerun 지연 백분위, 최대 RSS 를 잰다.
+# food.csv 를 10배/100배로 늘린 합성 데이터에서도 측정하고, 저장된 baseline 보다 느려지면 종료 코드 1.
+#   python benchmarks/bench_app.py                      # 1×/10×/100× 측정 후 baseline 과 비교
+#   python benchmarks/bench_app.py --scales 1,10        # 일부 배율만
+#   python benchmarks/bench_app.py --update-baseline    # 현재 결과를 baseline 으로 저장
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from core.store import CACHE_DIR, CSV_ENCODING, DATA_PATH, NUTRIENT_COLS, FoodStore
+
+BASELINE_PATH = ROOT / 'benchmarks' / 'baseline_app.json'
+SYNTHETIC_DIR = CACHE_DIR / 'bench'
+DEFAULT_SCALES = [1, 10, 100]
+# 회귀 판정: baseline 대비 비율 + 잡음을 흡수할 절대 여유
+TOLERANCE = 0.3
+SLACK_MS = 5.0
+CART_SIZE = 200
+
+PAGES = {
+    'app': 'app.py',
+    '1_카테고리_별_음식_탐색': 'pages/1_카테고리_별_음식_탐색.py',
+    '2_칼로리_Top10': 'pages/2_칼로리_Top10.py',
+    '3_카테고리별_평균_칼로리': 'pages/3_카테고리별_평균_칼로리.py',
+    '4_칼로리_계산기': 'pages/4_칼로리_계산기.py',
+    '5_음식_vs_음식_비교': 'pages/5_음식_vs_음식_비교.py',
+}
+
+
+# --- 합성 데이터 ---
+def synthetic_csv(scale):
+    # food.csv 를 scale 번 이어 붙이고, 복사본마다 영양성분을 조금씩 흔들어 같은 값만 반복되지 않게 함
+    if scale == 1:
+        return DATA_PATH
+    path = SYNTHETIC_DIR / f'food_x{scale}.csv'
+    if path.exists():
+        return path
+    df = pd.read_csv(DATA_PATH, encoding=CSV_ENCODING)
+    df.columns = df.columns.str.strip()
+    rng = np.random.default_rng(scale)
+    cols = [col for col in NUTRIENT_COLS if col in df.columns]
+    base = df[cols].apply(pd.to_numeric, errors='coerce')
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        if k:
+            copy[cols] = (base * rng.lognormal(0, 0.05, size=base.shape)).round(2)
+            if '식품코드' in copy.columns:
+                copy['식품코드'] = copy['식품코드'].astype(str) + f'-{k}'
+        copies.append(copy)
+    SYNTHETIC_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    pd.concat(copies, ignore_index=True).to_csv(tmp, index=False, encoding=CSV_ENCODING, errors='replace')
+    tmp.rename(path)
+    return path
+
+
+# --- 페이지별 사용 시나리오 (각 rerun 의 지연을 기록) ---
+def share_script_cache():
+    # AppTest 는 실행마다 새 ScriptCache 를 만들어 페이지를 매번 다시 컴파일(+ magic AST 변환) 한다. 실제 서버는
+    # 스크립트를 한 번만 컴파일하므로, 하나를 공유해서 rerun 지연에 페이지 소스 길이에 비례하는 비용이 섞이지 않게 함
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: cache
+
+
+class Session:
+    def __init__(self, page):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(str(ROOT / PAGES[page]), default_timeout=300)
+        self.timings = []
+
+    def run(self, action=None):
+        started = time.perf_counter()
+        (action or self.at).run()
+        elapsed = (time.perf_counter() - started) * 1000
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+        self.timings.append(elapsed)
+        return elapsed
+
+
+def cold_start(page='1_카테고리_별_음식_탐색'):
+    # 새 프로세스에서 처음 연 페이지가 데이터를 그릴 때까지의 시간 (ms) 과 백그라운드 준비 시간 (ms).
+    # 준비 중에는 안내 문구만 그리고 끝나면 페이지가 다시 실행되므로, 그 기다림과 다시 실행까지 모두 포함한다.
+    # 나머지 인덱스는 끝날 때까지 기다렸다 돌려줘서 이후 페이지별 rerun 측정에 섞이지 않게 함
+    from core.data import start_warmup
+
+    session = Session(page)
+    started = time.perf_counter()
+    session.run()
+    warmup = start_warmup()
+    warmup.wait()
+    session.run()
+    elapsed = (time.perf_counter() - started) * 1000
+    warmup.wait_warm()
+    return elapsed, warmup.health()['elapsed_s'] * 1000
+
+
+def scenario_app(s):
+    for _ in range(5):
+        s.run()
+
+
+def scenario_explore(s):
+    # 대분류마다 중분류/소분류 앞쪽 몇 개를 차례로 고름
+    s.run()
+    for i in range(len(s.at.selectbox[0].options)):
+        s.run(s.at.selectbox[0].select_index(i))
+        for j in range(min(2, len(s.at.selectbox[1].options))):
+            s.run(s.at.selectbox[1].select_index(j))
+            for k in range(min(2, len(s.at.selectbox[2].options))):
+                s.run(s.at.selectbox[2].select_index(k))
+
+
+def scenario_top10(s):
+    s.run()
+    for i in range(len(s.at.selectbox[0].options)):
+        s.run(s.at.selectbox[0].select_index(i))
+
+
+def scenario_average(s):
+    for _ in range(5):
+        s.run()
+
+
+def scenario_calculator(s):
+    s.run()
+    at = s.at
+    for i in range(1, len(at.selectbox(key='dae_filter_widget').options), 3):
+        s.run(at.selectbox(key='dae_filter_widget').select_index(i))
+        if len(at.selectbox(key='joong_filter_widget').options) > 1:
+            s.run(at.selectbox(key='joong_filter_widget').select_index(1))
+        s.run(at.selectbox(key='joong_filter_widget').select_index(0))
+    s.run(at.selectbox(key='dae_filter_widget').select_index(0))
+    for query in ['김치', 'ㄱㅊ', '아메리카노', '']:
+        s.run(at.text_input(key='food_search_widget').input(query))
+
+    # 페이지 크기 100 으로 두 페이지를 통째로 담아 200개 장바구니를 만듦
+    s.run(at.selectbox(key='food_table_size').set_value(100))
+    label_ids = _label_ids()
+    page = 1
+    while len(at.session_state['cart']) < CART_SIZE:
+        s.run(at.number_input(key='food_table_page').set_value(page))
+        multiselect = at.multiselect(key='food_multiselect_widget')
+        need = CART_SIZE - len(at.session_state['cart'])
+        s.run(multiselect.set_value([label_ids[label] for label in multiselect.options[:need]]))
+        s.run(at.button(key='add_to_cart_button').click())
+        page += 1
+    for food_id in list(at.session_state['cart'])[:10]:
+        s.run(at.number_input(key=f'num_{food_id}').set_value(250))
+
+
+def _label_ids():
+    # AppTest 의 multiselect 옵션은 format_func 를 거친 라벨이므로 식품 ID 로 되돌릴 표가 필요.
+    # 같은 프로세스의 cache_resource 에 올라간 저장소를 그대로 씀
+    from core.data import load_store
+
+    return {label: i for i, label in enumerate(load_store().food_labels)}
+
+
+def scenario_compare(s):
+    s.run()
+    at = s.at
+    for side in ('1', '2'):
+        dae = at.selectbox(key=f'dae{side}')
+        for i in range(1, len(dae.options), 4):
+            s.run(at.selectbox(key=f'dae{side}').select_index(i))
+            if len(at.selectbox(key=f'joong{side}').options) > 1:
+                s.run(at.selectbox(key=f'joong{side}').select_index(1))
+            if len(at.selectbox(key=f'so{side}').options) > 1:
+                s.run(at.selectbox(key=f'so{side}').select_index(1))
+        s.run(at.selectbox(key=f'dae{side}').select_index(0))
+    for query1, query2 in [('김치', '된장'), ('라면', '우동'), ('사과', '바나나')]:
+        s.run(at.text_input(key='search1').input(query1))
+        s.run(at.text_input(key='search2').input(query2))
+        if at.selectbox(key='food1_select').options:
+            s.run(at.selectbox(key='food1_select').select_index(0))
+        if at.selectbox(key='food2_select').options:
+            s.run(at.selectbox(key='food2_select').select_index(0))
+
+
+SCENARIOS = {
+    'app': scenario_app,
+    '1_카테고리_별_음식_탐색': scenario_explore,
+    '2_칼로리_Top10': scenario_top10,
+    '3_카테고리별_평균_칼로리': scenario_average,
+    '4_칼로리_계산기': scenario_calculator,
+    '5_음식_vs_음식_비교': scenario_compare,
+}
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+def peak_rss_mb():
+    # Linux 는 KB, macOS 는 바이트 단위
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+
+def worker(out_path):
+    # 새 프로세스에서 실행: cache_resource 와 백그라운드 준비가 비어 있는 상태에서 cold start 부터 잰다
+    share_script_cache()
+    cold_ms, warmup_ms = cold_start()
+    results = {'pages': {}, 'cold_start_ms': round(cold_ms, 3), 'warmup_ms': round(warmup_ms, 3)}
+    for page, scenario in SCENARIOS.items():
+        session = Session(page)
+        scenario(session)
+        first, reruns = session.timings[0], session.timings[1:]
+        results['pages'][page] = {
+            'first_ms': round(first, 3),
+            'interactions': len(reruns),
+            'p50_ms': percentile(reruns, 50),
+            'p95_ms': percentile(reruns, 95),
+            'max_ms': percentile(reruns, 100),
+        }
+    results['peak_rss_mb'] = peak_rss_mb()
+    Path(out_path).write_text(json.dumps(results, ensure_ascii=False), encoding='utf-8')
+
+
+# --- 실행 / baseline 비교 ---
+def measure(scale):
+    csv_path = synthetic_csv(scale)
+    # .npy 캐시는 미리 만들어 두고 (서버 재시작 상황), 파싱 비용은 따로 기록
+    started = time.perf_counter()
+    store = FoodStore.open(csv_path)
+    open_ms = (time.perf_counter() - started) * 1000
+    n_rows = store.n_rows
+    del store
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        out_path = f.name
+    try:
+        env = {**os.environ, 'FOOD_CSV': str(csv_path), 'PYTHONPATH': str(ROOT)}
+        env.pop('FOOD_PERF', None)
+        subprocess.run([sys.executable, __file__, '--worker', out_path], env=env, cwd=ROOT, check=True,
+                       stderr=subprocess.DEVNULL)
+        results = json.loads(Path(out_path).read_text(encoding='utf-8'))
+    finally:
+        os.unlink(out_path)
+    results.update(rows=n_rows, store_open_ms=round(open_ms, 3))
+    return results
+
+
+def regressions(scale, current, baseline):
+    found = []
+
+    def check(name, now, before, slack):
+        if now is not None and before is not None and now > before * (1 + TOLERANCE) + slack:
+            found.append(f'{scale}× {name}: {before:,.1f} → {now:,.1f}')
+
+    check('cold start (ms)', current['cold_start_ms'], baseline.get('cold_start_ms'), SLACK_MS)
+    check('warm-up (ms)', current['warmup_ms'], baseline.get('warmup_ms'), SLACK_MS)
+    check('peak RSS (MB)', current['peak_rss_mb'], baseline.get('peak_rss_mb'), 0)
+    for page, stats in current['pages'].items():
+        before = baseline.get('pages', {}).get(page, {})
+        for metric in ('p50_ms', 'p95_ms'):
+            check(f'{page} {metric}', stats[metric], before.get(metric), SLACK_MS)
+    return found
+
+
+def report(scale, results):
+    print(f'\n[{scale}×] {results["rows"]:,}행 · 저장소 열기 {results["store_open_ms"]:,.0f} ms · '
+          f'백그라운드 준비 {results["warmup_ms"]:,.0f} ms · cold start {results["cold_start_ms"]:,.0f} ms · '
+          f'최대 RSS {results["peak_rss_mb"]:,.0f} MB')
+    print(f'  {"페이지":<24}{"첫 실행":>10}{"상호작용":>10}{"p50":>10}{"p95":>10}{"최대":>10}')
+    for page, stats in results['pages'].items():
+        print(f'  {page:<24}{stats["first_ms"]:>10.1f}{stats["interactions"]:>10}'
+              f'{stats["p50_ms"]:>10.1f}{stats["p95_ms"]:>10.1f}{stats["max_ms"]:>10.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)))
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--worker', metavar='OUT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker)
+        return 0
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding='utf-8')) if BASELINE_PATH.exists() else {}
+    current, found = {}, []
+    for scale in [int(s) for s in args.scales.split(',')]:
+        current[str(scale)] = results = measure(scale)
+        report(scale, results)
+        if str(scale) in baseline:
+            found += regressions(scale, results, baseline[str(scale)])
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps({**baseline, **current}, ensure_ascii=False, indent=2) + '\n',
+                                 encoding='utf-8')
+        print(f'\nbaseline 저장: {BASELINE_PATH}')
+        return 0
+    if found:
+        print('\n성능 회귀:')
+        for line in found:
+            print(f'  {line}')
+        return 1
+    print('\nbaseline 대비 회귀 없음' if baseline else '\nbaseline 없음 (--update-baseline 으로 저장)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
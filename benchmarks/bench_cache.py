@@ -0,0 +1,61 @@
+# 세션 간 결과 캐시: 여러 사용자가 인기 있는 화면(대분류 Top10, 카테고리 목록) 을 Zipf 분포로 여는 상황에서
+# 매번 계산 vs ResultCache, 그리고 바이트 예산을 줄였을 때의 적중률/제거 수
+#   python benchmarks/bench_cache.py
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from core.cache import MAX_RESULT_BYTES, ResultCache
+from core.query import canonical
+from core.store import FoodStore
+
+REQUESTS = 2000
+BUDGETS = [MAX_RESULT_BYTES, 64 * 2**10, 16 * 2**10]
+
+
+def views(store):
+    # (페이지, 쿼리, 계산 함수) 목록. 앞쪽일수록 인기 있는 화면
+    tree = store.category_tree
+    found = []
+    for dae in tree.options(()):
+        found.append(('2_칼로리_Top10', canonical({'dae': dae}), lambda dae=dae: store.take(
+            store.aggregates.top((dae,), '에너지(kcal)'), ['식품명', '식품기원명', '에너지(kcal)'])))
+        for joong in tree.options((dae,)):
+            path = (dae, joong, tree.options((dae, joong))[0])
+            found.append(('1_카테고리_별_음식_탐색', canonical(dict(zip(['dae', 'joong', 'so'], path))),
+                          lambda path=path: store.ranges.query({'에너지(kcal)': (100.0, None)}, rows=tree.rows(path))))
+    return found
+
+
+def main():
+    store = FoodStore.open().warm()
+    found = views(store)
+    rng = np.random.default_rng(0)
+    picks = np.minimum(rng.zipf(1.3, REQUESTS) - 1, len(found) - 1)
+    print(f'화면 {len(found)}개, 요청 {REQUESTS}회 (Zipf 1.3)')
+
+    start = time.perf_counter()
+    for i in picks:
+        found[i][2]()
+    build_ms = (time.perf_counter() - start) * 1000 / REQUESTS
+    print(f'매번 계산: 요청당 {build_ms:.3f} ms')
+
+    for budget in BUDGETS:
+        cache = ResultCache('bench_cache', max_bytes=budget)
+        start = time.perf_counter()
+        for i in picks:
+            page, query, build = found[i]
+            cache.get((page, query, store.version), build)
+        cached_ms = (time.perf_counter() - start) * 1000 / REQUESTS
+        stats = cache.stats()
+        print(f'캐시 예산 {budget / 1024:>8,.0f} KB: 요청당 {cached_ms:.3f} ms, 적중률 {stats["hit_rate"]:.0%}, '
+              f'{stats["entries"]}개 {stats["bytes"] / 1024:,.0f} KB, 제거 {stats["evictions"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# 계산기 장바구니: 항목마다 pandas Series 를 만드는 기존 방식 vs 행 번호 + 그램 벡터 행렬 곱
+# 세션 메모리: {음식명: {'grams', 'nutrients': Series}} vs {행 번호: 그램} dict vs Cart (int32 + float32 배열)
+#   python benchmarks/bench_cart.py
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from core.cart import Cart, cart_arrays, cart_nutrients
+from core.store import NUTRIENT_COLS, FoodStore
+
+CART_SIZES = [10, 50, 200, 500]
+REPEAT = 20
+
+
+def legacy_cart(food_df, rows):
+    # 변경 전: {음식명: {'grams': g, 'nutrients': Series}}
+    return {f'{food_df["식품명"].iloc[r]}#{r}': {'grams': 150, 'nutrients': food_df.iloc[r][NUTRIENT_COLS]} for r in rows}
+
+
+def legacy_rerun(cart):
+    total_nutrients = pd.Series(0.0, index=NUTRIENT_COLS)
+    for details in cart.values():
+        item_nutrients = (details['nutrients'] / 100) * details['grams']
+        total_nutrients += item_nutrients
+    return total_nutrients
+
+
+def deep_size(value, seen=None):
+    # 세션이 붙들고 있는 객체 그래프 전체의 크기 (공유 객체는 한 번만)
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, Cart):
+        return value.nbytes()
+    if isinstance(value, pd.Series):
+        return value.memory_usage(deep=True, index=True) + sys.getsizeof(value)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    return size
+
+
+def best_of(func, *args):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    store = FoodStore.open()
+    food_df = store.frame(fill_na=True)
+    matrix = store.nutrient_matrix
+    rng = np.random.default_rng(0)
+
+    print(f'{"항목 수":>8}{"기존(ms)":>12}{"행렬 곱(ms)":>14}{"기존 세션(KB)":>16}{"dict(KB)":>12}{"Cart(KB)":>12}{"바이트열(B)":>14}')
+    for size in CART_SIZES:
+        rows = rng.choice(store.n_rows, size=size, replace=False)
+        old_cart = legacy_cart(food_df, rows)
+        new_cart = {int(r): 150 for r in rows}
+        assert np.allclose(legacy_rerun(old_cart).to_numpy(),
+                           cart_nutrients(matrix, *cart_arrays(new_cart))[1], rtol=1e-4)
+        old_ms = best_of(legacy_rerun, old_cart)
+        new_ms = best_of(lambda cart: cart_nutrients(matrix, *cart_arrays(cart)), new_cart)
+        compact = Cart(list(new_cart), list(new_cart.values()), limit=size)
+        token = compact.to_token(store.food_keys)
+        assert Cart.from_token(token, store.key_index, limit=size).to_bytes(store.food_keys) == compact.to_bytes(store.food_keys)
+        old_kb = deep_size(old_cart) / 1024
+        dict_kb = deep_size(new_cart) / 1024
+        cart_kb = compact.nbytes() / 1024
+        print(f'{size:>8}{old_ms:>12.2f}{new_ms:>14.3f}{old_kb:>16.1f}{dict_kb:>12.1f}{cart_kb:>12.1f}{len(compact.to_bytes(store.food_keys)):>14}')
+
+    # 장바구니에 50개 추가: 이름으로 표 전체를 훑던 방식 vs 식품 키 해시 인덱스
+    rows = rng.choice(store.n_rows, size=50, replace=False)
+    names = food_df['식품명'].iloc[rows].tolist()
+    keys = [store.food_keys[r] for r in rows]
+    key_index = store.key_index
+    scan_ms = best_of(lambda: [food_df[food_df['식품명'] == name].iloc[0] for name in names])
+    index_ms = best_of(lambda: [key_index[key] for key in keys])
+    print(f'음식 50개 조회: 이름 스캔 {scan_ms:.2f} ms → 해시 인덱스 {index_ms:.4f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# 카테고리 캐스케이드: 매 rerun 마다 boolean mask 로 전체 행을 훑는 기존 방식 vs 카테고리 트리
+#   python benchmarks/bench_category.py
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from core.category import LEVELS
+from core.store import FoodStore
+
+N_INTERACTIONS = 300
+
+
+def random_paths(tree, n, seed=0):
+    # 계산기 페이지처럼 '전체'(None) 가 섞인 4단계 선택 경로를 만든다
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(n):
+        path = ()
+        for _ in LEVELS:
+            options = tree.options(path)
+            path += (rng.choice([None] + options) if options else None,)
+        paths.append(path)
+    return paths
+
+
+def legacy_cascade(food_df, path):
+    # 변경 전 4_칼로리_계산기.py 의 filtered_df1 ... final_filtered_df 체인
+    df = food_df
+    options = []
+    for col, value in zip(LEVELS, path):
+        options.append(df[col].unique().tolist())
+        df = df[df[col] == value] if value is not None else df
+    return options, df
+
+
+def tree_cascade(food_df, tree, path):
+    options = [tree.options(path[:depth]) for depth in range(len(LEVELS))]
+    return options, food_df.iloc[tree.rows(path)]
+
+
+def summarize(name, timings):
+    ms = np.array(timings) * 1000
+    print(f'{name:<20}평균 {ms.mean():7.3f} ms   p50 {np.percentile(ms, 50):7.3f} ms   p95 {np.percentile(ms, 95):7.3f} ms')
+
+
+def main():
+    store = FoodStore.open()
+    food_df = store.frame(fill_na=True)
+    start = time.perf_counter()
+    tree = store.category_tree
+    print(f'트리 생성: {(time.perf_counter() - start) * 1000:.1f} ms, 행 {store.n_rows:,}개')
+
+    paths = random_paths(tree, N_INTERACTIONS)
+    legacy, indexed = [], []
+    for path in paths:
+        start = time.perf_counter()
+        legacy_cascade(food_df, path)
+        legacy.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        tree_cascade(food_df, tree, path)
+        indexed.append(time.perf_counter() - start)
+
+    print(f'위젯 변경 1회당 캐스케이드 지연 ({N_INTERACTIONS}회)')
+    summarize('기존 mask 스캔', legacy)
+    summarize('카테고리 트리', indexed)
+
+
+if __name__ == '__main__':
+    main()
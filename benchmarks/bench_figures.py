@@ -0,0 +1,50 @@
+# 그래프 캐시: Top10 그래프를 매번 px.bar 로 만들던 방식 vs (페이지, 선택, 데이터 버전) 캐시
+#   python benchmarks/bench_figures.py
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import plotly.express as px
+import plotly.io as pio
+
+from core.figures import FigureCache
+from core.store import FoodStore
+
+ROUNDS = 3
+
+
+def top10_figure(store, dae):
+    df = store.take(store.aggregates.top((dae,), '에너지(kcal)'), ['식품명', '식품기원명', '에너지(kcal)'])
+    return px.bar(df.sort_values('에너지(kcal)'), x='에너지(kcal)', y='식품명', orientation='h')
+
+
+def main():
+    store = FoodStore.open()
+    options = store.category_tree.options(())
+    cache = FigureCache()
+
+    # st.plotly_chart 가 하는 직렬화까지 포함해서 잰다
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for dae in options:
+            pio.to_json(top10_figure(store, dae), validate=False)
+    build_ms = (time.perf_counter() - start) * 1000 / (ROUNDS * len(options))
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for dae in options:
+            fig = cache.get(('2_칼로리_Top10', dae, store.version), lambda: top10_figure(store, dae))
+            pio.to_json(fig, validate=False)
+    cached_ms = (time.perf_counter() - start) * 1000 / (ROUNDS * len(options))
+
+    stats = cache.stats()
+    print(f'대분류 {len(options)}개 × {ROUNDS}회 순환')
+    print(f'그래프 1개당: 매번 생성 {build_ms:.1f} ms → 캐시 {cached_ms:.1f} ms (첫 순환의 생성 포함)')
+    print(f'캐시: {stats["entries"]}개 {stats["bytes"] / 1024:.0f} KB, 적중률 {stats["hit_rate"]:.0%}')
+
+
+if __name__ == '__main__':
+    main()
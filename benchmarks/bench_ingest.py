@@ -0,0 +1,83 @@
+# CSV 적재: pd.read_csv + 컬럼별 to_numeric (기존 방식) vs parse_csv (한 프로세스) vs ingest (청크 + 프로세스 풀)
+# food.csv 를 1×/10×/50× 로 늘린 파일에서 초당 행 수와 결과 메모리를 잰다. 50× 는 EUC-KR/UTF-8 세 파일로 나눠 여러 파일 병합까지 확인.
+#   python benchmarks/bench_ingest.py
+#   python benchmarks/bench_ingest.py --scales 1,10 --workers 4
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from bench_app import SYNTHETIC_DIR, synthetic_csv
+from core.store import CSV_ENCODING, INGEST_WORKERS, NUTRIENT_COLS, ingest, parse_csv
+
+DEFAULT_SCALES = [1, 10, 50]
+SPLIT_FILES = 3
+
+
+def legacy_load(path):
+    # 변경 전 페이지들의 적재 방식
+    df = pd.read_csv(path, encoding=CSV_ENCODING)
+    df.columns = df.columns.str.strip()
+    for col in NUTRIENT_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def split_sources(path, scale):
+    # 합성 파일을 SPLIT_FILES 개로 나누고 홀수 번째는 UTF-8 로 저장 (국가 DB 의 여러 내보내기 파일 흉내)
+    paths = [SYNTHETIC_DIR / f'food_x{scale}_part{i}.csv' for i in range(SPLIT_FILES)]
+    if all(part.exists() for part in paths):
+        return paths
+    df = pd.read_csv(path, encoding=CSV_ENCODING, dtype=str)
+    for i, (part, rows) in enumerate(zip(paths, np.array_split(np.arange(len(df)), SPLIT_FILES))):
+        encoding = 'utf-8' if i % 2 else CSV_ENCODING
+        df.iloc[rows].to_csv(part, index=False, encoding=encoding, errors='replace')
+    return paths
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def compact_nbytes(parsed):
+    nutrients, codes, categories = parsed
+    text = sum(len(value.encode('utf-8')) for values in categories.values() for value in values)
+    return nutrients.nbytes + sum(values.nbytes for values in codes.values()) + text
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)))
+    parser.add_argument('--workers', type=int, default=INGEST_WORKERS)
+    args = parser.parse_args()
+
+    print(f'프로세스 {args.workers}개')
+    print(f'{"배율":>6}{"행 수":>12}{"기존(행/초)":>14}{"parse_csv":>14}{"ingest":>14}{"여러 파일":>14}'
+          f'{"기존 메모리(MB)":>18}{"압축(MB)":>12}')
+    for scale in [int(s) for s in args.scales.split(',')]:
+        path = synthetic_csv(scale)
+        legacy, legacy_s = timed(legacy_load, path)
+        single, single_s = timed(parse_csv, path)
+        parallel, parallel_s = timed(ingest, [path], workers=args.workers)
+        # 같은 파일이면 조각으로 나눠 읽어도 결과가 같아야 함
+        assert np.array_equal(single[0], parallel[0], equal_nan=True) and single[2] == parallel[2]
+        parts = split_sources(path, scale) if scale > 1 else [path]
+        merged, merged_s = timed(ingest, parts, workers=args.workers)
+        assert len(merged[0]) == len(single[0])
+        n = len(single[0])
+        print(f'{scale:>5}×{n:>12,}{n / legacy_s:>14,.0f}{n / single_s:>14,.0f}{n / parallel_s:>14,.0f}'
+              f'{n / merged_s:>14,.0f}{legacy.memory_usage(deep=True).sum() / 2**20:>18.1f}'
+              f'{compact_nbytes(parallel) / 2**20:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
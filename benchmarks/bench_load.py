@@ -0,0 +1,542 @@
+# 동시 접속 부하 테스트: 실제 streamlit 서버(app.py + pages/) 를 띄우고 가상 브라우저 세션 N 개가 웹소켓으로
+# 프런트엔드와 같은 BackMsg(rerun_script + 위젯 상태 전체) 를 보내고 ForwardMsg 를 받으며 사용 시나리오
+# (카테고리 선택, 장바구니 담기, 음식 비교) 를 반복한다. 세션 수 단계마다 처리량(rerun/초), rerun 지연 백분위,
+# 서버 CPU/메모리(세션당 USS) 를 재고, 세션을 늘려도 처리량이 더 늘지 않거나 p95 가 예산을 넘는 첫 단계를 포화점으로 본다.
+# 결과는 JSON 으로 저장하므로 --compare 로 이전 실행(최적화 전후, 배포 전후) 과 비교할 수 있다.
+#   python benchmarks/bench_load.py                                     # 1,2,4,8,16 세션 × 15초
+#   python benchmarks/bench_load.py --sessions 1,8,32 --duration 30 --scale 10
+#   python benchmarks/bench_load.py --url ws://127.0.0.1:8501 --pid 1234  # 이미 떠 있는 서버
+#   python benchmarks/bench_load.py --compare .cache/loadtest/load-20260101-120000.json
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import streamlit
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+
+from bench_app import synthetic_csv
+from core.store import CACHE_DIR
+
+OUTPUT_DIR = CACHE_DIR / 'loadtest'
+DEFAULT_SESSIONS = [1, 2, 4, 8, 16]
+DEFAULT_DURATION = 15.0
+# 동작 사이 생각 시간 (초, 0.5~1.5 배로 흔듦). 0 이면 쉬지 않고 보내는 닫힌 부하
+DEFAULT_THINK = 0.3
+# 포화 판정: p95 가 예산을 넘거나, 세션을 늘렸는데 처리량 증가가 이 비율보다 작으면
+P95_BUDGET_MS = 1000.0
+SATURATION_GAIN = 0.1
+STARTUP_TIMEOUT = 180.0
+RERUN_TIMEOUT = 60.0
+PERCENTILES = [50, 90, 95, 99]
+# 메모리 안정 판정: 방금 끝난 rerun 이 잠깐 쓴 메모리가 빠질 때까지 SETTLE_INTERVAL 초마다 재서, 연속
+# SETTLE_SAMPLES 번의 차이가 SETTLE_TOLERANCE 이내가 되면 (최대 SETTLE_TIMEOUT 초) 그 값을 쓴다
+SETTLE_INTERVAL = 0.5
+SETTLE_SAMPLES = 4
+SETTLE_TOLERANCE = 0.01
+SETTLE_TIMEOUT = 30.0
+# 유휴 기준값을 재기 전에 세션 하나로 시나리오를 돌리는 횟수. 첫 바퀴에서 잠깐 쓰인 메모리는 다음 바퀴에서야
+# 빠지므로 (한 번만 돌리면 기준값이 ~10MB 높아 세션당 값이 음수) 여러 번 돌림
+PRIME_ROUNDS = 3
+
+# 시나리오 → 고를 확률
+SCENARIO_WEIGHTS = {'explore': 0.4, 'cart': 0.3, 'compare': 0.3}
+SEARCH_QUERIES = ['김치', '라면', 'ㄱㅊㅉㄱ', '우유', '닭가슴살', '아메리카노', '떡볶이', '샐러드']
+# rerun 이 끝났다고 보는 script_finished 상태 (중간에 끊긴 실행은 기다림)
+FINISHED = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+            ForwardMsg.FINISHED_WITH_COMPILE_ERROR}
+WIDGETS = {'selectbox', 'multiselect', 'radio', 'text_input', 'number_input', 'button', 'checkbox'}
+
+
+class Deadline(Exception):
+    pass
+
+
+# --- 가상 브라우저 세션 ---
+class Session:
+    # 브라우저 탭 하나. 위젯 상태와 URL 쿼리를 들고 있다가 rerun 마다 모두 보낸다 (프런트엔드와 같은 방식)
+
+    def __init__(self, url, rng=None, think=0.0, deadline=None):
+        self.url = url
+        self.rng = rng or random.Random(0)
+        self.think = think
+        self.deadline = deadline
+        self.ws = None
+        # 페이지 이름 → page_script_hash (new_session / navigation 메시지에서)
+        self.pages = {}
+        self.page_hash = ''
+        self.query_string = ''
+        # 위젯 ID → 보낼 WidgetState
+        self.states = {}
+        # 이번 실행에서 그려진 위젯: key(없으면 라벨) → (종류, proto)
+        self.widgets = {}
+        self.elements = []
+        # (동작, 초, 끝난 시각)
+        self.samples = []
+        self.exceptions = {}
+        self.received_bytes = 0
+
+    async def connect(self):
+        self.ws = await websockets.connect(f'{self.url}/_stcore/stream', subprotocols=['streamlit'],
+                                           max_size=None, open_timeout=RERUN_TIMEOUT)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, action, trigger=None):
+        # rerun 하나를 보내고 script_finished 까지 받는다. 걸린 시간(초) 을 samples 에 기록
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise Deadline
+        msg = BackMsg()
+        client = msg.rerun_script
+        client.query_string = self.query_string
+        client.page_script_hash = self.page_hash
+        client.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            state = client.widget_states.widgets.add()
+            state.id = trigger
+            state.trigger_value = True
+        self.widgets, self.elements = {}, []
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            data = await asyncio.wait_for(self.ws.recv(), RERUN_TIMEOUT)
+            self.received_bytes += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof('type')
+            if kind in ('new_session', 'navigation'):
+                for page in getattr(forward, kind).app_pages:
+                    self.pages[page.page_name] = page.page_script_hash
+            elif kind == 'page_info_changed':
+                # 서버가 st.query_params 를 바꾸면 브라우저 주소처럼 다음 rerun 부터 같이 보냄
+                self.query_string = forward.page_info_changed.query_string
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                self._element(forward.delta.new_element)
+            elif kind == 'script_finished' and forward.script_finished in FINISHED:
+                break
+        seconds = time.perf_counter() - started
+        self.samples.append((action, seconds, time.perf_counter()))
+        if self.think:
+            await asyncio.sleep(self.think * self.rng.uniform(0.5, 1.5))
+        return seconds
+
+    def _element(self, element):
+        kind = element.WhichOneof('type')
+        proto = getattr(element, kind)
+        self.elements.append((kind, proto))
+        if kind == 'exception':
+            # 페이지에서 난 예외 (유형: 메시지 → 횟수)
+            message = f'{proto.type}: {proto.message}'[:200]
+            self.exceptions[message] = self.exceptions.get(message, 0) + 1
+        if kind not in WIDGETS:
+            return
+        # 위젯 ID 는 '$$ID-<해시>-<key>'
+        key = proto.id.split('-', 2)[2]
+        self.widgets[key if key != 'None' else proto.label] = (kind, proto)
+        # 서버가 세션 상태로 값을 바꿨으면 (예: 담은 뒤 선택 비우기) 브라우저처럼 그 값을 따름
+        if getattr(proto, 'set_value', False):
+            self.states.pop(proto.id, None)
+
+    # --- 사용자 동작 ---
+    async def open(self, page):
+        # 사이드바에서 페이지 이동. 다른 페이지의 위젯 상태는 보내지 않음
+        self.page_hash = self.pages.get(page, '')
+        self.states.clear()
+        return await self.rerun(f'{page} 열기')
+
+    def options(self, key):
+        return list(self.widgets[key][1].options) if key in self.widgets else []
+
+    def _state(self, key):
+        proto = self.widgets[key][1]
+        state = self.states.setdefault(proto.id, BackMsg().rerun_script.widget_states.widgets.add())
+        state.Clear()
+        state.id = proto.id
+        return state
+
+    async def choose(self, key, action):
+        # selectbox/radio 에서 무작위 옵션 선택 (값은 화면에 보이는 문자열)
+        options = self.options(key)
+        if not options:
+            return None
+        self._state(key).string_value = self.rng.choice(options)
+        return await self.rerun(action)
+
+    async def choose_many(self, key, n, action):
+        options = self.options(key)
+        if not options:
+            return None
+        self._state(key).string_array_value.data.extend(self.rng.sample(options, min(n, len(options))))
+        return await self.rerun(action)
+
+    async def type(self, key, text, action):
+        if key not in self.widgets:
+            return None
+        self._state(key).string_value = text
+        return await self.rerun(action)
+
+    async def number(self, key, value, action):
+        if key not in self.widgets:
+            return None
+        state = self._state(key)
+        if self.widgets[key][1].data_type == NumberInput.INT:
+            state.int_value = int(value)
+        else:
+            state.double_value = float(value)
+        return await self.rerun(action)
+
+    async def click(self, key, action):
+        if key not in self.widgets:
+            return None
+        return await self.rerun(action, trigger=self.widgets[key][1].id)
+
+
+# --- 시나리오 ---
+async def explore(session):
+    # 카테고리 탐색: 대분류 → 중분류 → 소분류를 차례로 고름
+    await session.open('카테고리 별 음식 탐색')
+    await session.choose('explore_dae', '탐색: 대분류')
+    await session.choose('explore_joong', '탐색: 중분류')
+    await session.choose('explore_so', '탐색: 소분류')
+
+
+async def cart(session):
+    # 장바구니: 검색 → 두 음식 선택 → 담기 → 그램 수정
+    await session.open('칼로리 계산기')
+    await session.type('food_search_widget', session.rng.choice(SEARCH_QUERIES), '계산기: 검색')
+    if await session.choose_many('food_multiselect_widget', 2, '계산기: 음식 선택') is not None:
+        await session.click('add_to_cart_button', '계산기: 담기')
+    grams = [key for key in session.widgets if key.startswith('num_')]
+    if grams:
+        await session.number(session.rng.choice(grams), session.rng.randrange(50, 400, 10), '계산기: 그램')
+
+
+async def compare(session):
+    # 음식 비교: 양쪽 검색 후 음식 선택
+    await session.open('음식 vs 음식 비교')
+    for side in ('1', '2'):
+        await session.type(f'search{side}', session.rng.choice(SEARCH_QUERIES), '비교: 검색')
+        await session.choose(f'food{side}_select', '비교: 음식 선택')
+
+
+SCENARIOS = {'explore': explore, 'cart': cart, 'compare': compare}
+
+
+async def drive(session):
+    # 마감까지 시나리오를 가중치대로 반복. 연결이 끊기거나 응답이 없으면 그 세션은 멈추고 오류로 셈
+    names, weights = list(SCENARIO_WEIGHTS), list(SCENARIO_WEIGHTS.values())
+    try:
+        while True:
+            await SCENARIOS[session.rng.choices(names, weights)[0]](session)
+    except Deadline:
+        return 0
+    except (asyncio.TimeoutError, websockets.ConnectionClosed, OSError):
+        return 1
+
+
+# --- 서버 ---
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def launch_server(scale, port, log_path):
+    env = {**os.environ, 'FOOD_CSV': str(synthetic_csv(scale)), 'PYTHONPATH': str(ROOT),
+           'FOOD_HEALTH_FILE': str(OUTPUT_DIR / 'health.json')}
+    env.pop('FOOD_PERF', None)
+    command = [sys.executable, '-m', 'streamlit', 'run', 'app.py', '--server.headless=true',
+               f'--server.port={port}', '--server.address=127.0.0.1', '--browser.gatherUsageStats=false',
+               '--server.fileWatcherType=none',
+               # 닫힌 세션의 상태를 바로 버림 (기본 120초 동안 남아 다음 단계와 유휴 기준값의 메모리에 섞임)
+               '--server.disconnectedSessionTTL=0']
+    with open(log_path, 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'서버가 종료되었습니다 (로그: {log_path})')
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'서버가 {STARTUP_TIMEOUT:.0f}초 안에 뜨지 않았습니다 (로그: {log_path})')
+
+
+async def wait_ready(url):
+    # app.py 의 ?health=1 로 데이터 준비(Warmup) 가 끝날 때까지 기다림. 준비 결과(health) 를 돌려줌.
+    # 첫 페이지용 인덱스만 만든 ready 에서 멈추면 나머지 인덱스를 만드는 동안의 메모리가 측정에 섞이므로 warm 까지 기다림
+    session = Session(url)
+    await session.connect()
+    session.query_string = 'health=1'
+    deadline = time.perf_counter() + STARTUP_TIMEOUT
+    try:
+        while time.perf_counter() < deadline:
+            await session.rerun('health')
+            health = next((json.loads(proto.body) for kind, proto in session.elements if kind == 'json'), {})
+            if health.get('status') == 'ready' and health.get('warm', True):
+                return health
+            if health.get('status') == 'error':
+                raise RuntimeError(f"데이터 준비 실패: {health.get('error')}")
+            await asyncio.sleep(0.5)
+    finally:
+        await session.close()
+    raise RuntimeError('데이터 준비가 끝나지 않았습니다.')
+
+
+def process_stats(pid):
+    # 서버 프로세스의 누적 CPU 초. /proc 가 없는 OS 이거나 pid 를 모르면 None
+    try:
+        fields = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_memory(pid):
+    # 서버 프로세스의 {'rss', 'pss', 'uss'} 바이트 (/proc/<pid>/smaps_rollup). USS 는 이 프로세스만 쓰는
+    # Private_Clean + Private_Dirty 로, 공유 라이브러리나 다른 프로세스와 나눈 페이지가 빠져 세션 증가분만 보기 좋다
+    try:
+        fields = {}
+        for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines()[1:]:
+            name, value = line.split(':', 1)
+            fields[name] = int(value.split()[0]) * 1024
+        return {'rss': fields['Rss'], 'pss': fields['Pss'],
+                'uss': fields['Private_Clean'] + fields['Private_Dirty']}
+    except (OSError, ValueError, IndexError, KeyError):
+        return None
+
+
+async def settled_memory(pid):
+    # USS 가 안정될 때까지 기다렸다가 process_memory() 값을 돌려줌 (측정할 수 없으면 None)
+    window = []
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while True:
+        memory = process_memory(pid)
+        if memory is None:
+            return None
+        window = (window + [memory['uss']])[-SETTLE_SAMPLES:]
+        settled = len(window) == SETTLE_SAMPLES and max(window) - min(window) <= max(window) * SETTLE_TOLERANCE
+        if settled or time.perf_counter() >= deadline:
+            return memory
+        await asyncio.sleep(SETTLE_INTERVAL)
+
+
+async def idle_memory(url, pid):
+    # 세션이 없는 서버의 메모리 기준값. 준비가 끝난 직후 값은 페이지가 처음 실행될 때 올라오는 모듈, 캐시까지
+    # 빠져 있으므로, 세션 하나로 시나리오를 PRIME_ROUNDS 번 돌리고 닫은 뒤 안정되면 잰다
+    session = Session(url)
+    await session.connect()
+    try:
+        for _ in range(PRIME_ROUNDS):
+            for scenario in SCENARIOS.values():
+                await scenario(session)
+    finally:
+        await session.close()
+    return await settled_memory(pid)
+
+
+# --- 측정 ---
+def percentiles(seconds):
+    if not len(seconds):
+        return None
+    values = np.percentile(np.asarray(seconds) * 1000, PERCENTILES)
+    return {**{f'p{q}': round(float(v), 2) for q, v in zip(PERCENTILES, values)},
+            'max': round(float(np.max(seconds) * 1000), 2)}
+
+
+async def run_level(url, n, duration, think, seed, pid, idle):
+    # idle: 세션이 없는 서버의 process_memory() 기준값. 세션당 메모리는 N 세션이 아직 열려 있는 동안 잰 값에서
+    # 늘어난 양을 N 으로 나눈 것 (할당기가 메모리를 돌려주면 음수일 수 있고 그대로 기록)
+    sessions = [Session(url, random.Random(seed * 1000 + i), think) for i in range(n)]
+    # 접속과 첫 화면(app.py) 은 측정에서 뺌
+    await asyncio.gather(*(session.connect() for session in sessions))
+    await asyncio.gather(*(session.rerun('app 열기') for session in sessions))
+    for session in sessions:
+        session.samples.clear()
+    client_before = resource.getrusage(resource.RUSAGE_SELF)
+    before = process_stats(pid)
+    started = time.perf_counter()
+    for session in sessions:
+        session.deadline = started + duration
+    errors = sum(await asyncio.gather(*(drive(session) for session in sessions)))
+    elapsed = time.perf_counter() - started
+    after = process_stats(pid)
+    client_after = resource.getrusage(resource.RUSAGE_SELF)
+    # 세션을 닫기 전에, 마지막 rerun 이 잠깐 쓴 메모리가 빠진 뒤 잰다
+    memory = await settled_memory(pid)
+    await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+
+    samples = [sample for session in sessions for sample in session.samples if sample[2] <= started + duration]
+    seconds = [s for _, s, _ in samples]
+    actions = {}
+    for action, s, _ in samples:
+        actions.setdefault(action, []).append(s)
+    level = {
+        'sessions': n,
+        'duration_s': round(elapsed, 2),
+        'reruns': len(samples),
+        'throughput_rps': round(len(samples) / elapsed, 2),
+        'latency_ms': percentiles(seconds),
+        'actions': {action: {'count': len(values), **percentiles(values)} for action, values in sorted(actions.items())},
+        'errors': errors,
+        'exceptions': sum(sum(session.exceptions.values()) for session in sessions),
+        'exception_messages': sorted({message for session in sessions for message in session.exceptions}),
+        'received_mb': round(sum(session.received_bytes for session in sessions) / 2**20, 2),
+        # 같은 기계에서 돌리면 클라이언트도 CPU 를 쓰므로 함께 기록
+        'client_cpu_s': round(client_after.ru_utime + client_after.ru_stime
+                              - client_before.ru_utime - client_before.ru_stime, 2),
+    }
+    if before is not None and after is not None:
+        level['server_cpu_pct'] = round((after - before) / elapsed * 100, 1)
+    if memory and idle:
+        level.update(
+            server_rss_mb=round(memory['rss'] / 2**20, 1),
+            server_uss_mb=round(memory['uss'] / 2**20, 1),
+            **{f'{name}_per_session_kb': round((memory[name] - idle[name]) / n / 1024, 1)
+               for name in ('rss', 'pss', 'uss')},
+        )
+    return level
+
+
+def saturation(levels, budget_ms):
+    # 처음으로 p95 가 예산을 넘거나, 세션을 늘렸는데 처리량이 최고치보다 SATURATION_GAIN 이상 늘지 않은 단계
+    best = None
+    for level in levels:
+        p95 = level['latency_ms']['p95'] if level['latency_ms'] else float('inf')
+        if p95 > budget_ms:
+            return {'sessions': level['sessions'], 'reason': f'p95 {p95:,.0f} ms > 예산 {budget_ms:,.0f} ms'}
+        if best is not None and level['throughput_rps'] < best['throughput_rps'] * (1 + SATURATION_GAIN):
+            return {'sessions': level['sessions'],
+                    'reason': f"처리량 {best['throughput_rps']:.1f} → {level['throughput_rps']:.1f} rerun/초 "
+                              f"(세션 {best['sessions']} → {level['sessions']})"}
+        if best is None or level['throughput_rps'] > best['throughput_rps']:
+            best = level
+    return None
+
+
+def print_level(level):
+    latency = level['latency_ms'] or {}
+    cpu = f"{level['server_cpu_pct']:>6.0f}%" if 'server_cpu_pct' in level else f"{'-':>7}"
+    memory = (f"{level['server_rss_mb']:>8.0f} {level['uss_per_session_kb']:>9.0f}"
+              if 'uss_per_session_kb' in level else f"{'-':>8} {'-':>9}")
+    server = f'{cpu} {memory}'
+    print(f"{level['sessions']:>5} {level['reruns']:>7} {level['throughput_rps']:>9.1f} "
+          f"{latency.get('p50', 0):>8.0f} {latency.get('p95', 0):>8.0f} {latency.get('p99', 0):>8.0f} "
+          f"{server} {level['errors'] + level['exceptions']:>5}")
+
+
+def print_comparison(current, previous):
+    before = {level['sessions']: level for level in previous['levels']}
+    print(f"\n이전 실행과 비교 ({previous.get('git', '?')} → {current.get('git', '?')})")
+    changed = [name for name in ('think_s', 'scale', 'duration_s')
+               if previous['config'].get(name) != current['config'].get(name)]
+    if changed:
+        # 조건이 다르면 차이가 코드 때문인지 알 수 없으므로 알려 둠
+        print(f"  주의: 측정 조건이 다릅니다 ({', '.join(changed)})")
+    for level in current['levels']:
+        old = before.get(level['sessions'])
+        if old is None or not old['latency_ms'] or not level['latency_ms']:
+            continue
+        print(f"  세션 {level['sessions']:>3}: 처리량 {old['throughput_rps']:.1f} → {level['throughput_rps']:.1f} rerun/초, "
+              f"p95 {old['latency_ms']['p95']:,.0f} → {level['latency_ms']['p95']:,.0f} ms")
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def measure(url, args, pid):
+    health = await wait_ready(url)
+    idle = await idle_memory(url, pid)
+    print(f"데이터: {health.get('rows', 0):,}행, 준비 {health.get('elapsed_s', 0):.1f}초")
+    print(f"{'세션':>5} {'rerun':>7} {'rerun/초':>8} {'p50(ms)':>8} {'p95':>8} {'p99':>8} "
+          f"{'서버CPU':>6} {'RSS(MB)':>8} {'세션당USS(KB)':>8} {'오류':>4}")
+    levels = []
+    for n in args.sessions:
+        level = await run_level(url, n, args.duration, args.think, args.seed, pid, idle)
+        print_level(level)
+        levels.append(level)
+    return health, idle, levels
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=lambda text: [int(n) for n in text.split(',')], default=DEFAULT_SESSIONS)
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='단계별 측정 시간 (초)')
+    parser.add_argument('--think', type=float, default=DEFAULT_THINK, help='동작 사이 생각 시간 (초)')
+    parser.add_argument('--scale', type=int, default=1, help='food.csv 배율 (서버를 직접 띄울 때)')
+    parser.add_argument('--budget', type=float, default=P95_BUDGET_MS, help='포화 판정 p95 예산 (ms)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='이미 떠 있는 서버 (예: ws://127.0.0.1:8501). 없으면 직접 띄움')
+    parser.add_argument('--pid', type=int, help='--url 서버의 프로세스 ID (CPU/RSS 측정용)')
+    parser.add_argument('--output', type=Path, help='결과 JSON (기본: .cache/loadtest/load-<시각>.json)')
+    parser.add_argument('--compare', type=Path, help='비교할 이전 결과 JSON')
+    args = parser.parse_args()
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    server = None
+    if args.url:
+        url, pid = args.url.rstrip('/'), args.pid
+    else:
+        port = free_port()
+        server = launch_server(args.scale, port, OUTPUT_DIR / 'server.log')
+        url, pid = f'ws://127.0.0.1:{port}', server.pid
+    try:
+        health, idle, levels = asyncio.run(measure(url, args, pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    result = {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git': git_revision(),
+        'host': {'cpus': os.cpu_count(), 'python': platform.python_version(), 'streamlit': streamlit.__version__},
+        'config': {'sessions': args.sessions, 'duration_s': args.duration, 'think_s': args.think,
+                   'scale': args.scale, 'p95_budget_ms': args.budget, 'seed': args.seed,
+                   'scenarios': SCENARIO_WEIGHTS, 'external_server': bool(args.url)},
+        'data': {'rows': health.get('rows'), 'version': health.get('version')},
+        'idle_rss_mb': round(idle['rss'] / 2**20, 1) if idle else None,
+        'idle_uss_mb': round(idle['uss'] / 2**20, 1) if idle else None,
+        'levels': levels,
+        'max_throughput_rps': max(level['throughput_rps'] for level in levels),
+        'saturation': saturation(levels, args.budget),
+    }
+    output = args.output or OUTPUT_DIR / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.write_text(json.dumps(result, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    found = result['saturation']
+    print(f"\n최대 처리량 {result['max_throughput_rps']:.1f} rerun/초, "
+          + (f"포화: 세션 {found['sessions']} ({found['reason']})" if found else '측정 범위에서 포화 없음'))
+    print(f'결과: {output}')
+    if args.compare:
+        print_comparison(result, json.loads(args.compare.read_text(encoding='utf-8')))
+
+
+if __name__ == '__main__':
+    main()
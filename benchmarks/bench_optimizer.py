@@ -0,0 +1,32 @@
+# 식단 자동 구성: 후보 음식 수에 따른 선형 계획 풀이 시간
+#   python benchmarks/bench_optimizer.py
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from core.optimizer import plan_meal
+from core.store import FoodStore
+
+TARGETS = {'에너지(kcal)': 2000, '탄수화물(g)': 324, '단백질(g)': 55, '지방(g)': 54, '당류(g)': 100, '나트륨(mg)': 2000}
+POOL_SIZES = [100, 1000, 5000, None]
+
+
+def main():
+    store = FoodStore.open()
+    rng = np.random.default_rng(0)
+    print(f'{"후보 수":>8}{"유효 후보":>10}{"시간(ms)":>10}{"음식 수":>8}  결과')
+    for size in POOL_SIZES:
+        rows = np.arange(store.n_rows) if size is None else rng.choice(store.n_rows, size=size, replace=False)
+        timings = []
+        for _ in range(5):
+            plan = plan_meal(store, rows, TARGETS)
+            timings.append(plan['seconds'] * 1000)
+        print(f'{len(rows):>8,}{plan["n_candidates"]:>10,}{min(timings):>10.1f}{len(plan["grams"]):>8}  {plan["status"]}')
+
+
+if __name__ == '__main__':
+    main()
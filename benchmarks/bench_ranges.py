@@ -0,0 +1,90 @@
+# 영양성분 범위 필터: NutrientRangeIndex.query vs 행 전체를 조건마다 비교하는 마스크
+# 무작위 조건(1~10개 컬럼, 좁은/넓은 구간, 한쪽 열린 구간, 카테고리 행과 함께) 으로 결과가 같은지 확인하고 지연 분포를 잰다.
+#   python benchmarks/bench_ranges.py
+#   python benchmarks/bench_ranges.py --scales 1,50 --trials 500
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from bench_app import SYNTHETIC_DIR, synthetic_csv
+from core.ranges import NutrientRangeIndex
+from core.store import FoodStore
+
+DEFAULT_SCALES = [1, 50]
+DEFAULT_TRIALS = 300
+
+
+def random_predicates(index, cols, rng, trial):
+    # 정렬된 값의 분위수로 구간을 잡아 빈 결과만 나오지 않게 함. 세 번에 한 번은 넓은 구간
+    picked = rng.choice(cols, size=rng.integers(1, 11), replace=False)
+    predicates = {}
+    for col in picked:
+        values = index._columns[col].sorted_values
+        if not len(values):
+            continue
+        q = np.sort(rng.uniform(0, 1, 2)) if trial % 3 else np.array([rng.uniform(0, .3), rng.uniform(.7, 1)])
+        low, high = values[int(q[0] * (len(values) - 1))], values[int(q[1] * (len(values) - 1))]
+        predicates[col] = (None if trial % 5 == 0 else float(low), None if trial % 7 == 0 else float(high))
+    return predicates
+
+
+def naive(store, predicates, rows):
+    mask = store.live.copy()
+    for col, (low, high) in predicates.items():
+        values = store.column(col)
+        if low is not None:
+            mask &= values >= np.float32(low)
+        if high is not None:
+            mask &= values <= np.float32(high)
+    found = np.flatnonzero(mask)
+    return found if rows is None else np.intersect1d(found, rows)
+
+
+def run(scale, trials):
+    store = FoodStore.open(synthetic_csv(scale), SYNTHETIC_DIR / 'cache')
+    start = time.perf_counter()
+    index = NutrientRangeIndex(store)
+    build_ms = (time.perf_counter() - start) * 1000
+    memory = sum(column.prefix.nbytes + column.order.nbytes + column.sorted_values.nbytes
+                 for column in index._columns.values()) / 2**20
+
+    rng = np.random.default_rng(0)
+    tree = store.category_tree
+    groups = tree.options(())
+    indexed, masked = [], []
+    for trial in range(trials):
+        predicates = random_predicates(index, store.nutrient_cols, rng, trial)
+        rows = tree.rows((groups[trial % len(groups)],)) if trial % 2 else None
+        start = time.perf_counter()
+        got = index.query(predicates, rows)
+        indexed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = naive(store, predicates, rows)
+        masked.append(time.perf_counter() - start)
+        assert np.array_equal(got, expected), (scale, predicates)
+
+    p50, p95 = (np.percentile(np.array(indexed) * 1000, q) for q in (50, 95))
+    n50, n95 = (np.percentile(np.array(masked) * 1000, q) for q in (50, 95))
+    print(f'{scale:>4}× {store.n_rows:>9,} {build_ms:>9.0f} {memory:>9.1f} '
+          f'{p50:>9.2f} {p95:>9.2f} {n50:>9.2f} {n95:>9.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)))
+    parser.add_argument('--trials', type=int, default=DEFAULT_TRIALS)
+    args = parser.parse_args()
+    print(f'{"배율":>5} {"행 수":>9} {"구축(ms)":>7} {"메모리(MB)":>6} '
+          f'{"인덱스 p50":>7} {"p95":>9} {"마스크 p50":>7} {"p95":>9}')
+    for scale in map(int, args.scales.split(',')):
+        run(scale, args.trials)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+# food.csv 증분 갱신: 바뀐 줄 수별 patch_store vs 새로 열기 + 인덱스 전체 재구성.
+# 갱신 전에 세션이 쓰던 기준별 보기를 만들어 두고, 갱신한 저장소(보기 포함) 가 수정한 파일을 새로 연 것과
+# 같은 결과를 내는지, 갱신 전에 만든 장바구니 코드가 삭제된 음식만 빼고 복원되는지도 확인해서 다르면 exit 1
+#   python benchmarks/bench_reload.py
+import shutil
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+
+from core.basis import BASES
+from core.cart import Cart
+from core.category import LEVELS
+from core.reload import index_rows, patch_store
+from core.store import CSV_ENCODING, DATA_PATH, FoodStore
+
+WORK_DIR = ROOT / '.cache' / 'bench' / 'reload'
+CHANGES = [10, 100, 1000]
+# 비교에 쓰는 검색어와 범위 조건
+SEARCH_CHECKS = ['김치', 'ㄱㅊㅉㄱ', '닭가슴살', '벤치마크 신메뉴']
+RANGE_CHECKS = [
+    {'에너지(kcal)': (None, 100.0)},
+    {'에너지(kcal)': (200.0, 400.0), '단백질(g)': (10.0, None)},
+    {'나트륨(mg)': (None, 50.0), '당류(g)': (None, 5.0)},
+]
+
+
+def edited(df, n, rng):
+    # n 행의 칼로리를 바꾸고, n/10 행을 지우고, n/10 행을 새로 추가
+    df = df.copy()
+    rows = rng.choice(len(df), n, replace=False)
+    df.loc[rows, '에너지(kcal)'] = (pd.to_numeric(df.loc[rows, '에너지(kcal)']) + 1).astype(str)
+    extra = df.iloc[rng.choice(len(df), max(1, n // 10), replace=False)].copy()
+    extra['식품명'] = [f'벤치마크 신메뉴 {i}' for i in range(len(extra))]
+    return pd.concat([df.drop(index=rows[:max(1, n // 10)]), extra])
+
+
+def warm_views(store):
+    # 세션이 쓰던 상태 흉내: 모든 기준 보기의 집계, 범위 인덱스, 표 정렬 순위를 만들어 둠
+    for basis in BASES:
+        view = store.basis_view(basis)
+        view.aggregates, view.ranges, view.nutrient_matrix
+        view.sort_rank('에너지(kcal)', descending=True)
+    return store
+
+
+def store_mismatches(patched, fresh):
+    # 살아 있는 행을 CSV 줄 해시로 짝지어 값, 카테고리 트리, 검색 점수, 기준별 환산 배율과 범위 필터 결과를 비교한다.
+    # (식품 키는 갱신 전 ID 를 유지하려고 같은 식별값 안의 순번이 새로 연 것과 다를 수 있어 쓰지 않음)
+    # 유사도 인덱스는 표준화 평균/분산을 처음 값으로 유지하므로 비교하지 않는다. 다른 곳의 설명 목록을 돌려줌
+    live = np.flatnonzero(patched.live)
+    rows_of = {}
+    for row, line in zip(live.tolist(), patched.row_hashes[live].tolist()):
+        rows_of.setdefault(line, []).append(row)
+    rows = []
+    for line in fresh.row_hashes.tolist():
+        if not rows_of.get(line):
+            return ['새로 연 저장소에만 있는 줄']
+        rows.append(rows_of[line].pop(0))
+    if len(rows) != len(live):
+        return ['갱신한 저장소에만 있는 줄']
+    # rows[i] = 새로 연 저장소의 i 번 행이 갱신한 저장소에서 가진 ID, to_fresh 는 그 역
+    rows = np.array(rows, dtype=np.int64)
+    to_fresh = np.full(patched.n_rows, -1, dtype=np.int64)
+    to_fresh[rows] = np.arange(fresh.n_rows)
+    found = []
+    if not np.array_equal(patched.nutrients[rows], fresh.nutrients, equal_nan=True):
+        found.append('영양성분 값')
+    for col in LEVELS + ['식품명', '영양성분함량기준량', '식품중량']:
+        if not patched.take(rows, [col])[col].equals(fresh.take(np.arange(fresh.n_rows), [col])[col]):
+            found.append(f'{col} 값')
+    for depth in range(len(LEVELS) + 1):
+        for path, node in fresh.category_tree.nodes(depth):
+            other = patched.category_tree.node(path)
+            if other is None or not np.array_equal(np.sort(to_fresh[other.rows]), node.rows):
+                found.append(f'카테고리 {path} 의 행')
+    for query in SEARCH_CHECKS:
+        a, b = patched.search.scores(query), fresh.search.scores(query)
+        if (a is None) != (b is None) or a is not None and not np.allclose(a[rows], b):
+            found.append(f'검색 {query!r} 점수')
+    for basis in BASES:
+        if not np.array_equal(patched.basis_factors[basis][rows], fresh.basis_factors[basis], equal_nan=True):
+            found.append(f'{basis} 환산 배율')
+        old, new = patched.basis_view(basis), fresh.basis_view(basis)
+        for predicates in RANGE_CHECKS:
+            if not np.array_equal(np.sort(to_fresh[old.ranges.query(predicates)]), new.ranges.query(predicates)):
+                found.append(f'{basis} 범위 필터 {predicates}')
+        ranked = old.sort_rows(live, '에너지(kcal)', descending=True)
+        if not np.array_equal(old.column('에너지(kcal)')[ranked], new.column('에너지(kcal)')[
+                new.sort_rows(np.arange(new.n_rows), '에너지(kcal)', descending=True)], equal_nan=True):
+            found.append(f'{basis} 정렬 순서')
+    return found
+
+
+def aggregate_mismatches(patched, fresh):
+    # 영양성분 기준별 보기마다 카테고리 노드의 통계와 Top-K 값을 비교한다. 식품 ID 는 갱신 방식에 따라 달라지므로
+    # 경로와 값으로만 비교. 다른 곳의 설명 목록을 돌려줌
+    found = []
+    for basis in BASES:
+        old, new = patched.basis_view(basis), fresh.basis_view(basis)
+        for depth in range(len(LEVELS) + 1):
+            paths = [path for path, _ in new.category_tree.nodes(depth)]
+            extra = {path for path, _ in old.category_tree.nodes(depth)} - set(paths)
+            found += [f'{basis} {path}: 새로 연 저장소에 없는 경로' for path in extra]
+            for path in paths:
+                if old.category_tree.node(path) is None:
+                    found.append(f'{basis} {path}: 갱신한 저장소에 없는 경로')
+                    continue
+                for col in old.nutrient_cols:
+                    a, b = old.aggregates.stats(path, col), new.aggregates.stats(path, col)
+                    if not np.allclose(list(a.values()), list(b.values()), rtol=1e-6, equal_nan=True):
+                        found.append(f'{basis} {path} {col}: 통계 {a} != {b}')
+                    top_a = old.column(col)[old.aggregates.top(path, col)]
+                    top_b = new.column(col)[new.aggregates.top(path, col)]
+                    if not np.array_equal(top_a, top_b):
+                        found.append(f'{basis} {path} {col}: Top-K {top_a} != {top_b}')
+    return found
+
+
+def cart_mismatches(store, patched):
+    # 갱신 전 저장소에서 삭제될 음식 몇 개와 남는 음식 몇 개로 장바구니 코드를 만들고, 갱신한 저장소에서 복원하면
+    # 남는 음식만 같은 그램으로 돌아오는지 확인한다. 다른 곳의 설명 목록을 돌려줌
+    dead = np.flatnonzero(~patched.live[:store.n_rows])[:5]
+    kept = np.flatnonzero(patched.live[:store.n_rows])[::max(1, store.n_rows // 20)][:20]
+    ids = np.concatenate([dead, kept])
+    grams = np.arange(1, len(ids) + 1, dtype=np.float32) * 10
+    token = Cart(ids, grams).to_token(store.food_keys)
+    try:
+        cart = Cart.from_token(token, patched.key_index, live=patched.live)
+    except ValueError as exc:
+        return [f'장바구니 복원 실패: {exc}']
+    found = []
+    if not np.array_equal(cart.ids, kept) or not np.array_equal(cart.grams, grams[len(dead):]):
+        found.append('장바구니에 남은 음식')
+    if cart.dropped != len(dead):
+        found.append(f'장바구니에서 뺀 음식 {cart.dropped}개 != {len(dead)}개')
+    if not patched.take(cart.ids, ['식품명'])['식품명'].equals(store.take(kept, ['식품명'])['식품명']):
+        found.append('장바구니 음식 이름')
+    return found
+
+
+def main():
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    WORK_DIR.mkdir(parents=True)
+    path, cache_dir = WORK_DIR / 'food.csv', WORK_DIR / 'cache'
+    base = pd.read_csv(DATA_PATH, encoding=CSV_ENCODING, dtype=str)
+    rng = np.random.default_rng(0)
+    mismatches = []
+    for n in CHANGES:
+        shutil.copy(DATA_PATH, path)
+        store = warm_views(index_rows(FoodStore.open(path, cache_dir).warm(), path))
+        edited(base, n, rng).to_csv(path, index=False, encoding=CSV_ENCODING)
+
+        start = time.perf_counter()
+        patched, stats = patch_store(store, path)
+        patch_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        fresh = index_rows(warm_views(FoodStore.open(path, cache_dir).warm()), path)
+        full_ms = (time.perf_counter() - start) * 1000
+        print(f'{n:>5}줄 변경 (수정 {stats["updated"]}, 추가 {stats["added"]}, 삭제 {stats["removed"]}): '
+              f'증분 {patch_ms:.0f} ms / 전체 {full_ms:.0f} ms')
+        # 기준 보기가 갱신 중에 함께 만들어졌는지 (교체 후 첫 실행에서 다시 만들지 않는지)
+        cold = [basis for basis in BASES if 'aggregates' not in patched.basis_view(basis).__dict__
+                or 'ranges' not in patched.basis_view(basis).__dict__]
+        mismatches += [f'{basis} 보기가 갱신 후 비어 있음' for basis in cold]
+        mismatches += store_mismatches(patched, fresh) + aggregate_mismatches(patched, fresh)
+        mismatches += cart_mismatches(store, patched)
+    for line in mismatches[:20]:
+        print(f'  불일치: {line}')
+    if mismatches:
+        print(f'새로 연 저장소와 다른 결과 {len(mismatches):,}건')
+        sys.exit(1)
+    print(f'모든 변경 크기, 영양성분 기준 {len(BASES)}개에서 새로 연 저장소와 같은 결과')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# 식단 보고서: 형식별 생성 시간/파일 크기, 그리고 보고서를 만드는 동안 다른 세션의 rerun 에 해당하는 작업이
+# 얼마나 느려지는지 (작업 스레드 큐가 스크립트 스레드를 막지 않는지)
+#   python benchmarks/bench_reports.py
+#   python benchmarks/bench_reports.py --carts 7,90 --formats csv,xlsx
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from core.reports import available_formats, submit_report
+from core.store import FoodStore
+
+DEFAULT_CARTS = [7, 90]
+ITEMS_PER_CART = 12
+TARGETS = {'에너지(kcal)': 2000, '탄수화물(g)': 324, '단백질(g)': 55, '지방(g)': 54, '당류(g)': 100, '나트륨(mg)': 2000}
+
+
+def random_carts(store, n, rng):
+    return [(f'{day + 1}일차', rng.choice(store.n_rows, ITEMS_PER_CART, replace=False).astype(np.int32),
+             rng.uniform(50, 300, ITEMS_PER_CART).astype(np.float32)) for day in range(n)]
+
+
+def rerun_ms(store, rows):
+    # 페이지 rerun 의 대표 작업: 카테고리 행에서 표 한 페이지 꺼내기
+    start = time.perf_counter()
+    store.take(rows[:20], ['식품명', '식품기원명', '에너지(kcal)'])
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--carts', default=','.join(map(str, DEFAULT_CARTS)))
+    parser.add_argument('--formats', default=','.join(available_formats()))
+    args = parser.parse_args()
+    store = FoodStore.open().warm()
+    rows = store.category_tree.rows((store.category_tree.options(())[0],))
+    rng = np.random.default_rng(0)
+    idle = np.median([rerun_ms(store, rows) for _ in range(200)])
+    print(f'rerun 대표 작업 (대기 중): {idle:.3f} ms')
+    print(f'{"형식":>5} {"식단 수":>5} {"생성(ms)":>8} {"크기(KB)":>8} {"rerun p50(ms)":>13} {"p95":>7}')
+    for n in map(int, args.carts.split(',')):
+        carts = random_carts(store, n, rng)
+        for fmt in args.formats.split(','):
+            job = submit_report(store, carts, TARGETS, fmt)
+            latencies = []
+            while not job.done():
+                latencies.append(rerun_ms(store, rows))
+                time.sleep(0.005)
+            job.result()
+            p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (idle, idle)
+            print(f'{fmt:>5} {n:>7} {job.seconds * 1000:>10,.0f} {job.nbytes / 1024:>10,.1f} {p50:>15.3f} {p95:>7.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# 음식 이름 검색: 색인 생성 시간, 질의 지연, 위젯에 보내는 옵션 크기
+#   python benchmarks/bench_search.py
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from core.store import FoodStore
+
+QUERIES = ['김치찌개', '김ㅊ', 'ㄱㅊㅉㄱ', '김치찌게', '된장', '달ㄱ', '떡볶이', '떢볶이',
+           '아메리카노', '아매리카노', '라면', '샌드위치', '불고기', 'ㅂㄱㄱ', '피자', '초코']
+
+
+def main():
+    store = FoodStore.open()
+    start = time.perf_counter()
+    search = store.search
+    print(f'색인 생성: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    timings = []
+    for query in QUERIES:
+        best = float('inf')
+        for _ in range(20):
+            start = time.perf_counter()
+            search.search(query, limit=20)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best * 1000)
+        rows, _ = search.search(query, limit=5)
+        names = [store.categories('식품명')[store.codes('식품명')[r]] for r in rows]
+        print(f'  {query:<8}{best * 1000:7.2f} ms  {names}')
+    print(f'질의 지연: 평균 {np.mean(timings):.2f} ms, 최대 {np.max(timings):.2f} ms')
+
+    # 기존: 전체 식품명 목록을 매 렌더마다 위젯에 보냄 / 변경: 검색 결과만 보냄
+    full = store.frame()['식품명'].unique().tolist()
+    hit_ids, _ = search.ids('김치', limit=200)
+    hits = [store.food_labels[i] for i in hit_ids]
+    print(f'위젯 옵션 크기: 전체 목록 {len(full):,}개 {len(json.dumps(full, ensure_ascii=False).encode()) / 1024:.0f} KB'
+          f' → 검색 결과 {len(hits)}개 {len(json.dumps(hits, ensure_ascii=False).encode()) / 1024:.1f} KB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# 비슷한 음식 찾기: pandas 로 매번 표준화 + 코사인 계산 vs 미리 만든 float32 행렬의 블록 행렬-벡터 곱
+#   python benchmarks/bench_similar.py
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from core.similar import SIMILARITY_COLS
+from core.store import FoodStore
+
+K = 10
+QUERIES = 200
+
+
+def pandas_neighbors(food_df, food_id, k):
+    # 기존 방식으로 짠다면: 표준화한 DataFrame 에서 행마다 코사인 유사도를 구해 nlargest
+    logged = np.log1p(food_df[SIMILARITY_COLS].astype('float64').clip(lower=0))
+    z = ((logged - logged.mean()) / logged.std(ddof=0)).fillna(0)
+    query = z.iloc[food_id]
+    sims = z.mul(query, axis=1).sum(axis=1) / (np.sqrt((z ** 2).sum(axis=1)) * np.sqrt((query ** 2).sum()))
+    return sims.drop(index=food_id).nlargest(k)
+
+
+def main():
+    store = FoodStore.open()
+    food_df = store.frame()
+    start = time.perf_counter()
+    similar = store.similar
+    print(f'행렬 준비: {(time.perf_counter() - start) * 1000:.1f} ms ({similar.vectors.nbytes / 1024:.0f} KB)')
+
+    rng = np.random.default_rng(0)
+    ids = rng.choice(store.n_rows, size=QUERIES, replace=False)
+
+    start = time.perf_counter()
+    for food_id in ids[:20]:
+        expected = pandas_neighbors(food_df, int(food_id), K)
+    pandas_ms = (time.perf_counter() - start) * 1000 / 20
+
+    start = time.perf_counter()
+    for food_id in ids:
+        rows, scores = similar.neighbors(int(food_id), k=K)
+    engine_ms = (time.perf_counter() - start) * 1000 / QUERIES
+    # 마지막 질의 결과가 pandas 결과와 (float32 오차 범위에서) 같은지 확인
+    rows, scores = similar.neighbors(int(ids[19]), k=K)
+    assert np.allclose(scores, expected.to_numpy(), atol=1e-4)
+
+    tree = store.category_tree
+    scope = tree.rows((store.frame()['식품대분류명'].iloc[int(ids[0])],))
+    start = time.perf_counter()
+    for food_id in ids:
+        similar.neighbors(int(food_id), k=K, rows=scope)
+    scoped_ms = (time.perf_counter() - start) * 1000 / QUERIES
+
+    start = time.perf_counter()
+    found = 0
+    for food_id in ids:
+        found += len(similar.substitutes(int(food_id), k=K)[0])
+    substitute_ms = (time.perf_counter() - start) * 1000 / QUERIES
+
+    print(f'이웃 {K}개 (전체 {store.n_rows:,}개): pandas {pandas_ms:.2f} ms → 행렬 {engine_ms:.3f} ms')
+    print(f'대분류 안에서만 ({len(scope):,}행): {scoped_ms:.3f} ms')
+    print(f'대체 음식: {substitute_ms:.3f} ms (질의당 평균 {found / QUERIES:.1f}개)')
+
+
+if __name__ == '__main__':
+    main()
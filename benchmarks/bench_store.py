@@ -0,0 +1,94 @@
+# 공유 컬럼 저장소(core.store) 와 기존 페이지별 load_data() 방식 비교
+#   python benchmarks/bench_store.py
+import multiprocessing as mp
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from core.store import DATA_PATH, NUTRIENT_COLS, FoodStore
+
+COMPARE_COLS = ['에너지(kcal)', '탄수화물(g)', '단백질(g)', '지방(g)', '당류(g)', '나트륨(mg)',
+                '콜레스테롤(mg)', '포화지방산(g)', '식이섬유(g)']
+
+
+def legacy_load_all():
+    # 변경 전 1~5번 페이지의 load_data() 를 그대로 재현 (페이지마다 한 번씩 파싱)
+    frames = []
+    for cols in (['식품대분류명', '식품중분류명', '식품소분류명', '식품명', '식품기원명', '에너지(kcal)'],
+                 ['식품대분류명', '식품명', '식품기원명', '에너지(kcal)'],
+                 ['식품대분류명', '에너지(kcal)']):
+        df = pd.read_csv(DATA_PATH, encoding='euc-kr')
+        df.columns = df.columns.str.strip()
+        frames.append(df[cols])
+    df = pd.read_csv(DATA_PATH, encoding='euc-kr')
+    df.columns = df.columns.str.strip()
+    for col in NUTRIENT_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    frames.append(df)
+    df = pd.read_csv(DATA_PATH, encoding='euc-kr')
+    df.columns = df.columns.str.strip()
+    for col in COMPARE_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    frames.append(df[['식품대분류명', '식품중분류명', '식품소분류명', '식품명'] + COMPARE_COLS])
+    return frames
+
+
+def store_load_all(cache_dir):
+    store = FoodStore.open(DATA_PATH, cache_dir)
+    # 1~3번 페이지는 frame(), 4~5번 페이지는 frame(fill_na=True) 를 공유
+    return store, store.frame(), store.frame(fill_na=True)
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(kind, cache_dir, queue):
+    # 깨끗한 프로세스에서 한 번 실행해 시간과 최대 RSS 증가분을 잰다
+    before = _rss_mb()
+    start = time.perf_counter()
+    if kind == 'legacy':
+        frames = legacy_load_all()
+        data_mb = sum(f.memory_usage(deep=True).sum() for f in frames) / 2**20
+    else:
+        store, *_ = store_load_all(cache_dir)
+        data_mb = store.nbytes() / 2**20
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, _rss_mb() - before, data_mb))
+
+
+def measure(kind, cache_dir=None):
+    queue = mp.get_context('spawn').SimpleQueue()
+    proc = mp.get_context('spawn').Process(target=_run, args=(kind, cache_dir, queue))
+    proc.start()
+    proc.join()
+    return queue.get()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        rows = [
+            ('기존: 페이지 5개 load_data()', *measure('legacy')),
+            ('저장소: 최초 실행 (CSV 파싱 + 캐시 작성)', *measure('store', cache_dir)),
+            ('저장소: 재시작 (mmap 캐시 열기)', *measure('store', cache_dir)),
+        ]
+        store = FoodStore.open(DATA_PATH, cache_dir)
+        start = time.perf_counter()
+        store.frame()
+        first_hit = time.perf_counter() - start
+
+    print(f'{"시나리오":<40}{"시간(ms)":>10}{"RSS 증가(MB)":>14}{"데이터(MB)":>12}')
+    for name, elapsed, rss, data in rows:
+        print(f'{name:<40}{elapsed * 1000:>10.1f}{rss:>14.1f}{data:>12.1f}')
+    print(f'페이지 첫 조회 (공유 frame 생성): {first_hit * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
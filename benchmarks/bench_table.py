@@ -0,0 +1,36 @@
+# 결과 표: 필터 결과 전체를 st.dataframe 으로 보내던 방식 vs 서버 정렬 + 현재 페이지만 전송
+#   python benchmarks/bench_table.py
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.store import FoodStore
+from core.table import arrow_nbytes
+
+COLUMNS = ['식품명', '식품기원명', '에너지(kcal)']
+PAGE_SIZE = 20
+
+
+def main():
+    store = FoodStore.open()
+    tree = store.category_tree
+    food_df = store.frame()
+
+    print(f'{"필터":<24}{"행 수":>8}{"전체 전송(KB)":>16}{"페이지 전송(KB)":>18}{"정렬+페이지(ms)":>18}')
+    for path in [(), ('빵 및 과자류',), ('음료 및 차류', '해당없음', '해당없음')]:
+        rows = tree.rows(path)
+        full = food_df.iloc[rows][COLUMNS].reset_index(drop=True)
+        store.sort_rank('에너지(kcal)', True)
+        start = time.perf_counter()
+        window = store.sort_rows(rows, '에너지(kcal)', descending=True)[:PAGE_SIZE]
+        page = store.take(window, COLUMNS)
+        elapsed = (time.perf_counter() - start) * 1000
+        name = ' > '.join(path) or '전체'
+        print(f'{name:<24}{len(rows):>8,}{arrow_nbytes(full) / 1024:>16.1f}{arrow_nbytes(page) / 1024:>18.1f}{elapsed:>18.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+# 여러 페이지가 함께 쓰는 데이터/인덱스 모듈 모음
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from core.category import LEVELS
+
+TOP_K = 10
+STAT_NAMES = ['mean', 'count', 'min', 'max']
+
+
+class CategoryAggregates:
+    # 카테고리 트리의 모든 노드(전체/대분류/중분류/소분류/식품기원명) 에 대해
+    # 영양성분별 평균·개수·최소·최대와 내림차순 Top-K 행 번호를 로드 시점에 미리 계산해 둔다.
+    # 결측값(NaN) 은 통계와 Top-K 에서 모두 제외된다.
+
+    def __init__(self, store, tree, k=TOP_K):
+        self.k = k
+        self._tree = tree
+        self.columns = list(store.nutrient_cols)
+        self._col_index = {col: i for i, col in enumerate(self.columns)}
+        self._index = {}
+        self._stats = []
+        self._top = []
+
+        values = np.asarray(store.nutrients, dtype=np.float64)
+        frame = pd.DataFrame(values, columns=self.columns)
+        # Top-K 에서 NaN 이 앞에 오지 않도록 -inf 로 바꾼 사본
+        ranked = np.where(np.isnan(values), -np.inf, values)
+
+        for depth in range(len(LEVELS) + 1):
+            nodes = tree.nodes(depth)
+            # 어느 노드에도 없는 행(증분 갱신으로 삭제된 ID) 은 -1 로 남겨 집계에서 뺀다
+            group = np.full(store.n_rows, -1, dtype=np.int32)
+            for i, (path, node) in enumerate(nodes):
+                self._index[path] = (depth, i)
+                group[node.rows] = i
+
+            assigned = group >= 0
+            grouped = (frame if assigned.all() else frame[assigned]).groupby(group[assigned], sort=True)
+            positions = range(len(nodes))
+            stats = np.stack([grouped.mean().reindex(positions).to_numpy(),
+                              grouped.count().reindex(positions, fill_value=0).to_numpy(),
+                              grouped.min().reindex(positions).to_numpy(),
+                              grouped.max().reindex(positions).to_numpy()], axis=1)
+            self._stats.append(stats)
+
+            top = np.full((len(nodes), k, len(self.columns)), -1, dtype=np.int32)
+            for i, (_, node) in enumerate(nodes):
+                top[i] = self._top_k(ranked[node.rows], node.rows, k)
+            self._top.append(top)
+
+    def patch(self, store, tree, paths):
+        # 증분 갱신: 다시 만든 트리 경로(paths) 의 통계와 Top-K 만 새로 계산하고 나머지는 복사
+        new = object.__new__(CategoryAggregates)
+        new.k = self.k
+        new._tree = tree
+        new.columns = self.columns
+        new._col_index = self._col_index
+        new._index = dict(self._index)
+        new._stats = [stats.copy() for stats in self._stats]
+        new._top = [top.copy() for top in self._top]
+
+        appended = {}
+        for path in paths:
+            node = tree.node(path)
+            if node is None:
+                new._index.pop(path, None)
+                continue
+            depth = len(path)
+            if path not in new._index:
+                appended.setdefault(depth, []).append(path)
+        for depth, new_paths in appended.items():
+            start = len(new._stats[depth])
+            for i, path in enumerate(new_paths):
+                new._index[path] = (depth, start + i)
+            n_stats = len(STAT_NAMES), len(self.columns)
+            new._stats[depth] = np.concatenate([new._stats[depth], np.full((len(new_paths),) + n_stats, np.nan)])
+            new._top[depth] = np.concatenate(
+                [new._top[depth], np.full((len(new_paths), self.k, len(self.columns)), -1, dtype=np.int32)])
+
+        for path in paths:
+            node = tree.node(path)
+            if node is None:
+                continue
+            depth, i = new._index[path]
+            block = np.asarray(store.nutrients[node.rows], dtype=np.float64)
+            new._stats[depth][i] = self._node_stats(block)
+            new._top[depth][i] = self._top_k(np.where(np.isnan(block), -np.inf, block), node.rows, self.k)
+        return new
+
+    @staticmethod
+    def _node_stats(block):
+        # 한 노드의 (mean, count, min, max) × 영양성분. 결측 제외, 값이 하나도 없으면 NaN (groupby 와 같게)
+        count = (~np.isnan(block)).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.nansum(block, axis=0) / count
+        low = np.fmin.reduce(block, axis=0, initial=np.inf)
+        high = np.fmax.reduce(block, axis=0, initial=-np.inf)
+        low[count == 0] = np.nan
+        high[count == 0] = np.nan
+        return np.stack([mean, count, low, high])
+
+    @staticmethod
+    def _top_k(block, rows, k):
+        # argpartition 으로 상위 k 개만 고른 뒤 그 k 개만 정렬 (전체 정렬 없음)
+        if len(rows) > k:
+            candidates = np.argpartition(-block, k - 1, axis=0)[:k]
+        else:
+            candidates = np.broadcast_to(np.arange(len(rows))[:, None], block.shape)
+        picked = np.take_along_axis(block, candidates, axis=0)
+        order = np.argsort(-picked, axis=0, kind='stable')
+        candidates = np.take_along_axis(candidates, order, axis=0)
+        picked = np.take_along_axis(picked, order, axis=0)
+        result = np.full((k, block.shape[1]), -1, dtype=np.int32)
+        result[:len(candidates)] = np.where(np.isfinite(picked), rows[candidates], -1)
+        return result
+
+    def _locate(self, path):
+        # 와일드카드(None) 가 없는 정확한 경로만 지원
+        try:
+            return self._index[tuple(path)]
+        except KeyError:
+            raise KeyError(f'집계가 없는 카테고리 경로입니다: {path}') from None
+
+    def stats(self, path, nutrient):
+        depth, i = self._locate(path)
+        values = dict(zip(STAT_NAMES, self._stats[depth][i, :, self._col_index[nutrient]].tolist()))
+        values['count'] = int(values['count'])
+        return values
+
+    def children_table(self, path, nutrient):
+        # path 바로 아래 카테고리별 통계 표 (인덱스 = 하위 카테고리 이름)
+        depth, _ = self._locate(path)
+        names = list(self._tree.node(path).children)
+        positions = [self._index[tuple(path) + (name,)][1] for name in names]
+        stats = self._stats[depth + 1][positions, :, self._col_index[nutrient]]
+        index = pd.Index(names, name=LEVELS[depth])
+        table = pd.DataFrame(stats, index=index, columns=STAT_NAMES)
+        table['count'] = table['count'].astype(int)
+        return table
+
+    def top(self, path, nutrient, k=None):
+        # 영양성분 값 내림차순 상위 k 개 행 번호 (결측 제외, k 는 TOP_K 이하)
+        depth, i = self._locate(path)
+        rows = self._top[depth][i, :k or self.k, self._col_index[nutrient]]
+        return rows[rows >= 0]
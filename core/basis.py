@@ -0,0 +1,64 @@
+import re
+
+import numpy as np
+
+# --- 영양성분 기준 환산 ---
+# 원본 값은 행마다 영양성분함량기준량(100g 또는 100ml) 당이다. 로드 시점에 기준별 행 배율을 만들어 두고
+# 값 × 배율로 100g 당 / 100ml 당 / 식품중량(1회 제공량) 당 행렬을 얻는다.
+# g ↔ ml 는 밀도를 모르므로 환산하지 않고 결측(NaN) 으로 둔다.
+NATIVE_BASIS = '기준량 그대로'
+# 선택지 → 화면에 붙일 기준 설명
+BASES = {
+    NATIVE_BASIS: '100g/100ml 기준',
+    '100g 당': '100g 기준',
+    '100ml 당': '100ml 기준',
+    '1회 제공량 당': '식품중량(1회 제공량) 기준',
+}
+GRAM, MILLILITER = 0, 1
+# 'm' 은 원본 내보내기에서 다섯 글자로 잘린 'ml' (예: '65.5m')
+_UNITS = {
+    'g': (GRAM, 1.0), 'kg': (GRAM, 1000.0), 'mg': (GRAM, 0.001),
+    'ml': (MILLILITER, 1.0), 'm': (MILLILITER, 1.0), 'l': (MILLILITER, 1000.0),
+}
+_AMOUNT = re.compile(r'^\s*([0-9]+(?:\.[0-9]+)?)\s*([A-Za-z]*)\s*$')
+
+
+def parse_amount(text):
+    # '100g', '591 g', '1.5L', '104.4' → (양, GRAM | MILLILITER | -1(단위 없음)). 읽을 수 없으면 (nan, -1)
+    match = _AMOUNT.match(text or '')
+    if not match:
+        return np.nan, -1
+    value, unit = float(match[1]), match[2].lower()
+    if not unit:
+        return value, -1
+    if unit not in _UNITS:
+        return np.nan, -1
+    kind, scale = _UNITS[unit]
+    return value * scale, kind
+
+
+def _amounts(store, col):
+    # 카테고리 목록(고유값) 만 파싱한 뒤 코드로 펼친다. 코드 -1(결측) 은 끝에 붙인 (nan, -1)
+    parsed = [parse_amount(value) for value in store.categories(col)] + [(np.nan, -1)]
+    values = np.array([value for value, _ in parsed], dtype=np.float64)
+    units = np.array([unit for _, unit in parsed], dtype=np.int8)
+    codes = np.asarray(store.codes(col))
+    return values[codes], units[codes]
+
+
+def basis_factors(store):
+    # {기준: 원래 값에 곱할 행별 float32 배율}. 환산할 수 없는 행은 NaN
+    amount, unit = _amounts(store, '영양성분함량기준량')
+    weight, weight_unit = _amounts(store, '식품중량')
+    # 단위 없이 숫자만 있는 식품중량은 기준량과 같은 단위로 본다
+    weight_unit = np.where(weight_unit < 0, unit, weight_unit)
+    valid = amount > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_100 = np.where(valid, 100 / amount, np.nan)
+        per_serving = np.where(valid, weight / amount, np.nan)
+    return {
+        NATIVE_BASIS: np.ones(store.n_rows, dtype=np.float32),
+        '100g 당': np.where(unit == GRAM, per_100, np.nan).astype(np.float32),
+        '100ml 당': np.where(unit == MILLILITER, per_100, np.nan).astype(np.float32),
+        '1회 제공량 당': np.where((weight_unit == unit) & (unit >= 0), per_serving, np.nan).astype(np.float32),
+    }
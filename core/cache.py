@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+
+from core import perf
+
+# --- 세션 간 결과 캐시 (모든 세션 공유) ---
+# 같은 (페이지, 정규화된 쿼리, 데이터 버전) 의 계산 결과를 한 번만 만들고 모든 세션이 같이 쓴다.
+# 항목 수, 전체 바이트 예산, TTL 중 하나라도 넘으면 가장 오래 쓰이지 않은 항목부터 버린다 (LRU).
+# 꺼낸 값은 다른 세션과 공유하는 객체이므로 수정하면 안 된다.
+MAX_RESULTS = 1024
+MAX_RESULT_BYTES = 64 * 2**20
+RESULT_TTL = 600.0
+
+
+class ResultCache:
+
+    def __init__(self, name, max_entries=MAX_RESULTS, max_bytes=MAX_RESULT_BYTES, ttl=RESULT_TTL,
+                 sizeof=perf.deep_sizeof):
+        # name: perf 카운터 접두사 ({name}_hit / {name}_miss), sizeof: 값 → 바이트 (예산 계산용)
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        # 키 → (값, 바이트, 만든 시각)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, build):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[2] > self.ttl:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            perf.count(f'{self.name}_hit')
+            return entry[0]
+
+        # 빌드는 락 밖에서 (동시에 같은 키를 만들면 나중 것이 덮어씀)
+        value = build()
+        nbytes = self.sizeof(value)
+        with self._lock:
+            self.misses += 1
+            if key in self._entries:
+                self._drop(key)
+            # 혼자서 예산을 넘는 값은 담지 않음 (다른 항목을 모두 밀어내지 않도록)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (value, nbytes, now)
+                self._bytes += nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        perf.count(f'{self.name}_miss')
+        return value
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._bytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache('result_cache')
+
+
+def cached_result(page, query, store, build):
+    # query: core.query.canonical() 로 정규화한 선택 상태. 데이터(기준 보기 포함) 가 바뀌면 store.version 이 달라짐
+    return result_cache.get((page, query, store.version), build)
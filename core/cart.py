@@ -0,0 +1,158 @@
+import base64
+import struct
+import sys
+
+import numpy as np
+
+# --- 세션 장바구니 ---
+# 세션마다 들고 있는 장바구니는 식품 ID int32 배열 + 그램 float32 배열 두 개로만 저장한다.
+# 항목당 8바이트라 동시 접속자가 많아도 세션 메모리가 거의 늘지 않는다. 바이트열로 내보낼 때만 식품 키로 바꾼다.
+MAX_CART_ITEMS = 200
+MAX_ITEM_GRAMS = 10000
+# 바이트열 형식: 버전(1B) + 항목 수(2B) + 그램(float32 LE) × n + 식품 키(UTF-8, 줄바꿈 구분) × n.
+# 식품 ID(행 번호) 는 서버를 다시 띄우거나 데이터를 새로 열면 달라지므로 밖으로 내보낼 때는 식품 키를 쓴다
+CART_FORMAT = 2
+_HEADER = struct.Struct('<BH')
+
+
+class CartFull(ValueError):
+    pass
+
+
+class Cart:
+    # {식품 ID: 그램} 처럼 쓰는 고정 크기 장바구니 (담은 순서 유지)
+    __slots__ = ('ids', 'grams', 'limit', 'dropped')
+
+    def __init__(self, ids=(), grams=(), limit=MAX_CART_ITEMS):
+        self.ids = np.array(ids, dtype=np.int32)
+        self.grams = np.array(grams, dtype=np.float32)
+        self.limit = limit
+        # 바이트열에서 복원할 때 없는 식품이라 뺀 항목 수 (페이지가 사용자에게 알린 뒤 0 으로 되돌림)
+        self.dropped = 0
+        if len(self.ids) != len(self.grams):
+            raise ValueError('식품 ID 와 그램 수가 다릅니다.')
+        if len(self.ids) > limit:
+            raise CartFull(f'장바구니에는 최대 {limit}개까지 담을 수 있습니다.')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __contains__(self, food_id):
+        return bool((self.ids == food_id).any())
+
+    def _position(self, food_id):
+        found = np.flatnonzero(self.ids == food_id)
+        return int(found[0]) if len(found) else None
+
+    def __getitem__(self, food_id):
+        pos = self._position(food_id)
+        if pos is None:
+            raise KeyError(food_id)
+        return float(self.grams[pos])
+
+    def get(self, food_id, default=None):
+        pos = self._position(food_id)
+        return default if pos is None else float(self.grams[pos])
+
+    def __setitem__(self, food_id, grams):
+        grams = min(max(float(grams), 0.0), MAX_ITEM_GRAMS)
+        pos = self._position(food_id)
+        if pos is not None:
+            self.grams[pos] = grams
+            return
+        if len(self.ids) >= self.limit:
+            raise CartFull(f'장바구니에는 최대 {self.limit}개까지 담을 수 있습니다.')
+        self.ids = np.append(self.ids, np.int32(food_id))
+        self.grams = np.append(self.grams, np.float32(grams))
+
+    def __delitem__(self, food_id):
+        pos = self._position(food_id)
+        if pos is None:
+            raise KeyError(food_id)
+        self.ids = np.delete(self.ids, pos)
+        self.grams = np.delete(self.grams, pos)
+
+    def items(self):
+        return zip(self.ids.tolist(), self.grams.tolist())
+
+    def clear(self):
+        self.ids = self.ids[:0]
+        self.grams = self.grams[:0]
+
+    def nbytes(self):
+        # 세션이 실제로 붙들고 있는 메모리 (객체 + 두 배열)
+        return sys.getsizeof(self) + sys.getsizeof(self.ids) + sys.getsizeof(self.grams)
+
+    # --- 직렬화 ---
+    def to_bytes(self, food_keys):
+        keys = '\n'.join(food_keys[food_id] for food_id in self.ids.tolist())
+        return _HEADER.pack(CART_FORMAT, len(self.ids)) + self.grams.astype('<f4').tobytes() + keys.encode('utf-8')
+
+    @staticmethod
+    def count(data):
+        # 바이트열을 풀지 않고 항목 수만
+        return _HEADER.unpack_from(data)[1]
+
+    @classmethod
+    def from_bytes(cls, data, key_index, live=None, limit=MAX_CART_ITEMS):
+        # 외부에서 들어온 값이므로 형식, 길이를 모두 확인한다. key_index 는 식품 키 → 식품 ID,
+        # live 를 주면 삭제된 식품도 없는 것으로 본다. 없는 식품은 그 항목만 빼고 dropped 에 센다
+        # (데이터 갱신 전에 만든 코드나 URL 이어도 남은 음식은 살림)
+        if len(data) < _HEADER.size:
+            raise ValueError('장바구니 데이터가 너무 짧습니다.')
+        version, n = _HEADER.unpack_from(data)
+        if version != CART_FORMAT:
+            raise ValueError(f'지원하지 않는 장바구니 형식입니다: {version}')
+        if len(data) < _HEADER.size + 4 * n:
+            raise ValueError('장바구니 데이터 길이가 맞지 않습니다.')
+        grams = np.frombuffer(data, dtype='<f4', count=n, offset=_HEADER.size)
+        try:
+            keys = data[_HEADER.size + 4 * n:].decode('utf-8').split('\n') if n else []
+        except UnicodeDecodeError as exc:
+            raise ValueError('장바구니 데이터가 올바르지 않습니다.') from exc
+        if len(keys) != n:
+            raise ValueError('장바구니 데이터 길이가 맞지 않습니다.')
+        if len(set(keys)) != n:
+            raise ValueError('같은 식품이 두 번 들어 있습니다.')
+        ids = np.array([key_index.get(key, -1) for key in keys], dtype=np.int64)
+        found = ids >= 0
+        if live is not None:
+            found[found] = live[ids[found]]
+        cart = cls(ids[found], np.clip(np.nan_to_num(grams[found]), 0, MAX_ITEM_GRAMS), limit=limit)
+        cart.dropped = int(n - found.sum())
+        return cart
+
+    def to_token(self, food_keys):
+        # URL 에 그대로 넣을 수 있는 base64url (패딩 제외)
+        return base64.urlsafe_b64encode(self.to_bytes(food_keys)).rstrip(b'=').decode('ascii')
+
+    @classmethod
+    def from_token(cls, token, key_index, **options):
+        try:
+            data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        except (ValueError, TypeError) as exc:
+            raise ValueError('장바구니 코드가 올바르지 않습니다.') from exc
+        return cls.from_bytes(data, key_index, **options)
+
+
+# --- 장바구니 영양성분 계산 ---
+def cart_arrays(cart):
+    # 장바구니를 (행 번호 int32 배열, 그램 float32 배열) 로 변환 (Cart 또는 {행 번호: 그램})
+    if isinstance(cart, Cart):
+        return cart.ids, cart.grams
+    rows = np.fromiter(cart.keys(), dtype=np.int32, count=len(cart))
+    grams = np.fromiter(cart.values(), dtype=np.float32, count=len(cart))
+    return rows, grams
+
+
+def cart_nutrients(matrix, rows, grams):
+    # matrix 는 100g 당 영양성분 행렬 (n_foods x n_nutrients, float32).
+    # 항목별 값은 행 단위 스케일 한 번, 합계는 행렬-벡터 곱 한 번으로 계산한다.
+    block = matrix[rows]
+    scale = np.asarray(grams, dtype=np.float64) / 100
+    items = block * scale[:, None]
+    totals = scale @ block
+    return items, totals
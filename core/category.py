@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+# --- 카테고리 계층 ---
+LEVELS = ['식품대분류명', '식품중분류명', '식품소분류명', '식품기원명']
+MISSING_LABEL = '해당없음'
+
+
+def row_paths(store, rows):
+    # 각 행의 (대분류, 중분류, 소분류, 식품기원명) 경로 튜플 목록
+    columns = []
+    for col in LEVELS:
+        labels = np.array(list(store.categories(col)) + [MISSING_LABEL], dtype=object)
+        columns.append(labels[np.asarray(store.codes(col))[rows]].tolist())
+    return list(zip(*columns))
+
+
+class CategoryNode:
+    __slots__ = ('value', 'depth', 'first', 'rows', 'children')
+
+    def __init__(self, value, depth, rows):
+        self.value = value
+        self.depth = depth
+        self.rows = rows
+        # 원본 데이터에서 처음 등장한 행 번호 (selectbox 옵션 순서를 .unique() 와 맞추기 위해 사용)
+        self.first = int(rows[0]) if len(rows) else -1
+        self.children = {}
+
+
+class CategoryTree:
+    # 대분류 → 중분류 → 소분류 → 식품기원명 경로마다 자식 옵션과 행 번호 배열을 미리 계산해 둔 트리.
+    # 경로(path) 는 단계별 값의 튜플이며, None 은 '전체'(해당 단계 필터 없음) 를 뜻한다.
+
+    def __init__(self, store):
+        n_rows = store.n_rows
+        self.root = CategoryNode(None, 0, np.arange(n_rows, dtype=np.int32))
+        self._nodes = {(): self.root}
+
+        codes = pd.DataFrame({col: np.asarray(store.codes(col)) for col in LEVELS})
+        # 코드 -1(결측) 은 리스트 끝에 붙인 MISSING_LABEL 로 매핑된다
+        labels = {col: list(store.categories(col)) + [MISSING_LABEL] for col in LEVELS}
+        for depth in range(1, len(LEVELS) + 1):
+            keys = LEVELS[:depth]
+            groups = codes.groupby(keys, sort=False).indices
+            # 첫 등장 행 순서대로 넣어야 children 순서가 원본 .unique() 순서와 같아진다
+            for key, rows in sorted(groups.items(), key=lambda item: item[1][0]):
+                key = key if isinstance(key, tuple) else (key,)
+                path = tuple(labels[col][code] for col, code in zip(keys, key))
+                node = CategoryNode(path[-1], depth, rows.astype(np.int32))
+                self._nodes[path] = node
+                self._nodes[path[:-1]].children[path[-1]] = node
+
+    def patch(self, old_store, store, changed):
+        # 증분 갱신: changed 행(수정/추가/삭제) 이 지나가는 경로의 노드만 새로 만들고 나머지 노드는 공유한다.
+        # (새 트리, 다시 만든 경로 집합) 을 돌려준다.
+        changed = np.unique(np.asarray(changed, dtype=np.int32))
+        before = changed[changed < old_store.n_rows]
+        before = before[old_store.live[before]]
+        after = changed[store.live[changed]]
+
+        touched = set()
+        for path in row_paths(old_store, before):
+            touched.update(path[:depth] for depth in range(len(LEVELS) + 1))
+        additions = {}
+        for row, path in zip(after.tolist(), row_paths(store, after)):
+            for depth in range(len(LEVELS) + 1):
+                additions.setdefault(path[:depth], []).append(row)
+        touched.update(additions)
+        child_paths = {}
+        for path in touched:
+            if path:
+                child_paths.setdefault(path[:-1], []).append(path)
+
+        tree = object.__new__(CategoryTree)
+        tree._nodes = dict(self._nodes)
+        # 자식을 먼저 만들어야 부모의 children 을 채울 수 있으므로 깊은 경로부터
+        for path in sorted(touched, key=len, reverse=True):
+            old = self._nodes.get(path)
+            rows = np.setdiff1d(old.rows, changed, assume_unique=True) if old is not None else np.empty(0, dtype=np.int32)
+            if path in additions:
+                rows = np.union1d(rows, additions[path])
+            if path and not len(rows):
+                tree._nodes.pop(path, None)
+                continue
+            node = CategoryNode(path[-1] if path else None, len(path), rows.astype(np.int32))
+            children = dict(old.children) if old is not None else {}
+            for child_path in child_paths.get(path, []):
+                child = tree._nodes.get(child_path)
+                if child is None:
+                    children.pop(child_path[-1], None)
+                else:
+                    children[child_path[-1]] = child
+            node.children = dict(sorted(children.items(), key=lambda item: item[1].first))
+            tree._nodes[path] = node
+        tree.root = tree._nodes[()]
+        return tree, touched
+
+    @staticmethod
+    def _trim(path):
+        path = tuple(path)
+        while path and path[-1] is None:
+            path = path[:-1]
+        return path
+
+    def _match(self, path):
+        # 와일드카드(None) 가 없으면 dict 조회 한 번, 있으면 해당 단계의 모든 자식으로 펼친다
+        path = tuple(path)
+        if None not in path:
+            node = self._nodes.get(path)
+            return [node] if node is not None else []
+        nodes = [self.root]
+        for value in path:
+            if value is None:
+                nodes = [child for node in nodes for child in node.children.values()]
+            else:
+                nodes = [node.children[value] for node in nodes if value in node.children]
+        return nodes
+
+    def node(self, path):
+        return self._nodes.get(tuple(path))
+
+    def nodes(self, depth):
+        # 해당 깊이의 (경로, 노드) 목록. depth 0 은 루트(전체)
+        return [(path, node) for path, node in self._nodes.items() if len(path) == depth]
+
+    def options(self, path=()):
+        # path 다음 단계에서 선택할 수 있는 값 목록 (원본 등장 순서)
+        nodes = self._match(path)
+        if len(nodes) == 1:
+            return list(nodes[0].children)
+        first = {}
+        for node in nodes:
+            for value, child in node.children.items():
+                if value not in first or child.first < first[value]:
+                    first[value] = child.first
+        return sorted(first, key=first.get)
+
+    def rows(self, path=()):
+        # path 아래에 속한 행 번호 (오름차순 int32 배열). 끝쪽의 '전체' 는 상위 노드로 대신한다
+        nodes = self._match(self._trim(path))
+        if len(nodes) == 1:
+            return nodes[0].rows
+        if not nodes:
+            return np.empty(0, dtype=np.int32)
+        return np.sort(np.concatenate([node.rows for node in nodes]))
@@ -0,0 +1,70 @@
+import streamlit as st
+
+from core import perf
+from core.basis import BASES, NATIVE_BASIS
+from core.query import publish, restore
+from core.store import DATA_PATH
+from core.warmup import Warmup
+
+# 준비 중 안내를 다시 확인하는 간격 (초)
+LOADING_POLL_INTERVAL = 0.5
+
+
+# --- 데이터 로드 (모든 세션/페이지 공유) ---
+# cache_data 는 호출할 때마다 피클 복사본을 돌려주므로, 읽기 전용 저장소는 cache_resource 로 한 번만 올린다.
+# 저장소 열기와 인덱스 준비는 Warmup 의 작업 스레드에서 하고, 준비가 끝나면 FoodDataset 이
+# food.csv 변경을 감시하면서 변경분만 반영한 새 버전으로 store 를 교체한다.
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _warmup(path):
+    # 캐시 miss 일 때만 실행됨 (hit 수 = load_store 호출 수 - miss 수)
+    perf.count('load_store_miss')
+    return Warmup(path)
+
+
+def start_warmup():
+    # app.py 가 첫 실행 때 호출해 준비를 시작한다. 이미 시작했으면 같은 Warmup 을 돌려줌
+    return _warmup(str(DATA_PATH))
+
+
+@st.fragment(run_every=LOADING_POLL_INTERVAL)
+def _loading_placeholder(warmup):
+    # 이 부분만 주기적으로 다시 그리다가 준비가 끝나면 페이지 전체를 다시 실행
+    if warmup.done:
+        st.rerun()
+    done, total = warmup.progress()
+    st.progress(done / total, text=f"데이터를 준비하는 중입니다... ({warmup.health()['elapsed_s']:.1f}초)")
+
+
+def load_store():
+    # 준비된 FoodStore. 파일이 없거나, 아직 준비 중이거나, 준비에 실패했으면 안내를 그리고 None
+    if not DATA_PATH.exists():
+        st.error("food.csv 파일을 찾을 수 없습니다. 파일을 현재 디렉토리에 업로드해주세요.")
+        return None
+    perf.count('load_store_calls')
+    warmup = start_warmup()
+    if warmup.ready:
+        return warmup.dataset.store
+    if warmup.error:
+        st.error(f"데이터를 불러오지 못했습니다: {warmup.error}")
+        return None
+    _loading_placeholder(warmup)
+    return None
+
+
+# --- 영양성분 기준 선택 (모든 페이지 공통, 사이드바) ---
+def select_basis(store):
+    # 선택한 기준으로 환산한 저장소 보기. 페이지를 옮겨도 유지되도록 위젯 밖의 키에 보관하고 URL 에는 ?basis=
+    options = list(BASES)
+    if restore('nutrient_basis', 'basis', options) is None:
+        st.session_state.nutrient_basis = NATIVE_BASIS
+    st.sidebar.radio(
+        '영양성분 기준', options, index=options.index(st.session_state.nutrient_basis), key='nutrient_basis_widget',
+        on_change=lambda: st.session_state.update(nutrient_basis=st.session_state.nutrient_basis_widget),
+    )
+    basis = st.session_state.nutrient_basis
+    publish({'basis': basis if basis != NATIVE_BASIS else None})
+    view = store.basis_view(basis)
+    if view is not store:
+        st.sidebar.caption(f"이 기준으로 환산할 수 있는 음식 {int((view.convertible & view.live).sum()):,}개 "
+                           f"(g ↔ ml 는 밀도를 모르므로 제외)")
+    return view
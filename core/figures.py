@@ -0,0 +1,29 @@
+import plotly.io as pio
+
+from core.cache import RESULT_TTL, ResultCache
+
+# --- 그래프 캐시 (모든 세션 공유) ---
+# 같은 (페이지, 선택, 데이터 버전) 이면 plotly 그림을 다시 만들지 않는다. px.bar 생성만 50ms 안팎이 든다.
+# 꺼낸 그림은 다른 세션과 공유하는 객체이므로 수정하면 안 된다.
+MAX_FIGURES = 256
+MAX_FIGURE_BYTES = 32 * 2**20
+
+
+def figure_nbytes(fig):
+    # 검증/직렬화는 한 번만 해서 크기를 기록해 둔다 (브라우저로 보내는 JSON 크기 = 예산 단위)
+    return len(pio.to_json(fig, validate=False))
+
+
+class FigureCache(ResultCache):
+    # LRU + TTL + 바이트 예산 (core.cache.ResultCache 와 같고 크기만 직렬화 길이로 잼)
+
+    def __init__(self, max_entries=MAX_FIGURES, max_bytes=MAX_FIGURE_BYTES, ttl=RESULT_TTL):
+        super().__init__('figure_cache', max_entries, max_bytes, ttl, sizeof=figure_nbytes)
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(page, selection, store, build):
+    # build() 는 캐시에 없을 때만 호출. 데이터가 바뀌면 store.version 이 달라져 자연히 새로 만든다
+    return figure_cache.get((page, selection, store.version), build)
@@ -0,0 +1,86 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.optimize import linprog
+
+from core.store import NUTRIENT_INDEX
+
+# --- 식단 자동 구성 ---
+# 후보 음식의 그램 수를 변수로 두고, 칼로리와 주요 영양소가 목표 ± 허용 오차 안에 들어오도록 하는 선형 계획.
+# 범위를 벗어난 만큼(목표 대비 비율) 을 벌점으로 최소화하므로 목표를 다 맞출 수 없어도 가장 가까운 해를 돌려준다.
+DEFAULT_TOLERANCE = 0.1
+DEFAULT_MAX_GRAMS = 300
+# 이 성분들은 권장량 이하면 충분 (상한만 적용)
+UPPER_LIMIT_NUTRIENTS = ('당류(g)', '나트륨(mg)')
+# 이보다 적은 양은 결과에서 뺌
+MIN_GRAMS = 5
+# 같은 오차라면 총 섭취량이 적은 해를 고르도록 하는 작은 가중치 (100g 당)
+MASS_PENALTY = 1e-4
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='meal-plan')
+
+
+def plan_meal(store, rows, targets, tolerance=DEFAULT_TOLERANCE, max_grams=DEFAULT_MAX_GRAMS, caps=None):
+    # rows: 후보 식품 ID, targets: {영양성분: 목표량}, caps: {식품 ID: 최대 그램} (max_grams 보다 우선)
+    # 돌려주는 값: {'grams': {식품 ID: 그램}, 'totals': 목표 성분별 합계, 'ok': 모두 범위 안인지, ...}
+    started = time.perf_counter()
+    rows = np.asarray(rows, dtype=np.int32)
+    cols = [NUTRIENT_INDEX[nutrient] for nutrient in targets]
+    goal = np.array(list(targets.values()), dtype=np.float64)
+
+    # 목표 성분 중 하나라도 결측인 음식은 0 으로 취급되면 공짜 영양소처럼 보이므로 후보에서 뺀다
+    values = np.asarray(store.nutrients[rows][:, cols], dtype=np.float64)
+    known = ~np.isnan(values).any(axis=1)
+    rows, values = rows[known], values[known]
+    if not len(rows):
+        return {'grams': {}, 'totals': dict.fromkeys(targets, 0.0), 'ok': False,
+                'status': '후보 음식이 없습니다.', 'n_candidates': 0, 'seconds': time.perf_counter() - started}
+
+    upper = np.array([nutrient in UPPER_LIMIT_NUTRIENTS for nutrient in targets])
+    n_foods, n_targets = len(rows), len(goal)
+    # 변수: x (음식별 100g 단위 양), over (상한 초과분), under (하한 미달분)
+    # 제약 (성분 i): A_i x - over_i <= (1+tol) t_i,  -A_i x - under_i <= -(1-tol) t_i
+    a = values.T / goal[:, None]
+    eye = np.eye(n_targets)
+    a_ub = np.block([
+        [a, -eye, np.zeros((n_targets, n_targets))],
+        [-a[~upper], np.zeros((int((~upper).sum()), n_targets)), -eye[~upper]],
+    ])
+    b_ub = np.concatenate([np.full(n_targets, 1 + tolerance), np.full(int((~upper).sum()), -(1 - tolerance))])
+    cost = np.concatenate([np.full(n_foods, MASS_PENALTY), np.ones(2 * n_targets)])
+
+    limit = np.full(n_foods, max_grams / 100)
+    for food_id, grams in (caps or {}).items():
+        limit[rows == food_id] = grams / 100
+    bounds = np.zeros((n_foods + 2 * n_targets, 2))
+    bounds[:n_foods, 1] = limit
+    bounds[n_foods:, 1] = np.inf
+
+    result = linprog(cost, A_ub=a_ub, b_ub=b_ub, bounds=bounds, method='highs')
+    if result.status != 0:
+        return {'grams': {}, 'totals': dict.fromkeys(targets, 0.0), 'ok': False,
+                'status': f'최적화 실패: {result.message}', 'n_candidates': n_foods,
+                'seconds': time.perf_counter() - started}
+
+    grams = np.round(result.x[:n_foods] * 100)
+    picked = grams >= MIN_GRAMS
+    plan = {int(food_id): int(g) for food_id, g in zip(rows[picked], grams[picked])}
+    totals = values[picked].T @ (grams[picked] / 100)
+    low = np.where(upper, -np.inf, goal * (1 - tolerance))
+    high = goal * (1 + tolerance)
+    # 반올림 때문에 경계에서 살짝 벗어나는 것은 허용
+    ok = bool(np.all((totals >= low - 0.01 * goal) & (totals <= high + 0.01 * goal)))
+    return {
+        'grams': plan,
+        'totals': dict(zip(targets, totals.tolist())),
+        'ok': ok,
+        'status': '모든 목표를 허용 오차 안에서 맞췄습니다.' if ok else '일부 목표는 후보 음식으로 맞출 수 없어 가장 가까운 조합을 찾았습니다.',
+        'n_candidates': n_foods,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def submit_meal_plan(store, rows, targets, **options):
+    # 페이지가 멈추지 않도록 작업 스레드에서 계산. concurrent.futures.Future 를 돌려준다
+    return _executor.submit(plan_meal, store, rows, targets, **options)
@@ -0,0 +1,196 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.store import CACHE_DIR
+
+# --- 성능 계측 (선택 사항) ---
+# FOOD_PERF=1 환경 변수 또는 ?perf=1 쿼리 파라미터로 켠다. 꺼져 있으면 stage() 는 아무것도 하지 않는다.
+PERF_DIR = Path(os.environ.get('FOOD_PERF_DIR', CACHE_DIR / 'perf'))
+RUNS_FILE = 'runs.jsonl'
+METRICS_FILE = 'metrics.prom'
+
+# 페이지별 rerun 지연 예산 (ms). 넘으면 디버그 패널에 경고로 표시
+LATENCY_BUDGETS_MS = {
+    'app': 100,
+    '1_카테고리_별_음식_탐색': 150,
+    '2_칼로리_Top10': 150,
+    '3_카테고리별_평균_칼로리': 150,
+    '4_칼로리_계산기': 250,
+    '5_음식_vs_음식_비교': 200,
+}
+DEFAULT_BUDGET_MS = 200
+
+_RUN_KEY = '_perf_run'
+_lock = threading.Lock()
+# 프로세스 전체(모든 세션) 누적 값
+_counters = {}
+_stage_totals = {}
+
+
+def enabled():
+    if 'perf' in st.query_params:
+        st.session_state._perf_enabled = st.query_params['perf'] == '1'
+    return st.session_state.get('_perf_enabled', os.environ.get('FOOD_PERF') == '1')
+
+
+def count(name, value=1):
+    # 프로세스 전체 카운터 (예: load_store 캐시 hit/miss)
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+class PerfRun:
+    # 한 번의 스크립트 실행(rerun) 동안의 단계별 시간 기록
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def add(self, name, seconds):
+        self.stages.append((name, seconds))
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+
+def start(page):
+    # 페이지 맨 위에서 호출. 계측이 꺼져 있으면 None
+    if not enabled():
+        st.session_state.pop(_RUN_KEY, None)
+        return None
+    run = PerfRun(page)
+    st.session_state[_RUN_KEY] = run
+    return run
+
+
+def stage(name):
+    # with perf.stage('필터'): ... 형태로 구간 시간을 잰다
+    run = st.session_state.get(_RUN_KEY)
+    if run is None:
+        return nullcontext()
+    return _timed(run, name)
+
+
+@contextmanager
+def _timed(run, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add(name, time.perf_counter() - started)
+
+
+def deep_sizeof(obj, _seen=None):
+    # 세션 상태 객체의 대략적인 메모리 사용량 (numpy/pandas 는 실제 버퍼 크기 포함)
+    _seen = set() if _seen is None else _seen
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        return int(np.sum(obj.memory_usage(deep=True)))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, _seen) for v in obj)
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, s), _seen) for s in obj.__slots__ if hasattr(obj, s))
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), _seen)
+    return size
+
+
+def session_memory():
+    return {
+        key: deep_sizeof(value) for key, value in st.session_state.items()
+        if not str(key).startswith('_perf') and not str(key).startswith('FormSubmitter')
+    }
+
+
+def finish(run):
+    # 페이지 맨 끝에서 호출: 누적 통계 갱신, 파일 내보내기, 사이드바 디버그 패널 표시
+    if run is None:
+        return
+    total_ms = run.total_ms()
+    memory = session_memory()
+    record = {
+        'ts': time.time(), 'page': run.page, 'total_ms': round(total_ms, 3),
+        'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in run.stages},
+        'session_bytes': memory, 'counters': dict(_counters),
+    }
+    with _lock:
+        for name, seconds in run.stages + [('total', total_ms / 1000)]:
+            stats = _stage_totals.setdefault((run.page, name), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+        _export(record)
+    _render_panel(run, total_ms, memory)
+
+
+def _export(record):
+    try:
+        PERF_DIR.mkdir(parents=True, exist_ok=True)
+        with open(PERF_DIR / RUNS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        (PERF_DIR / METRICS_FILE).write_text(prometheus_text(), encoding='utf-8')
+    except OSError:
+        pass
+
+
+def prometheus_text():
+    lines = [
+        '# HELP food_rerun_stage_seconds Time spent per page stage in script reruns.',
+        '# TYPE food_rerun_stage_seconds summary',
+    ]
+    for (page, name), (n, total, _) in sorted(_stage_totals.items()):
+        labels = f'page="{page}",stage="{name}"'
+        lines.append(f'food_rerun_stage_seconds_count{{{labels}}} {n}')
+        lines.append(f'food_rerun_stage_seconds_sum{{{labels}}} {total:.6f}')
+    lines += ['# HELP food_rerun_stage_seconds_max Slowest observed stage.',
+              '# TYPE food_rerun_stage_seconds_max gauge']
+    for (page, name), (_, _, worst) in sorted(_stage_totals.items()):
+        lines.append(f'food_rerun_stage_seconds_max{{page="{page}",stage="{name}"}} {worst:.6f}')
+    lines += ['# HELP food_events_total Process-wide event counters.', '# TYPE food_events_total counter']
+    for name, value in sorted(_counters.items()):
+        lines.append(f'food_events_total{{event="{name}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _render_panel(run, total_ms, memory):
+    budget = LATENCY_BUDGETS_MS.get(run.page, DEFAULT_BUDGET_MS)
+    with st.sidebar.expander('⏱️ 성능 디버그', expanded=True):
+        message = f'이번 rerun: **{total_ms:,.1f} ms** (예산 {budget} ms)'
+        if total_ms > budget:
+            st.error(message)
+        else:
+            st.success(message)
+        if run.stages:
+            st.dataframe(pd.DataFrame(
+                {'단계': [name for name, _ in run.stages],
+                 'ms': [round(seconds * 1000, 2) for _, seconds in run.stages]}
+            ), hide_index=True)
+        misses = _counters.get('load_store_miss', 0)
+        hits = _counters.get('load_store_calls', 0) - misses
+        st.caption(f'load_store 캐시: hit {hits} / miss {misses}')
+        for label, name in [('그래프 캐시', 'figure_cache'), ('결과 캐시', 'result_cache')]:
+            cache_hits, cache_misses = _counters.get(f'{name}_hit', 0), _counters.get(f'{name}_miss', 0)
+            if cache_hits or cache_misses:
+                st.caption(f'{label}: hit {cache_hits} / miss {cache_misses} '
+                           f'(적중률 {cache_hits / (cache_hits + cache_misses):.0%})')
+        heavy = sorted(memory.items(), key=lambda item: -item[1])[:5]
+        if heavy:
+            st.caption('세션 상태 메모리: ' + ', '.join(f'{key} {size / 1024:,.1f} KB' for key, size in heavy))
+        st.caption(f'내보내기: {PERF_DIR / RUNS_FILE}, {PERF_DIR / METRICS_FILE}')
@@ -0,0 +1,38 @@
+import streamlit as st
+
+# --- URL 쿼리 파라미터 ↔ 페이지 상태 ---
+# 페이지의 선택 상태를 st.query_params 에 그대로 적어 두어 새로고침이나 공유한 링크로 같은 화면을 연다.
+# 세션에 아직 값이 없을 때(새 세션, 다른 페이지에서 넘어옴) 만 URL 값을 위젯 상태로 넣으므로, 딥 링크는
+# 위젯을 하나씩 다시 고르는 과정 없이 첫 실행에서 바로 복원된다. 기본값인 파라미터는 URL 에 적지 않는다.
+
+
+def restore(key, param, options=None, parse=str):
+    # 위젯을 만들기 전에 호출. options 를 주면 그 안에 없는 값(URL 을 고쳐 쓴 경우, 상위 선택이 바뀐 경우) 은
+    # 버려서 위젯 기본값으로 돌아가게 한다. 현재 값(없으면 None) 을 돌려줌
+    if key not in st.session_state and param in st.query_params:
+        try:
+            st.session_state[key] = parse(st.query_params[param])
+        except (TypeError, ValueError):
+            pass
+    if options is not None and key in st.session_state and st.session_state[key] not in options:
+        del st.session_state[key]
+    return st.session_state.get(key)
+
+
+def publish(params):
+    # {파라미터: 값} 을 URL 에 반영하고 정규화한 쿼리를 돌려준다 (값이 None 이면 URL 에서 뺌).
+    # 바뀐 파라미터만 보내 매 실행마다 브라우저 주소를 다시 쓰지 않게 하고, 다른 파라미터(?perf=1 등) 는 그대로 둔다
+    for param, value in params.items():
+        text = None if value is None else str(value)
+        if st.query_params.get(param) == text:
+            continue
+        if text is None:
+            del st.query_params[param]
+        else:
+            st.query_params[param] = text
+    return canonical(params)
+
+
+def canonical(params):
+    # 결과 캐시 키로 쓰는 정규화 쿼리: 순서와 무관하게, 기본값(None) 은 빼고
+    return tuple(sorted((param, str(value)) for param, value in params.items() if value is not None))
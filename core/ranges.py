@@ -0,0 +1,131 @@
+import numpy as np
+
+# --- 영양성분 범위 필터 ---
+# 컬럼마다 값 순서로 정렬한 행 번호(정렬 인덱스) 와, 그 정렬 순서의 BUCKETS 등분 지점까지의 행을 담은
+# 누적 비트맵(range encoding) 을 만들어 둔다. 조건 하나는 searchsorted 두 번으로 정렬 순서의 구간 [a, b) 가 되고,
+# - 가장 좁은 구간(또는 카테고리 행) 이 작으면 그 후보 행에서만 나머지 조건의 값을 확인하고 (희소 경로)
+# - 모두 넓으면 구간마다 누적 비트맵 두 개 + 경계 조각으로 비트맵을 만들어 AND 한다 (밀집 경로).
+# 어느 쪽이든 행 수 × 조건 수에 비례하는 전체 비교는 하지 않는다.
+BUCKETS = 16
+# 후보가 전체의 1/SPARSE_RATIO 이하이면 희소 경로
+SPARSE_RATIO = 32
+
+
+def row_bits(rows, nbytes):
+    # 행 번호 배열 → 비트맵 (uint8, 행 i 는 i // 8 번째 바이트의 i % 8 번째 비트). 같은 바이트의 비트는 서로 달라 합 = OR
+    rows = np.asarray(rows, dtype=np.int64)
+    weights = np.left_shift(1, rows & 7)
+    return np.bincount(rows >> 3, weights=weights, minlength=nbytes).astype(np.uint8)
+
+
+class _ColumnIndex:
+    __slots__ = ('values', 'order', 'sorted_values', 'positions', 'prefix')
+
+    def __init__(self, values, nbytes, order=None):
+        # order 를 주면 (증분 갱신) 정렬을 건너뛰고 누적 비트맵만 만든다
+        self.values = values
+        if order is None:
+            valid = np.flatnonzero(~np.isnan(values))
+            order = valid[np.argsort(values[valid], kind='stable')].astype(np.int32)
+        self.order = order
+        self.sorted_values = values[order]
+        # prefix[j] = 정렬 순서의 처음 positions[j] 개 행 (결측은 어느 비트맵에도 없음)
+        self.positions = np.linspace(0, len(order), BUCKETS + 1).astype(np.int64)
+        self.prefix = np.zeros((BUCKETS + 1, nbytes), dtype=np.uint8)
+        for j in range(1, BUCKETS + 1):
+            self.prefix[j] = self.prefix[j - 1] | row_bits(order[self.positions[j - 1]:self.positions[j]], nbytes)
+
+    def patched(self, values, changed, nbytes):
+        # 바뀐 행을 정렬 순서에서 빼고, 새 값으로 정렬해 제자리에 끼워 넣는다 (나머지 행의 값과 순서는 그대로)
+        kept = self.order[~np.isin(self.order, changed)]
+        moved = changed[~np.isnan(values[changed])]
+        moved = moved[np.argsort(values[moved], kind='stable')]
+        at = np.searchsorted(values[kept], values[moved], side='right')
+        return _ColumnIndex(values, nbytes, np.insert(kept, at, moved).astype(np.int32))
+
+    def span(self, low, high):
+        # low <= 값 <= high 인 행들의 정렬 순서 구간 [a, b). None 은 열린 끝
+        a = 0 if low is None else int(np.searchsorted(self.sorted_values, np.float32(low), side='left'))
+        b = len(self.order) if high is None else int(np.searchsorted(self.sorted_values, np.float32(high), side='right'))
+        return a, max(a, b)
+
+    def prefix_bits(self, x, nbytes):
+        # 정렬 순서의 처음 x 개 행 비트맵: 가장 가까운 아래쪽 누적 비트맵 + 나머지 조각
+        j = int(np.searchsorted(self.positions, x, side='right')) - 1
+        bits = self.prefix[j]
+        if x > self.positions[j]:
+            bits = bits | row_bits(self.order[self.positions[j]:x], nbytes)
+        return bits
+
+
+class NutrientRangeIndex:
+
+    def __init__(self, store):
+        self.n_rows = store.n_rows
+        self.nbytes = (store.n_rows + 7) // 8
+        self.live = store.live
+        self._live_bits = row_bits(np.flatnonzero(store.live), self.nbytes)
+        self._columns = {
+            col: _ColumnIndex(np.asarray(store.column(col), dtype=np.float32), self.nbytes)
+            for col in store.nutrient_cols
+        }
+
+    def patch(self, store, changed):
+        # 증분 갱신: 컬럼마다 바뀐 행(수정/추가/삭제) 만 정렬 순서에 다시 넣고 누적 비트맵을 만든다 (전체 정렬 없음)
+        new = object.__new__(NutrientRangeIndex)
+        new.n_rows = store.n_rows
+        new.nbytes = (store.n_rows + 7) // 8
+        new.live = store.live
+        new._live_bits = row_bits(np.flatnonzero(store.live), new.nbytes)
+        changed = np.asarray(changed, dtype=np.int32)
+        new._columns = {
+            col: index.patched(np.asarray(store.column(col), dtype=np.float32), changed, new.nbytes)
+            for col, index in self._columns.items()
+        }
+        return new
+
+    def query(self, predicates, rows=None):
+        # predicates: {영양성분: (최소, 최대)} (None 은 제한 없음, 양끝 포함), rows: 카테고리 등 미리 좁힌 행 (오름차순).
+        # 모든 조건을 만족하는 살아 있는 행 번호 (오름차순 int32). 값이 결측인 행은 조건을 만족하지 않는 것으로 본다.
+        # 양끝이 모두 열린 조건은 제한이 없으므로 뺀다
+        spans = [(self._columns[col], low, high, *self._columns[col].span(low, high))
+                 for col, (low, high) in predicates.items() if low is not None or high is not None]
+        if not spans:
+            return np.asarray(rows if rows is not None else np.flatnonzero(self.live), dtype=np.int32)
+        driver = min(spans, key=lambda span: span[4] - span[3])
+        driver_size = driver[4] - driver[3]
+        if driver_size == 0 or (rows is not None and len(rows) == 0):
+            return np.empty(0, dtype=np.int32)
+
+        if rows is not None and len(rows) <= driver_size:
+            candidates, checks = np.asarray(rows, dtype=np.int32), spans
+        elif driver_size <= self.n_rows // SPARSE_RATIO:
+            candidates = np.sort(driver[0].order[driver[3]:driver[4]])
+            checks = [span for span in spans if span is not driver]
+            if rows is not None:
+                candidates = candidates[np.isin(candidates, rows, assume_unique=True)]
+        else:
+            return self._dense(spans, rows)
+
+        # 희소 경로: 후보 행의 값만 확인
+        keep = self.live[candidates]
+        for column, low, high, _, _ in checks:
+            values = column.values[candidates]
+            if low is not None:
+                keep &= values >= np.float32(low)
+            if high is not None:
+                keep &= values <= np.float32(high)
+        return candidates[keep]
+
+    def _dense(self, spans, rows):
+        bits = self._live_bits.copy()
+        if rows is not None:
+            bits &= row_bits(rows, self.nbytes)
+        for column, _, _, a, b in spans:
+            bits &= column.prefix_bits(b, self.nbytes) & ~column.prefix_bits(a, self.nbytes)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows, bitorder='little')).astype(np.int32)
+
+    def bounds(self, col):
+        # (최솟값, 최댓값) (값이 하나도 없으면 None)
+        values = self._columns[col].sorted_values
+        return (float(values[0]), float(values[-1])) if len(values) else None
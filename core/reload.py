@@ -0,0 +1,269 @@
+import hashlib
+import io
+import logging
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.basis import basis_factors
+from core.store import (
+    CODE_COLS, TEXT_COLS, WARM_INDEXES, FoodStore, _code_dtype, detect_encoding, file_signature, hash_key,
+    identity_hashes, parse_csv,
+)
+
+# --- food.csv 증분 갱신 ---
+# 새 food.csv 를 줄 단위 해시로 현재 버전과 비교해 바뀐 줄만 파싱하고, 식품 키(식품코드 또는 식별 컬럼 해시) 로
+# 기존 행과 짝지어 같은 식품 ID 자리에 덮어쓴다. 사라진 행은 ID 를 비워 둔 채 삭제 표시만 하고, 새 행은 끝에 붙인다.
+# 그래서 살아 있는 세션이 들고 있는 식품 ID(장바구니, 선택 위젯) 는 갱신 후에도 같은 음식을 가리킨다.
+WATCH_INTERVAL = 2.0
+LOGGER = logging.getLogger(__name__)
+# 장바구니 등에 남아 있는 삭제된 행을 위해 유지하는 이전 라벨 표시
+REMOVED_SUFFIX = ' (삭제됨)'
+
+
+def split_lines(data):
+    # (헤더, 데이터 줄 목록). 따옴표 안 줄바꿈이 없는 내보내기 파일 기준
+    lines = data.split(b'\n')
+    header = lines[0].rstrip(b'\r')
+    body = [line.rstrip(b'\r') for line in lines[1:]]
+    while body and not body[-1].strip():
+        body.pop()
+    return header, body
+
+
+def line_hashes(lines):
+    return np.fromiter((hash(line) for line in lines), dtype=np.int64, count=len(lines))
+
+
+def index_rows(store, path):
+    # 방금 연 저장소의 줄 해시를 채운다. 그 사이 파일이 바뀌었거나 줄 수가 행 수와 다르면 비워 둔다 (전체 비교)
+    data = Path(path).read_bytes()
+    if hashlib.sha1(data).hexdigest() != store.meta['sha1']:
+        return store
+    header, body = split_lines(data)
+    if len(body) == store.n_rows:
+        store.header, store.row_hashes = header, line_hashes(body)
+    return store
+
+
+def _occurrence_keys(hashes):
+    # 같은 줄이 여러 번 나오면 등장 순번을 섞어 서로 다른 값으로 만든다
+    occurrence = pd.Series(hashes).groupby(hashes, sort=False).cumcount().to_numpy(dtype=np.int64)
+    with np.errstate(over='ignore'):
+        return hashes ^ (occurrence * np.int64(-7046029254386353131))
+
+
+def _matched(old_hashes, old_rows, new_hashes):
+    # 줄 해시를 개수까지 맞춰 비교한다. (사라진 기존 행, 새로 생긴 줄 번호)
+    old_keys, new_keys = _occurrence_keys(old_hashes), _occurrence_keys(new_hashes)
+    removed = old_rows[~np.isin(old_keys, new_keys)]
+    added = np.flatnonzero(~np.isin(new_keys, old_keys))
+    return removed, added
+
+
+def patch_store(store, path):
+    # store 에 path 의 변경분만 반영한 새 FoodStore 와 변경 통계를 돌려준다. 내용이 같으면 (store, None).
+    # 기존 store 와 그 인덱스는 건드리지 않으므로 실행 중인 세션은 끝까지 이전 버전을 일관되게 본다.
+    started = time.perf_counter()
+    path = Path(path)
+    signature = file_signature(path)
+    data = path.read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == store.meta['sha1']:
+        return store, None
+
+    header, body = split_lines(data)
+    hashes = line_hashes(body)
+    live_rows = np.flatnonzero(store.live)
+    if store.row_hashes is not None and header == store.header:
+        removed, added = _matched(store.row_hashes[live_rows], live_rows, hashes)
+    else:
+        # 비교 기준이 없으면 모든 줄을 바뀐 것으로 보고 식품 키로만 짝짓는다
+        removed, added = live_rows, np.arange(len(body))
+
+    # 바뀐 줄만 작은 CSV 로 다시 묶어 같은 파서로 읽는다
+    batch_nutrients, batch_codes, batch_categories = parse_csv(
+        io.BytesIO(b'\n'.join([header] + [body[i] for i in added])), encoding=detect_encoding(path))
+    batch_keys = _batch_keys(batch_codes, batch_categories)
+
+    # 사라진 행의 키 → 행 번호 (같은 키가 여러 번이면 행 번호 순서대로 소비)
+    old_keys = store.food_keys
+    has_code = np.asarray(store.codes('식품코드'))[removed] >= 0
+    free = {}
+    for row, coded in zip(removed.tolist(), has_code.tolist()):
+        key = old_keys[row]
+        free.setdefault(key if coded else int(key[:16], 16), []).append(row)
+    target = np.empty(len(added), dtype=np.int64)
+    new_keys = []
+    next_row = store.n_rows
+    key_index = dict(store.key_index)
+    for i, (base, key) in enumerate(batch_keys):
+        rows = free.get(base)
+        if rows:
+            target[i] = rows.pop(0)
+            continue
+        # 짝이 없으면 새 ID. 식품코드가 없으면 기존 키와 겹치지 않는 등장 순번을 붙인다
+        if key is None:
+            n = 0
+            while hash_key(base, n) in key_index:
+                n += 1
+            key = hash_key(base, n)
+        target[i] = next_row
+        key_index[key] = next_row
+        new_keys.append(key)
+        next_row += 1
+    tombstones = np.array(sorted(row for rows in free.values() for row in rows), dtype=np.int64)
+    n_rows = next_row
+    grow = n_rows - store.n_rows
+
+    # --- 컬럼 저장소 ---
+    nutrients = np.empty((n_rows, store.nutrients.shape[1]), dtype=np.float32, order='F')
+    nutrients[:store.n_rows] = store.nutrients
+    nutrients[target] = batch_nutrients
+    codes, categories = {}, {}
+    for col in TEXT_COLS:
+        cats = list(store.categories(col))
+        lookup = {value: code for code, value in enumerate(cats)}
+        local = np.empty(len(batch_categories[col]) + 1, dtype=np.int64)
+        for i, value in enumerate(batch_categories[col]):
+            if value not in lookup:
+                lookup[value] = len(cats)
+                cats.append(value)
+            local[i] = lookup[value]
+        local[-1] = -1
+        col_codes = np.concatenate([store.codes(col), np.full(grow, -1)]).astype(_code_dtype(len(cats)))
+        col_codes[target] = local[batch_codes[col]]
+        codes[col], categories[col] = col_codes, cats
+    for col in CODE_COLS:
+        col_codes = np.concatenate([store.codes(col), np.full(grow, -1, dtype=np.int32)])
+        col_codes[target] = batch_codes[col]
+        codes[col] = col_codes
+    live = np.concatenate([store.live, np.ones(grow, dtype=bool)])
+    live[tombstones] = False
+
+    meta = {**store.meta, 'source': str(path), 'sha1': digest, 'mtime_ns': signature[0], 'size': signature[1],
+            'n_rows': n_rows, 'live_rows': int(live.sum())}
+    new = FoodStore(nutrients, codes, categories, meta, live=live)
+    new.header = header
+    new.row_hashes = np.concatenate([store.row_hashes if store.row_hashes is not None and header == store.header
+                                     else np.zeros(store.n_rows, dtype=np.int64), np.zeros(grow, dtype=np.int64)])
+    new.row_hashes[target] = hashes[added]
+    new.row_hashes[tombstones] = 0
+
+    # --- 파생 인덱스: 바뀐 행만 반영 ---
+    changed = np.union1d(target, tombstones).astype(np.int32)
+    cache = new.__dict__
+    matrix = np.concatenate([store.nutrient_matrix, np.zeros((grow, nutrients.shape[1]), dtype=np.float32)])
+    matrix[target] = np.nan_to_num(batch_nutrients, nan=0.0)
+    cache['nutrient_matrix'] = matrix
+    cache['food_keys'] = old_keys + new_keys
+    cache['key_index'] = key_index
+    cache['food_labels'] = _patched_labels(store, new, changed)
+    tree, paths = store.category_tree.patch(store, new, changed)
+    cache['category_tree'] = tree
+    cache['aggregates'] = store.aggregates.patch(new, tree, paths)
+    cache['search'] = store.search.patch(new)
+    cache['similar'] = store.similar.patch(new, changed)
+    cache['basis_factors'] = basis_factors(new)
+    cache['ranges'] = store.ranges.patch(new, changed)
+    # 세션이 이미 쓰고 있던 영양성분 기준 보기와 정렬 순위도 여기(감시 스레드) 에서 갱신해 두어
+    # 교체 후 첫 실행이 스크립트 스레드에서 다시 만들지 않게 한다
+    for basis, old_view in list(store._views.items()):
+        view = new.basis_view(basis)
+        if 'aggregates' in old_view.__dict__:
+            view.__dict__['aggregates'] = old_view.aggregates.patch(view, tree, paths)
+        if 'ranges' in old_view.__dict__:
+            view.__dict__['ranges'] = old_view.ranges.patch(view, changed)
+        if 'nutrient_matrix' in old_view.__dict__:
+            getattr(view, 'nutrient_matrix')
+        for col, descending in list(old_view._ranks):
+            view.sort_rank(col, descending)
+    for col, descending in list(store._ranks):
+        new.sort_rank(col, descending)
+    return new, {'updated': int((target < store.n_rows).sum()), 'added': grow,
+                 'removed': len(tombstones), 'seconds': time.perf_counter() - started}
+
+
+def _batch_keys(codes, categories):
+    # 바뀐 줄마다 (짝지을 기준, 새 식품 키 또는 None). 식품코드가 있으면 그것이 곧 키
+    hashes = identity_hashes(codes, categories).tolist()
+    food_codes = categories['식품코드']
+    keys = []
+    for h, code in zip(hashes, codes['식품코드'].tolist()):
+        keys.append((food_codes[code], food_codes[code]) if code >= 0 else (h, None))
+    return keys
+
+
+def _patched_labels(old, new, changed):
+    # 바뀐 행과 같은 식품명을 가진 행들만 라벨을 다시 만든다
+    labels = old.food_labels + [None] * (new.n_rows - old.n_rows)
+    name_codes = np.asarray(new.codes('식품명'))
+    touched = np.union1d(name_codes[changed], np.asarray(old.codes('식품명'))[changed[changed < old.n_rows]])
+    rows = np.flatnonzero(np.isin(name_codes, touched) & new.live)
+    new.label_rows(rows, labels)
+    for row in changed[~new.live[changed]].tolist():
+        if not labels[row].endswith(REMOVED_SUFFIX):
+            labels[row] += REMOVED_SUFFIX
+    return labels
+
+
+class FoodDataset:
+    # 현재 버전의 FoodStore 를 들고 있다가 food.csv 가 바뀌면 변경분만 반영한 새 버전으로 교체한다.
+    # 교체는 속성 대입 한 번이라 원자적이며, 이미 store 를 받아 간 실행은 이전 버전을 끝까지 쓴다.
+
+    def __init__(self, path, interval=WATCH_INTERVAL, timings=None, indexes=WARM_INDEXES):
+        # indexes: 여기서 미리 만들 파생 인덱스 (나머지는 처음 쓸 때).
+        # timings 를 주면 저장소 열기와 인덱스별 준비 시간(초) 을 채움
+        timings = {} if timings is None else timings
+        self.path = Path(path)
+        self.interval = interval
+        self.signature = file_signature(self.path)
+        started = time.perf_counter()
+        store = FoodStore.open(self.path)
+        timings['open'] = time.perf_counter() - started
+        self.store = store.warm(timings, indexes)
+        self.history = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._watch, name='food-csv-watcher', daemon=True)
+        self._thread.start()
+
+    def _watch(self):
+        index_rows(self.store, self.path)
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except (OSError, ValueError, KeyError, pd.errors.ParserError) as exc:
+                # 파일을 쓰는 도중이면 다음 주기에 다시 시도
+                self.history.append({'ts': time.time(), 'error': repr(exc)})
+            except Exception as exc:
+                # 예상하지 못한 실패도 감시를 끝내지 않는다. 같은 파일로 매 주기 실패하지 않도록 파일이 다시 바뀔 때까지 대기
+                LOGGER.exception('food.csv 갱신 실패: %s', self.path)
+                self.history.append({'ts': time.time(), 'error': repr(exc)})
+                try:
+                    self.signature = file_signature(self.path)
+                except OSError:
+                    pass
+
+    def check(self):
+        try:
+            signature = file_signature(self.path)
+        except FileNotFoundError:
+            return False
+        if signature == self.signature:
+            return False
+        return self.reload(signature)
+
+    def reload(self, signature=None):
+        with self._lock:
+            signature = signature or file_signature(self.path)
+            store, stats = patch_store(self.store, self.path)
+            self.signature = signature
+            if stats is None:
+                return False
+            self.store = store
+            self.history.append({'ts': time.time(), 'version': store.version, **stats})
+            return True
@@ -0,0 +1,262 @@
+import html
+import importlib.util
+import os
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from core.cart import cart_nutrients
+from core.store import CACHE_DIR, NUTRIENT_COLS
+
+# --- 섭취 보고서 ---
+# 저장해 둔 장바구니(하루 식단) 여러 개를 모아 식단별 항목표, 합계, 권장량 대비 비율, 그래프를 파일로 만든다.
+# 만드는 일은 작업 스레드 큐에서 하고, 결과는 세션이 아닌 REPORT_DIR 의 임시 파일에 둔다.
+# 페이지는 진행 상황만 주기적으로 확인하다가 끝나면 그 파일 경로로 내려받기 버튼을 그린다.
+REPORT_DIR = CACHE_DIR / 'reports'
+# 보고서 파일 보관 시간 (초). 새 보고서를 만들 때 이보다 오래된 파일을 지움
+REPORT_TTL = 3600.0
+# 보고서 작업 스레드 수. 한 번에 하나씩 만들어 다른 세션의 rerun 과 CPU 를 덜 다투게 함
+REPORT_WORKERS = 1
+# 표와 그래프에 쓰는 주요 성분 (CSV/XLSX 의 합계는 모든 성분)
+REPORT_COLS = ['에너지(kcal)', '탄수화물(g)', '단백질(g)', '지방(g)', '당류(g)', '나트륨(mg)']
+# PDF 에서 한글을 그릴 수 있는 글꼴 후보
+PDF_FONTS = ['NanumGothic', 'Noto Sans CJK KR', 'Noto Sans KR', 'Malgun Gothic', 'AppleGothic']
+
+# 형식 → (설명, MIME, 필요한 선택 패키지)
+FORMATS = {
+    'csv': ('CSV (표만)', 'text/csv', None),
+    'html': ('HTML (표 + 대화형 그래프)', 'text/html', None),
+    'xlsx': ('Excel (시트별 표 + 차트)', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+             'xlsxwriter'),
+    'pdf': ('PDF (표 + 그래프)', 'application/pdf', 'matplotlib'),
+}
+
+_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix='report')
+_lock = threading.Lock()
+_queued = 0
+
+
+def available_formats():
+    # 선택 패키지가 설치된 형식만
+    return [fmt for fmt, (_, _, package) in FORMATS.items()
+            if package is None or importlib.util.find_spec(package) is not None]
+
+
+# --- 보고서 데이터 ---
+def cart_table(store, ids, grams):
+    # 식단 하나의 (항목표: 식품명, 그램, 성분별 값, 전체 성분 합계 배열)
+    values, total = cart_nutrients(store.nutrient_matrix, ids, grams)
+    frame = pd.DataFrame(values, columns=NUTRIENT_COLS).astype('float64').round(2)
+    frame.insert(0, '그램(g)', np.asarray(grams, dtype=np.float64).round(1))
+    frame.insert(0, '식품명', [store.food_labels[food_id] for food_id in ids.tolist()])
+    return frame, total
+
+
+def summary_tables(names, totals, targets):
+    # targets: {영양성분: 권장량}. (식단 × 전체 성분 합계표, 식단 × 권장 성분 비율(%) 표). 식단이 여럿이면 '평균' 행 추가
+    summary = pd.DataFrame(np.asarray(totals, dtype=np.float64).reshape(len(names), len(NUTRIENT_COLS)),
+                           index=pd.Index(names, name='식단'), columns=NUTRIENT_COLS).round(2)
+    if len(names) > 1:
+        summary.loc['평균'] = summary.mean().round(2)
+    ratio = (summary[list(targets)] / pd.Series(targets) * 100).round(1)
+    return summary, ratio
+
+
+# --- 형식별 작성 ---
+def _write_csv(path, items, summary, ratio, step):
+    # 한 파일: 식단별 항목 줄 + 식단마다 '합계' 줄 (Excel 에서 바로 열리도록 BOM 이 붙은 UTF-8)
+    blocks = []
+    for name, frame in items:
+        total = summary.loc[[name]].reset_index(drop=True)
+        total.insert(0, '그램(g)', frame['그램(g)'].sum())
+        total.insert(0, '식품명', '합계')
+        blocks.append(pd.concat([frame, total], ignore_index=True).assign(식단=name))
+        step()
+    table = pd.concat(blocks, ignore_index=True)
+    table = table[['식단'] + [col for col in table.columns if col != '식단']]
+    table.to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def _figures(summary, ratio):
+    days = summary.drop(index='평균', errors='ignore')
+    kcal = px.bar(days.reset_index(), x='식단', y='에너지(kcal)', title='식단별 총 칼로리')
+    share = ratio.loc['평균' if '평균' in ratio.index else ratio.index[0]]
+    intake = px.bar(x=share.index, y=share.values, title='권장 섭취량 대비 비율 (%)',
+                    labels={'x': '영양성분', 'y': '%'})
+    intake.add_hline(y=100, line_dash='dash')
+    return [kcal, intake]
+
+
+def _write_html(path, items, summary, ratio, step):
+    parts = ['<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>식단 보고서</title></head><body>',
+             '<h1>식단 보고서</h1>', '<h2>식단별 합계</h2>', summary[REPORT_COLS].to_html(),
+             '<h2>권장 섭취량 대비 (%)</h2>', ratio.to_html()]
+    for i, fig in enumerate(_figures(summary, ratio)):
+        # plotly.js 는 한 번만 (CDN)
+        parts.append(fig.to_html(full_html=False, include_plotlyjs='cdn' if i == 0 else False))
+    for name, frame in items:
+        parts += [f'<h2>{html.escape(name)}</h2>', frame[['식품명', '그램(g)'] + REPORT_COLS].to_html(index=False)]
+        step()
+    parts.append('</body></html>')
+    Path(path).write_text('\n'.join(parts), encoding='utf-8')
+
+
+def _write_xlsx(path, items, summary, ratio, step):
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        summary.to_excel(writer, sheet_name='요약')
+        ratio.to_excel(writer, sheet_name='권장량 대비(%)')
+        # 요약 시트 아래에 식단별 칼로리 차트 (엑셀이 그리는 차트라 데이터와 함께 갱신됨)
+        days = len(summary.drop(index='평균', errors='ignore'))
+        chart = writer.book.add_chart({'type': 'column'})
+        chart.add_series({'name': '에너지(kcal)', 'categories': ['요약', 1, 0, days, 0],
+                          'values': ['요약', 1, 1, days, 1]})
+        chart.set_title({'name': '식단별 총 칼로리'})
+        writer.sheets['요약'].insert_chart(len(summary) + 3, 0, chart)
+        for i, (name, frame) in enumerate(items):
+            # 시트 이름은 31자, 일부 문자 금지, 작은따옴표로 시작하거나 끝날 수 없음
+            sheet = f'{i + 1}. ' + ''.join(ch for ch in name if ch not in '[]:*?/\\')[:26].strip("'")
+            frame.to_excel(writer, sheet_name=sheet, index=False)
+            step()
+
+
+def _write_pdf(path, items, summary, ratio, step):
+    # 선택 패키지라 여기서 import. pyplot 은 스레드에 안전하지 않으므로 Figure 객체를 직접 만든다
+    import matplotlib
+    from matplotlib import font_manager
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    installed = {font.name for font in font_manager.fontManager.ttflist}
+    rc = {'font.family': [font for font in PDF_FONTS if font in installed] or ['sans-serif'],
+          'axes.unicode_minus': False}
+    # 한글 글꼴이 없는 서버에서는 글자마다 나오는 경고 대신 빈 칸으로 그림
+    with warnings.catch_warnings(), matplotlib.rc_context(rc), PdfPages(path) as pdf:
+        warnings.filterwarnings('ignore', message='Glyph .* missing')
+        fig = Figure(figsize=(8.27, 11.69))
+        top, bottom = fig.subplots(2, 1)
+        days = summary.drop(index='평균', errors='ignore')
+        top.bar(days.index.astype(str), days['에너지(kcal)'])
+        top.set_title('식단별 총 칼로리 (kcal)')
+        share = ratio.loc['평균' if '평균' in ratio.index else ratio.index[0]]
+        bottom.bar(share.index, share.values)
+        bottom.axhline(100, linestyle='--', color='gray')
+        bottom.set_title('권장 섭취량 대비 비율 (%)')
+        pdf.savefig(fig)
+        pages = [(name, frame[['식품명', '그램(g)'] + REPORT_COLS]) for name, frame in items]
+        for i, (title, frame) in enumerate([('식단별 합계', summary[REPORT_COLS].reset_index())] + pages):
+            fig = Figure(figsize=(11.69, 8.27))
+            ax = fig.subplots()
+            ax.axis('off')
+            ax.set_title(title)
+            table = ax.table(cellText=frame.astype(str).values, colLabels=list(frame.columns), loc='upper center')
+            # 글자 크기 자동 맞춤은 칸마다 글자 폭을 다시 재서 페이지당 수백 ms 가 듦
+            table.auto_set_font_size(False)
+            table.set_fontsize(7)
+            pdf.savefig(fig)
+            if i:
+                step()
+
+
+WRITERS = {'csv': _write_csv, 'html': _write_html, 'xlsx': _write_xlsx, 'pdf': _write_pdf}
+
+
+# --- 작업 큐 ---
+class ReportJob:
+    # 세션에는 이 작은 객체만 둔다 (파일 내용은 디스크에)
+
+    def __init__(self, fmt, n_carts):
+        self.fmt = fmt
+        self.file_name = f"식단보고서_{time.strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        self.mime = FORMATS[fmt][1]
+        # 단계: 식단별 표 계산 + 식단별 파일 쓰기 + 마무리
+        self.total = 2 * n_carts + 1
+        self.steps = 0
+        self.path = None
+        self.nbytes = 0
+        self.seconds = None
+        self.future = None
+
+    def done(self):
+        return self.future.done()
+
+    def step(self):
+        self.steps += 1
+
+    def progress(self):
+        return min(self.steps / self.total, 1.0)
+
+    def result(self):
+        # 완성된 파일 경로 (실패했으면 작업 스레드의 예외를 다시 던짐)
+        return self.future.result()
+
+    def expired(self):
+        # 보관 시간이 지나 cleanup() 이 파일을 지웠는지
+        return self.path is None or not os.path.exists(self.path)
+
+    def read(self):
+        # st.download_button 의 data 로 넘기는 콜백: 누를 때 파일에서 읽음 (세션에는 내용을 두지 않음)
+        return Path(self.path).read_bytes()
+
+
+def _run(job, store, carts, targets):
+    global _queued
+    with _lock:
+        _queued -= 1
+    started = time.perf_counter()
+    items, totals = [], []
+    for name, ids, grams in carts:
+        frame, total = cart_table(store, ids, grams)
+        items.append((name, frame))
+        totals.append(total)
+        job.step()
+    summary, ratio = summary_tables([name for name, _, _ in carts], totals, targets)
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f'.{job.fmt}', dir=REPORT_DIR)
+    os.close(fd)
+    try:
+        WRITERS[job.fmt](path, items, summary, ratio, job.step)
+    except Exception:
+        os.unlink(path)
+        raise
+    job.path = path
+    job.nbytes = os.path.getsize(path)
+    job.seconds = time.perf_counter() - started
+    job.steps = job.total
+    return path
+
+
+def cleanup(max_age=REPORT_TTL):
+    # 오래된 보고서 파일 삭제
+    cutoff = time.time() - max_age
+    for path in REPORT_DIR.glob('tmp*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def submit_report(store, carts, targets, fmt):
+    # carts 는 (이름, ids, grams) 의 복사본이어야 함 (작업 중에 장바구니가 바뀌어도 영향 없도록)
+    global _queued
+    if fmt not in available_formats():
+        raise ValueError(f'{fmt} 형식을 만들 수 없습니다 ({FORMATS[fmt][2]} 패키지 필요).')
+    cleanup()
+    job = ReportJob(fmt, len(carts))
+    with _lock:
+        _queued += 1
+    job.future = _executor.submit(_run, job, store, carts, targets)
+    return job
+
+
+def queued():
+    # 아직 시작하지 않은 보고서 작업 수 (모든 세션)
+    with _lock:
+        return _queued
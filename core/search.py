@@ -0,0 +1,183 @@
+import re
+
+import numpy as np
+
+# --- 한글 자모 분해 ---
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+# 겹받침은 두 자모로 풀어서 '달ㄱ' 처럼 입력 중인 글자도 '닭' 과 맞도록 함
+JONGSUNG = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ',
+            'ㄹㅍ', 'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+CHOSUNG_SET = set(CHOSUNG)
+
+# 검색 대상 컬럼과 가중치 (식품명 일치가 가장 앞에 오도록)
+SEARCH_FIELDS = {'식품명': 1.0, '대표식품명': 0.8, '식품기원명': 0.3}
+# 일치 종류별 점수: 완전 일치 > 접두 일치 > 부분 일치 > 오타 허용(n-gram 유사도)
+EXACT, PREFIX, SUBSTRING = 3.0, 2.0, 1.0
+MIN_SIMILARITY = 0.4
+
+_STRIP = re.compile(r'[^0-9a-z가-힣ㄱ-ㅣ]+')
+
+
+def normalize(text):
+    # 소문자로 바꾸고 공백/괄호/밑줄 등 구분 기호를 없앤다 ('김치 찌개' == '김치찌개')
+    return _STRIP.sub('', str(text).lower())
+
+
+def decompose(text):
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            code -= HANGUL_BASE
+            out.append(CHOSUNG[code // 588] + JUNGSUNG[code % 588 // 28] + JONGSUNG[code % 28])
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def chosung(text):
+    out = []
+    for ch in text:
+        code = ord(ch)
+        out.append(CHOSUNG[(code - HANGUL_BASE) // 588] if HANGUL_BASE <= code <= HANGUL_LAST else ch)
+    return ''.join(out)
+
+
+def ngrams(jamo, n=2):
+    if len(jamo) < n:
+        return {jamo} if jamo else set()
+    return {jamo[i:i + n] for i in range(len(jamo) - n + 1)}
+
+
+class _FieldIndex:
+    # 한 컬럼의 고유 문자열(카테고리) 단위 역색인: 자모 bigram → 문자열 코드 배열
+
+    def __init__(self, values):
+        self.texts = [normalize(v) for v in values]
+        self.jamo = [decompose(t) for t in self.texts]
+        self.chosung = [chosung(t) for t in self.texts]
+        self.gram_counts = np.array([len(ngrams(j)) for j in self.jamo], dtype=np.float32)
+
+        postings = {}
+        for doc, jamo in enumerate(self.jamo):
+            for gram in ngrams(jamo):
+                postings.setdefault(gram, []).append(doc)
+        self.postings = {gram: np.array(docs, dtype=np.int32) for gram, docs in postings.items()}
+
+    def extended(self, values):
+        # 증분 갱신: 카테고리 목록은 뒤에만 늘어나므로 새 문자열만 색인한 사본을 만든다
+        new = object.__new__(_FieldIndex)
+        start = len(self.texts)
+        added = [normalize(v) for v in values[start:]]
+        new.texts = self.texts + added
+        new.jamo = self.jamo + [decompose(t) for t in added]
+        new.chosung = self.chosung + [chosung(t) for t in added]
+        new.gram_counts = np.concatenate(
+            [self.gram_counts, np.array([len(ngrams(j)) for j in new.jamo[start:]], dtype=np.float32)])
+        postings = {}
+        for doc, jamo in enumerate(new.jamo[start:], start):
+            for gram in ngrams(jamo):
+                postings.setdefault(gram, []).append(doc)
+        new.postings = dict(self.postings)
+        for gram, docs in postings.items():
+            docs = np.array(docs, dtype=np.int32)
+            new.postings[gram] = np.concatenate([self.postings[gram], docs]) if gram in self.postings else docs
+        return new
+
+    def score(self, query, query_jamo):
+        # 문자열 코드별 점수 (0 이면 불일치)
+        n_docs = len(self.texts)
+        if all(ch in CHOSUNG_SET for ch in query):
+            # 초성만 입력한 경우 ('ㄱㅊㅉㄱ' → 김치찌개)
+            scores = np.zeros(n_docs, dtype=np.float32)
+            for doc, initials in enumerate(self.chosung):
+                pos = initials.find(query)
+                if pos >= 0:
+                    scores[doc] = PREFIX if pos == 0 else SUBSTRING
+            return scores
+
+        grams = ngrams(query_jamo)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return np.zeros(n_docs, dtype=np.float32)
+        shared = np.bincount(np.concatenate(hits), minlength=n_docs).astype(np.float32)
+        # Dice 계수: 오타가 있어도 겹치는 bigram 비율로 순위를 매김
+        scores = 2 * shared / (len(grams) + self.gram_counts)
+        scores[scores < MIN_SIMILARITY] = 0
+
+        # 모든 bigram 을 가진 후보만 실제 문자열로 접두/부분 일치를 확인
+        for doc in np.flatnonzero(shared == len(grams)):
+            jamo = self.jamo[doc]
+            if jamo == query_jamo:
+                scores[doc] += EXACT
+            elif jamo.startswith(query_jamo):
+                scores[doc] += PREFIX
+            elif query_jamo in jamo:
+                scores[doc] += SUBSTRING
+        return scores
+
+
+class FoodSearch:
+    # 식품명 / 대표식품명 / 식품기원명 통합 검색. 색인은 고유 문자열 단위로 만들고,
+    # 검색 시 코드 배열로 행 점수를 한 번에 펼친 뒤 argpartition 으로 상위 N 개만 정렬한다.
+
+    def __init__(self, store, fields=None):
+        self.n_rows = store.n_rows
+        self._codes = {col: np.asarray(store.codes(col)) for col in SEARCH_FIELDS}
+        self._fields = fields or {col: _FieldIndex(store.categories(col)) for col in SEARCH_FIELDS}
+        # 증분 갱신으로 삭제된 행은 검색되지 않도록 0 점 처리
+        self._dead = np.flatnonzero(~store.live)
+        # 같은 점수면 짧은 식품명이 먼저 오도록 하는 아주 작은 감점
+        name_lengths = np.array([len(t) for t in self._fields['식품명'].texts] + [0], dtype=np.float32)
+        self._length_penalty = name_lengths[self._codes['식품명']] * 1e-4
+
+    def patch(self, store):
+        # 증분 갱신: 새로 생긴 문자열만 색인에 더하고 행 → 문자열 코드 배열은 새 저장소 것을 쓴다
+        fields = {col: index.extended(store.categories(col)) for col, index in self._fields.items()}
+        return FoodSearch(store, fields)
+
+    def scores(self, query):
+        # 행별 점수 배열 (검색어가 비었거나 일치가 없으면 None)
+        query = normalize(query)
+        if not query:
+            return None
+        query_jamo = decompose(query)
+        row_scores = np.zeros(self.n_rows, dtype=np.float32)
+        for col, weight in SEARCH_FIELDS.items():
+            doc_scores = self._fields[col].score(query, query_jamo)
+            if not doc_scores.any():
+                continue
+            # 코드 -1(결측) 은 끝에 붙인 0 점으로 매핑
+            doc_scores = np.append(doc_scores, np.float32(0)) * weight
+            np.maximum(row_scores, doc_scores[self._codes[col]], out=row_scores)
+        row_scores[self._dead] = 0
+        if not row_scores.any():
+            return None
+        return np.where(row_scores > 0, row_scores - self._length_penalty, 0)
+
+    def search(self, query, limit=20, rows=None):
+        # 점수 내림차순 상위 limit 개의 (행 번호, 점수). rows 를 주면 그 행들 안에서만 찾는다
+        scores = self.scores(query)
+        if scores is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        if rows is not None:
+            allowed = np.zeros(self.n_rows, dtype=bool)
+            allowed[rows] = True
+            scores = np.where(allowed, scores, 0)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = np.lexsort((candidates, -scores[candidates]))
+        candidates = candidates[order].astype(np.int32)
+        return candidates, scores[candidates]
+
+    def ids(self, query, rows=None, limit=200):
+        # 위젯 옵션용 식품 ID 목록 (최대 limit 개)과 잘렸는지 여부.
+        # 검색어가 있으면 rows 안의 검색 결과 순위대로, 없으면 rows 의 원래 순서대로 돌려준다.
+        if query and normalize(query):
+            hit_rows, _ = self.search(query, limit=limit + 1, rows=rows)
+        else:
+            hit_rows = np.setdiff1d(np.arange(self.n_rows), self._dead) if rows is None else rows
+        return hit_rows[:limit].tolist(), len(hit_rows) > limit
@@ -0,0 +1,110 @@
+import numpy as np
+
+# --- 비슷한 음식 찾기 ---
+# 비교 페이지와 같은 9개 성분을 표준화한 벡터의 코사인 유사도로 이웃을 찾는다.
+SIMILARITY_COLS = [
+    '에너지(kcal)', '탄수화물(g)', '단백질(g)', '지방(g)', '당류(g)', '나트륨(mg)',
+    '콜레스테롤(mg)', '포화지방산(g)', '식이섬유(g)'
+]
+# 대체 음식은 열량 구성비(탄수화물/단백질/지방 에너지 비율) 가 비슷한 음식 중에서 고른다
+MACRO_COLS = ['탄수화물(g)', '단백질(g)', '지방(g)']
+MACRO_KCAL_PER_G = np.array([4.0, 4.0, 9.0], dtype=np.float32)
+MIN_SAVING = 0.1
+MIN_MACRO_SIMILARITY = 0.95
+# 한 번에 내적을 계산하는 행 수 (데이터가 커져도 임시 배열 크기를 묶어 둠)
+BLOCK_ROWS = 65536
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # 영벡터(모든 값이 평균이거나 결측) 는 어떤 음식과도 유사도 0
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def blocked_top_k(vectors, query, k, rows=None, exclude=None, mask=None):
+    # vectors @ query 가 큰 순서로 k 개 (행 번호, 점수). rows 가 있으면 그 행들 안에서만,
+    # mask 는 행 번호로 인덱싱하는 bool 배열 (False 면 후보에서 제외).
+    n = len(vectors) if rows is None else len(rows)
+    best_rows, best_scores = [], []
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(n, start + BLOCK_ROWS)
+        if rows is None:
+            idx = np.arange(start, stop, dtype=np.int32)
+            scores = vectors[start:stop] @ query
+        else:
+            idx = np.asarray(rows[start:stop], dtype=np.int32)
+            scores = vectors[idx] @ query
+        keep = idx != exclude if exclude is not None else np.ones(len(idx), dtype=bool)
+        if mask is not None:
+            keep &= mask[idx]
+        idx, scores = idx[keep], scores[keep]
+        if len(idx) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            idx, scores = idx[top], scores[top]
+        best_rows.append(idx)
+        best_scores.append(scores)
+    if not best_rows:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+    idx, scores = np.concatenate(best_rows), np.concatenate(best_scores)
+    # 점수 내림차순, 같으면 행 번호 순
+    order = np.lexsort((idx, -scores))[:k]
+    return idx[order], scores[order]
+
+
+class FoodSimilarity:
+    # 로드 시점에 표준화 + 단위 길이로 맞춘 float32 행렬을 만들어 두고, 질의는 블록 단위 행렬-벡터 곱 한 번
+
+    def __init__(self, store, cols=SIMILARITY_COLS):
+        self.cols = cols
+        # 나트륨처럼 꼬리가 긴 성분이 거리를 지배하지 않도록 log1p 후 z-score, 결측은 평균(0) 으로
+        logged = self._logged(store, np.arange(store.n_rows))
+        self.mean = np.nanmean(logged, axis=0)
+        self.std = np.nanstd(logged, axis=0)
+        self.std[~(self.std > 0)] = 1.0
+        self.live = store.live
+        self.vectors, self.kcal, self.macro_shares = self._rows(store, np.arange(store.n_rows), logged)
+
+    def _logged(self, store, rows):
+        raw = np.column_stack([store.column(col)[rows] for col in self.cols]).astype(np.float32)
+        return np.log1p(np.clip(raw, 0, None))
+
+    def _rows(self, store, rows, logged=None):
+        # rows 의 (단위 벡터, 칼로리, 열량 구성비 단위 벡터)
+        logged = self._logged(store, rows) if logged is None else logged
+        standardized = np.nan_to_num((logged - self.mean) / self.std, nan=0.0)
+        vectors = np.ascontiguousarray(_unit_rows(standardized), dtype=np.float32)
+        kcal = np.asarray(store.column('에너지(kcal)')[rows], dtype=np.float32)
+        macros = np.nan_to_num(np.column_stack([store.column(col)[rows] for col in MACRO_COLS]).astype(np.float32), nan=0.0)
+        energy = np.clip(macros, 0, None) * MACRO_KCAL_PER_G
+        return vectors, kcal, np.ascontiguousarray(_unit_rows(energy), dtype=np.float32)
+
+    def patch(self, store, changed):
+        # 증분 갱신: 바뀐 행만 다시 계산 (표준화 평균/분산은 처음 값을 유지)
+        new = object.__new__(FoodSimilarity)
+        new.cols, new.mean, new.std, new.live = self.cols, self.mean, self.std, store.live
+        grow = store.n_rows - len(self.vectors)
+        new.vectors = np.concatenate([self.vectors, np.zeros((grow, self.vectors.shape[1]), dtype=np.float32)])
+        new.kcal = np.concatenate([self.kcal, np.full(grow, np.nan, dtype=np.float32)])
+        new.macro_shares = np.concatenate([self.macro_shares, np.zeros((grow, len(MACRO_COLS)), dtype=np.float32)])
+        changed = np.asarray(changed, dtype=np.intp)
+        new.vectors[changed], new.kcal[changed], new.macro_shares[changed] = new._rows(store, changed)
+        return new
+
+    def neighbors(self, food_id, k=10, rows=None):
+        # food_id 와 영양 구성이 가장 비슷한 음식 k 개 (자기 자신 제외)
+        return blocked_top_k(self.vectors, self.vectors[food_id], k, rows=rows, exclude=food_id, mask=self.live)
+
+    def substitutes(self, food_id, k=10, rows=None, min_saving=MIN_SAVING, min_similarity=MIN_MACRO_SIMILARITY,
+                    kcal=None):
+        # 칼로리가 min_saving 이상 낮으면서 열량 구성비가 비슷한 음식. 구성비 유사도 순, (행, 유사도).
+        # kcal 에 다른 영양성분 기준 보기의 칼로리 컬럼을 주면 그 값으로 비교한다 (구성비는 기준과 무관).
+        # 그 기준으로 환산할 수 없는(NaN) 행은 후보에서 빠진다
+        kcal = self.kcal if kcal is None else kcal
+        base_kcal = kcal[food_id]
+        if not base_kcal > 0 or not self.macro_shares[food_id].any():
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        lighter = (kcal <= base_kcal * (1 - min_saving)) & self.live
+        found, scores = blocked_top_k(self.macro_shares, self.macro_shares[food_id], k, rows=rows,
+                                      exclude=food_id, mask=lighter)
+        keep = scores >= min_similarity
+        return found[keep], scores[keep]
@@ -0,0 +1,506 @@
+import codecs
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from core.aggregates import CategoryAggregates
+from core.basis import NATIVE_BASIS, basis_factors
+from core.category import CategoryTree
+from core.ranges import NutrientRangeIndex
+from core.search import FoodSearch
+from core.similar import FoodSimilarity
+
+# --- 경로 및 상수 ---
+ROOT = Path(__file__).resolve().parent.parent
+# FOOD_CSV 로 다른 파일을 지정할 수 있음 (벤치마크용 확대 데이터 등)
+DATA_PATH = Path(os.environ.get('FOOD_CSV', ROOT / 'food.csv'))
+CACHE_DIR = ROOT / '.cache'
+CACHE_FORMAT = 3
+CSV_ENCODING = 'euc-kr'
+# 인코딩 판별에 읽는 앞부분 크기
+SNIFF_BYTES = 1 << 16
+# 병렬 적재: 작업 하나가 맡는 바이트 수와 프로세스 수 (FOOD_INGEST_WORKERS 로 조정)
+CHUNK_BYTES = 16 << 20
+INGEST_WORKERS = int(os.environ.get('FOOD_INGEST_WORKERS', os.cpu_count() or 1))
+
+NUTRIENT_COLS = [
+    '에너지(kcal)', '수분(g)', '단백질(g)', '지방(g)', '회분(g)', '탄수화물(g)',
+    '당류(g)', '식이섬유(g)', '칼슘(mg)', '철(mg)', '인(mg)', '칼륨(mg)',
+    '나트륨(mg)', '비타민 A(μg RAE)', '레티놀(μg)', '베타카로틴(μg)', '티아민(mg)',
+    '리보플라빈(mg)', '니아신(mg)', '비타민 C(mg)', '비타민 D(μg)', '콜레스테롤(mg)',
+    '포화지방산(g)', '트랜스지방산(g)'
+]
+
+# 문자열 컬럼은 카테고리 코드(int8/int16/int32) + 카테고리 목록으로 저장
+TEXT_COLS = [
+    '식품코드', '식품명', '데이터구분명', '식품기원명', '식품대분류명', '대표식품명', '식품중분류명',
+    '식품소분류명', '식품세분류명', '영양성분함량기준량', '출처명', '식품중량'
+]
+CODE_COLS = ['식품기원코드', '식품대분류코드']
+
+NUTRIENT_INDEX = {col: i for i, col in enumerate(NUTRIENT_COLS)}
+_FAST_DTYPES = defaultdict(lambda: str, {col: np.float64 for col in NUTRIENT_COLS + CODE_COLS})
+
+# warm() 이 미리 만들어 두는 파생 인덱스 (만드는 순서)
+WARM_INDEXES = [
+    'nutrient_matrix', 'key_index', 'food_labels', 'category_tree', 'aggregates', 'search', 'similar', 'basis_factors',
+    'ranges',
+]
+# 영양성분 기준 보기(basis_view) 가 원본과 공유하는 인덱스 (영양성분 값과 무관한 것)
+SHARED_INDEXES = ['food_keys', 'key_index', 'food_labels', 'category_tree', 'search', 'similar', 'basis_factors']
+
+# 식품코드가 없는 내보내기 파일에서 안정적인 식품 키를 만들 때 쓰는 식별 컬럼
+KEY_COLS = [
+    '식품명', '식품기원명', '출처명', '대표식품명', '식품대분류명', '식품중분류명',
+    '식품소분류명', '식품세분류명'
+]
+
+
+def file_signature(path):
+    # 파일이 바뀌었는지 빠르게 판단하기 위한 (mtime, 크기)
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def identity_hashes(codes, categories):
+    # 식별 컬럼(KEY_COLS) 값들을 결합한 행별 uint64 해시.
+    # 카테고리 문자열마다 한 번만 해시하고 행 단위 결합은 uint64 연산으로 벡터화한다.
+    row_hash = np.zeros(len(codes[KEY_COLS[0]]), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in KEY_COLS:
+            cat_hash = np.array(
+                [int.from_bytes(hashlib.sha1(v.encode('utf-8')).digest()[:8], 'little') for v in categories[col]] + [0],
+                dtype=np.uint64)
+            row_hash = row_hash * np.uint64(1099511628211) ^ cat_hash[codes[col]]
+    return row_hash
+
+
+def hash_key(h, occurrence):
+    # 식품코드가 없을 때의 식품 키: 해시 16자리 (+ 같은 해시 안의 등장 순번)
+    return f'{h:016x}-{occurrence}' if occurrence else f'{h:016x}'
+
+
+def _code_dtype(n_categories):
+    # pandas Categorical 이 내부적으로 쓰는 코드 dtype 과 맞춰야 from_codes 에서 복사가 일어나지 않음
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def parse_csv(path, encoding=CSV_ENCODING):
+    # food.csv 를 한 번만 파싱해서 (영양성분 행렬, 코드 컬럼, 카테고리 목록) 으로 변환
+    return parse_frame(read_frame(path, encoding))
+
+
+def read_frame(source, encoding):
+    # 문자열 컬럼은 원문 그대로 (숫자처럼 보이는 값이 '100.0' 등으로 바뀌지 않도록 str 로) 읽고,
+    # 영양성분은 C 파서가 바로 float 으로 읽는다. 숫자가 아닌 값이 섞여 있으면 전부 str 로 다시 읽어 따로 변환
+    try:
+        return pd.read_csv(source, encoding=encoding, dtype=_FAST_DTYPES)
+    except ValueError:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_csv(source, encoding=encoding, dtype=str)
+
+
+def parse_frame(df):
+    df.columns = df.columns.str.strip()
+
+    nutrients = np.empty((len(df), len(NUTRIENT_COLS)), dtype=np.float32, order='F')
+    for i, col in enumerate(NUTRIENT_COLS):
+        if col in df.columns:
+            values = df[col] if df[col].dtype.kind == 'f' else pd.to_numeric(df[col], errors='coerce')
+            nutrients[:, i] = values.to_numpy(dtype=np.float32, na_value=np.nan)
+        else:
+            nutrients[:, i] = np.nan
+
+    codes, categories = {}, {}
+    for col in TEXT_COLS:
+        if col in df.columns:
+            col_codes, uniques = pd.factorize(df[col])
+        else:
+            col_codes, uniques = np.full(len(df), -1), []
+        codes[col] = col_codes.astype(_code_dtype(len(uniques)))
+        categories[col] = [str(v) for v in uniques]
+    for col in CODE_COLS:
+        values = pd.to_numeric(df[col], errors='coerce') if col in df.columns else pd.Series(0, index=df.index)
+        codes[col] = values.fillna(-1).to_numpy(dtype=np.int32)
+    return nutrients, codes, categories
+
+
+# --- 대용량/여러 파일 적재 ---
+# 파일을 줄 경계에 맞춘 바이트 구간으로 나눠 프로세스 풀에서 디코딩 + 숫자 변환까지 마치고,
+# 작은 결과(float32 행렬, 카테고리 코드와 목록) 만 돌려받아 합친다. 따옴표 안 줄바꿈이 없는 내보내기 파일 기준.
+def detect_encoding(path):
+    # 국가 식품 DB 내보내기는 EUC-KR 또는 UTF-8 (BOM 포함/미포함)
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        # 읽은 구간 끝에서 글자가 잘린 경우는 UTF-8 로 본다
+        return 'utf-8' if exc.start >= len(head) - 3 else CSV_ENCODING
+    return 'utf-8'
+
+
+def chunk_ranges(path, chunk_bytes=CHUNK_BYTES):
+    # (헤더 줄 바이트, [(시작, 끝)]). 구간은 항상 줄 경계에서 끊는다
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        ranges = []
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            ranges.append((start, f.tell()))
+            start = f.tell()
+    return header, ranges or [(start, start)]
+
+
+def _parse_chunk(path, encoding, header, start, stop):
+    # 프로세스 풀 작업 단위: 헤더 + 바이트 구간을 읽어 parse_frame 결과로
+    with open(path, 'rb') as f:
+        f.seek(start)
+        body = f.read(stop - start)
+    return parse_frame(read_frame(io.BytesIO(header + body), encoding))
+
+
+def merge_parts(parts):
+    # 조각별 결과를 파일/구간 순서대로 이어 붙인다. 카테고리 목록은 처음 나온 순서로 합치므로
+    # 한 파일을 통째로 parse_csv 한 것과 같은 코드가 나온다
+    nutrients = np.asfortranarray(np.concatenate([part[0] for part in parts]))
+    codes, categories = {}, {}
+    for col in TEXT_COLS:
+        lookup, merged = {}, []
+        for _, part_codes, part_categories in parts:
+            remap = np.empty(len(part_categories[col]) + 1, dtype=np.int64)
+            for i, value in enumerate(part_categories[col]):
+                remap[i] = lookup.setdefault(value, len(lookup))
+            remap[-1] = -1
+            merged.append(remap[part_codes[col]])
+        codes[col] = np.concatenate(merged).astype(_code_dtype(len(lookup)))
+        categories[col] = list(lookup)
+    for col in CODE_COLS:
+        codes[col] = np.concatenate([part[1][col] for part in parts])
+    return nutrients, codes, categories
+
+
+def ingest(paths, chunk_bytes=CHUNK_BYTES, workers=None):
+    # 여러 CSV 를 하나의 (영양성분 행렬, 코드 컬럼, 카테고리 목록) 으로. 조각이 하나면 현재 프로세스에서 바로 파싱
+    tasks = []
+    for path in paths:
+        encoding = detect_encoding(path)
+        header, ranges = chunk_ranges(path, chunk_bytes)
+        tasks += [(str(path), encoding, header, start, stop) for start, stop in ranges]
+    workers = min(workers or INGEST_WORKERS, len(tasks))
+    if workers <= 1:
+        return merge_parts([_parse_chunk(*task) for task in tasks])
+    # 서버 프로세스에는 스레드가 여럿 돌고 있으므로 fork 대신 spawn
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return merge_parts(list(pool.map(_parse_chunk, *zip(*tasks))))
+
+
+def prune_cache(cache_dir, keep, source):
+    # 새 캐시를 쓴 뒤 같은 원본의 이전 버전과 포맷이 다른 캐시를 지운다. 다른 원본(FOOD_CSV 로 연 확대 데이터 등)
+    # 의 캐시와 다른 프로세스가 쓰는 중인 임시 디렉토리는 남긴다. 이미 mmap 으로 연 프로세스는 계속 읽을 수 있음
+    for directory in Path(cache_dir).glob('food-*'):
+        if directory == keep or '.tmp' in directory.name:
+            continue
+        if directory.name.endswith(f'-v{CACHE_FORMAT}'):
+            try:
+                with open(directory / 'meta.json', encoding='utf-8') as f:
+                    if json.load(f).get('source') != source:
+                        continue
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError):
+                continue
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class FoodStore:
+    # 컬럼 단위로 저장된 food.csv. 모든 세션/페이지가 하나의 인스턴스를 공유하며
+    # column() 은 복사 없이 내부 배열의 뷰를 돌려준다.
+
+    nutrient_cols = NUTRIENT_COLS
+
+    def __init__(self, nutrients, codes, categories, meta, live=None):
+        self.nutrients = nutrients
+        self._codes = codes
+        self._categories = categories
+        self.meta = meta
+        self.n_rows = len(nutrients)
+        self.version = meta['sha1'][:12]
+        # 증분 갱신(core.reload) 으로 삭제된 행은 ID 를 유지한 채 False 로 남는다
+        self.live = np.ones(self.n_rows, dtype=bool) if live is None else live
+        # 원본 CSV 줄 해시 (증분 갱신의 비교 기준, core.reload 가 채움)
+        self.header = None
+        self.row_hashes = None
+        # 영양성분 값의 기준 (basis_view 로 만든 보기만 다름) 과 그 기준으로 환산할 수 있는 행
+        self.basis = NATIVE_BASIS
+        self.convertible = np.ones(self.n_rows, dtype=bool)
+        self._views = {}
+        self._frames = {}
+        self._labels = {}
+        self._ranks = {}
+
+    # --- 생성 ---
+    @classmethod
+    def open(cls, csv_path=DATA_PATH, cache_dir=CACHE_DIR):
+        # csv_path 에 파일 목록을 주면 순서대로 이어 붙인 하나의 저장소 (가공식품 + 음식 + 원재료 내보내기 등)
+        if isinstance(csv_path, (list, tuple)):
+            paths = [Path(path) for path in csv_path]
+            digest = hashlib.sha1(''.join(file_digest(path) for path in paths).encode()).hexdigest()
+        else:
+            paths = [Path(csv_path)]
+            digest = file_digest(paths[0])
+        target = Path(cache_dir) / f'food-{digest[:16]}-v{CACHE_FORMAT}'
+        if (target / 'meta.json').exists():
+            try:
+                return cls.load(target)
+            except (OSError, ValueError, KeyError):
+                shutil.rmtree(target, ignore_errors=True)
+
+        nutrients, codes, categories = ingest(paths)
+        signatures = [file_signature(path) for path in paths]
+        meta = {
+            'format': CACHE_FORMAT, 'source': os.pathsep.join(map(str, paths)), 'sha1': digest,
+            'mtime_ns': max(mtime for mtime, _ in signatures), 'size': sum(size for _, size in signatures),
+            'n_rows': len(nutrients),
+        }
+        store = cls(nutrients, codes, categories, meta)
+        try:
+            store.save(target)
+            prune_cache(cache_dir, target, meta['source'])
+            return cls.load(target)
+        except OSError:
+            # 캐시 디렉토리에 쓸 수 없는 환경이면 메모리에 올린 그대로 사용
+            return store
+
+    @classmethod
+    def load(cls, directory):
+        directory = Path(directory)
+        with open(directory / 'meta.json', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != CACHE_FORMAT:
+            raise ValueError(f'지원하지 않는 캐시 포맷: {meta.get("format")}')
+        nutrients = np.load(directory / 'nutrients.npy', mmap_mode='r')
+        codes = {
+            col: np.load(directory / f'{col}.npy', mmap_mode='r')
+            for col in TEXT_COLS + CODE_COLS
+        }
+        return cls(nutrients, codes, meta['categories'], meta)
+
+    def save(self, directory):
+        # 임시 디렉토리에 모두 쓴 뒤 rename 으로 교체해서 반쯤 쓰인 캐시가 보이지 않게 함
+        directory = Path(directory)
+        tmp = directory.with_name(directory.name + f'.tmp{os.getpid()}')
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / 'nutrients.npy', np.asfortranarray(self.nutrients))
+        for col, values in self._codes.items():
+            np.save(tmp / f'{col}.npy', np.ascontiguousarray(values))
+        with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({**self.meta, 'categories': self._categories}, f, ensure_ascii=False)
+        try:
+            tmp.rename(directory)
+        except OSError:
+            # 다른 프로세스가 먼저 만들었으면 그쪽을 사용
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (directory / 'meta.json').exists():
+                raise
+
+    # --- 조회 ---
+    def column(self, col):
+        if col in NUTRIENT_INDEX:
+            return self.nutrients[:, NUTRIENT_INDEX[col]]
+        if col in CODE_COLS:
+            return self._codes[col]
+        return pd.Categorical.from_codes(self._codes[col], categories=self._categories[col], validate=False)
+
+    def codes(self, col):
+        return self._codes[col]
+
+    def categories(self, col):
+        return self._categories[col]
+
+    def frame(self, fill_na=False):
+        # 전체 컬럼 DataFrame. 한 번 만든 뒤 공유하므로 페이지에서 직접 수정하면 안 됨
+        if fill_na not in self._frames:
+            data = {col: self.column(col) for col in TEXT_COLS + CODE_COLS}
+            nutrients = self.nutrient_matrix if fill_na else self.nutrients
+            for col, i in NUTRIENT_INDEX.items():
+                data[col] = nutrients[:, i]
+            self._frames[fill_na] = pd.DataFrame(data, copy=False)
+        return self._frames[fill_na]
+
+    # --- 파생 인덱스 (버전마다 한 번 계산해서 공유) ---
+    @cached_property
+    def nutrient_matrix(self):
+        # 결측을 0 으로 채운 100g 당 영양성분 행렬 (행 단위 조회가 많으므로 C 순서)
+        return np.ascontiguousarray(np.nan_to_num(self.nutrients, nan=0.0), dtype=np.float32)
+
+    @cached_property
+    def food_keys(self):
+        # 식품 ID(= 행 번호) 마다 데이터 버전이 바뀌어도 유지되는 키.
+        # 식품코드가 있으면 그대로 쓰고, 없으면 식별 컬럼 값들의 해시 + 같은 해시 안에서의 등장 순번을 쓴다.
+        row_hash = identity_hashes(self._codes, self._categories)
+        occurrence = pd.Series(row_hash).groupby(row_hash, sort=False).cumcount().to_numpy()
+
+        food_codes = self.categories('식품코드')
+        code_of = self.codes('식품코드')
+        keys = []
+        for h, n, code in zip(row_hash.tolist(), occurrence.tolist(), code_of.tolist()):
+            if code >= 0:
+                keys.append(food_codes[code])
+            else:
+                keys.append(hash_key(h, n))
+        return keys
+
+    @cached_property
+    def key_index(self):
+        # 식품 키 → 식품 ID 해시 인덱스
+        return {key: food_id for food_id, key in enumerate(self.food_keys)}
+
+    @cached_property
+    def food_labels(self):
+        labels = [None] * self.n_rows
+        self.label_rows(np.flatnonzero(self.live), labels)
+        return labels
+
+    def label_rows(self, rows, labels):
+        # 위젯 표시용 이름을 labels[row] 에 채운다. 같은 식품명이 여러 개면 식품기원명을, 그래도 겹치면 순번을 덧붙인다.
+        # rows 는 같은 식품명을 가진 (살아 있는) 행을 모두 포함해야 한다.
+        rows = np.asarray(rows)
+        names = np.asarray(self.column('식품명')[rows], dtype=object)
+        origins = np.asarray(self.column('식품기원명')[rows], dtype=object)
+        name_codes = np.asarray(self.codes('식품명'))[rows]
+        duplicated = (np.bincount(name_codes + 1)[name_codes + 1] > 1).tolist()
+        seen = {}
+        for food_id, name, origin, dup in zip(rows.tolist(), names.tolist(), origins.tolist(), duplicated):
+            label = f'{name} · {origin}' if dup else name
+            n = seen.get(label, 0)
+            seen[label] = n + 1
+            labels[food_id] = f'{label} #{n + 1}' if n else label
+
+    @cached_property
+    def category_tree(self):
+        return CategoryTree(self)
+
+    @cached_property
+    def aggregates(self):
+        return CategoryAggregates(self, self.category_tree)
+
+    @cached_property
+    def search(self):
+        return FoodSearch(self)
+
+    @cached_property
+    def similar(self):
+        return FoodSimilarity(self)
+
+    @cached_property
+    def ranges(self):
+        return NutrientRangeIndex(self)
+
+    @cached_property
+    def basis_factors(self):
+        return basis_factors(self)
+
+    def basis_view(self, basis):
+        # 영양성분 값만 basis 기준으로 환산한 같은 데이터의 보기. 카테고리 트리, 검색 등은 원본과 공유하고
+        # 집계(aggregates) 와 정렬 순위는 보기마다 처음 쓸 때 한 번 만든다
+        if basis == self.basis:
+            return self
+        if basis not in self._views:
+            factor = self.basis_factors[basis]
+            view = FoodStore(np.asfortranarray(self.nutrients * factor[:, None]), self._codes, self._categories,
+                             self.meta, live=self.live)
+            view.basis = basis
+            view.version = f'{self.version}-{basis}'
+            view.convertible = ~np.isnan(factor)
+            for name in SHARED_INDEXES:
+                view.__dict__[name] = getattr(self, name)
+            self._views[basis] = view
+        return self._views[basis]
+
+    def warm(self, timings=None, names=WARM_INDEXES):
+        # 페이지에서 쓰는 파생 인덱스(기본: 전부) 를 미리 계산. timings 를 주면 {이름: 초} 를 만드는 대로 채움
+        for name in names:
+            started = time.perf_counter()
+            getattr(self, name)
+            if timings is not None:
+                timings[name] = time.perf_counter() - started
+        return self
+
+    def take(self, rows, columns):
+        # 화면 표시용 작은 DataFrame. 문자열 컬럼은 카테고리(전체 사전) 대신 해당 행의 문자열만,
+        # 영양성분은 float32 표현 오차가 보이지 않도록 float64 로 반올림해서 담는다.
+        rows = np.asarray(rows, dtype=np.intp)
+        data = {}
+        for col in columns:
+            if col in NUTRIENT_INDEX:
+                data[col] = self.nutrients[rows, NUTRIENT_INDEX[col]].astype(np.float64).round(4)
+            elif col in CODE_COLS:
+                data[col] = self._codes[col][rows]
+            else:
+                if col not in self._labels:
+                    # 코드 -1(결측) 은 끝에 붙인 None 으로 매핑
+                    self._labels[col] = np.array(self._categories[col] + [None], dtype=object)
+                data[col] = self._labels[col][self._codes[col][rows]]
+        return pd.DataFrame(data)
+
+    def sort_rank(self, col, descending=False):
+        # 컬럼 전체 정렬 순서에서 각 행의 순위 (결측은 항상 맨 뒤). 컬럼/방향마다 한 번만 계산
+        cache_key = (col, descending)
+        if cache_key not in self._ranks:
+            if col in NUTRIENT_INDEX or col in CODE_COLS:
+                values = np.asarray(self.column(col), dtype=np.float64)
+            else:
+                # 문자열은 카테고리 사전 순서로 순위를 매긴 뒤 코드로 펼침
+                cat_order = np.argsort(np.array(self._categories[col], dtype=object), kind='stable')
+                cat_rank = np.empty(len(cat_order) + 1, dtype=np.float64)
+                cat_rank[cat_order] = np.arange(len(cat_order))
+                cat_rank[-1] = np.nan
+                values = cat_rank[self._codes[col]]
+            if descending:
+                values = -values
+            order = np.argsort(values, kind='stable')
+            rank = np.empty(self.n_rows, dtype=np.int32)
+            rank[order] = np.arange(self.n_rows, dtype=np.int32)
+            self._ranks[cache_key] = rank
+        return self._ranks[cache_key]
+
+    def sort_rows(self, rows, col, descending=False):
+        # 미리 계산한 순위로 부분 집합만 정렬 (정수 정렬 한 번)
+        rank = self.sort_rank(col, descending)
+        return rows[np.argsort(rank[rows], kind='stable')]
+
+    def nbytes(self):
+        # 상주 메모리 추정치 (mmap 이면 실제로 읽힌 페이지만 RSS 에 잡힘)
+        total = self.nutrients.nbytes + sum(v.nbytes for v in self._codes.values())
+        total += sum(len(s.encode('utf-8')) + 49 for cats in self._categories.values() for s in cats)
+        return total
@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+import pyarrow as pa
+import streamlit as st
+
+PAGE_SIZES = [20, 50, 100]
+DEFAULT_ORDER = '기본 순서'
+
+
+def arrow_nbytes(frame):
+    # st.dataframe 이 브라우저로 보내는 것과 같은 Arrow IPC 직렬화 크기
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def paged_table(store, rows, columns, key, sort_columns=None):
+    # 서버에서 정렬/페이지 나누기를 하고 보이는 구간만 st.dataframe 으로 보내는 표.
+    # 화면에 표시된 행 번호(식품 ID) 배열을 돌려준다.
+    rows = np.asarray(rows)
+    sort_columns = sort_columns or columns
+
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_col = st.selectbox('정렬 기준', [DEFAULT_ORDER] + sort_columns, key=f'{key}_sort')
+    with col2:
+        descending = st.toggle('내림차순', key=f'{key}_desc')
+    with col3:
+        page_size = st.selectbox('페이지 크기', PAGE_SIZES, key=f'{key}_size')
+
+    n_pages = max(1, math.ceil(len(rows) / page_size))
+    # 필터가 바뀌어 페이지 수가 줄었으면 첫 페이지로
+    if st.session_state.get(f'{key}_page', 1) > n_pages:
+        st.session_state[f'{key}_page'] = 1
+    with col4:
+        page = st.number_input(f'페이지 (/{n_pages})', min_value=1, max_value=n_pages, step=1, key=f'{key}_page')
+
+    if sort_col != DEFAULT_ORDER:
+        rows = store.sort_rows(rows, sort_col, descending)
+    elif descending:
+        rows = rows[::-1]
+    start = (page - 1) * page_size
+    window = rows[start:start + page_size]
+
+    frame = store.take(window, columns)
+    st.dataframe(frame, hide_index=True)
+    st.caption(
+        f"전체 {len(rows):,}개 중 {start + 1 if len(window) else 0:,}–{start + len(window):,}번째 표시 · "
+        f"이번 렌더 전송량 {arrow_nbytes(frame) / 1024:,.1f} KB"
+    )
+    return window
+
+
+def nutrient_filter(store, key):
+    # 영양성분 범위 조건 입력 패널. {영양성분: (최소, 최대)} 를 돌려준다 (빈 칸은 제한 없음)
+    predicates = {}
+    with st.expander("🔬 영양성분 범위 필터"):
+        cols = st.multiselect('조건을 걸 영양성분', store.nutrient_cols, key=f'{key}_cols',
+                              placeholder="예: 단백질(g), 나트륨(mg), 당류(g)")
+        for col in cols:
+            bounds = store.ranges.bounds(col)
+            hint = f"{bounds[0]:,.4g} ~ {bounds[1]:,.4g}" if bounds else "값 없음"
+            col1, col2 = st.columns(2)
+            with col1:
+                low = st.number_input(f'{col} 이상', value=None, placeholder=hint, key=f'{key}_{col}_min')
+            with col2:
+                high = st.number_input(f'{col} 이하', value=None, placeholder=hint, key=f'{key}_{col}_max')
+            predicates[col] = (low, high)
+    return predicates
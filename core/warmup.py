@@ -0,0 +1,122 @@
+import gc
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from core.reload import FoodDataset
+from core.store import CACHE_DIR, DATA_PATH, WARM_INDEXES
+
+# --- 백그라운드 데이터 준비 ---
+# 저장소 열기(.npy 캐시가 없으면 CSV 파싱) 와 파생 인덱스 준비를 스크립트 스레드가 아닌 작업 스레드에서 한다.
+# 페이지는 준비가 끝날 때까지 기다리지 않고 안내 문구만 그린 뒤 바로 끝난다.
+# 첫 화면(카테고리 별 음식 탐색) 이 쓰는 인덱스까지 만들면 바로 준비 완료로 알리고, 나머지 인덱스는 같은 작업
+# 스레드에서 이어서 만든다 (그 전에 다른 페이지가 먼저 쓰면 그 실행에서 만들어지고 여기서는 건너뜀).
+HEALTH_PATH = Path(os.environ.get('FOOD_HEALTH_FILE', CACHE_DIR / 'health.json'))
+LANDING_INDEXES = ['category_tree', 'ranges']
+# 준비 완료까지의 단계: 저장소 열기 + 첫 화면 인덱스
+STAGES = ['open'] + LANDING_INDEXES
+
+
+class Warmup:
+    def __init__(self, path=DATA_PATH, health_path=HEALTH_PATH):
+        self.path = Path(path)
+        self.health_path = Path(health_path)
+        self.dataset = None
+        self.error = None
+        self.timings = {}
+        self.started_at = time.time()
+        self.ready_at = None
+        self.warm_at = None
+        self._done = threading.Event()
+        self._warm = threading.Event()
+        self.write_health()
+        self._thread = threading.Thread(target=self._run, name='food-warmup', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.dataset = FoodDataset(self.path, timings=self.timings, indexes=LANDING_INDEXES)
+            self.ready_at = time.time()
+            self._done.set()
+            self.write_health()
+            # 갱신으로 저장소가 바뀌었으면 새 버전에 만든다
+            self.dataset.store.warm(self.timings, [name for name in WARM_INDEXES if name not in self.timings])
+        except Exception as exc:
+            # 작업 스레드의 실패는 페이지 오류와 health 로 알림
+            self.error = repr(exc)
+        # 파싱과 인덱스 구성 중에 만든 임시 객체를 바로 회수 (준비 직후 RSS 가 한동안 부풀어 있지 않게)
+        gc.collect()
+        self.ready_at = self.ready_at or time.time()
+        self.warm_at = time.time()
+        self._done.set()
+        self._warm.set()
+        self.write_health()
+
+    @property
+    def ready(self):
+        return self.dataset is not None
+
+    @property
+    def done(self):
+        # 페이지가 더 기다리지 않아도 됨 (준비 완료 또는 실패)
+        return self._done.is_set()
+
+    @property
+    def warm(self):
+        # 나머지 인덱스까지 모두 만듦
+        return self._warm.is_set()
+
+    def wait(self, timeout=None):
+        # 준비가 끝나면 FoodDataset (실패했으면 None)
+        self._done.wait(timeout)
+        return self.dataset
+
+    def wait_warm(self, timeout=None):
+        self._warm.wait(timeout)
+        return self.dataset
+
+    def progress(self):
+        # (끝난 단계 수, 전체 단계 수)
+        return sum(name in self.timings for name in STAGES), len(STAGES)
+
+    def health(self):
+        status = 'ready' if self.ready else 'error' if self.error else 'loading'
+        health = {
+            'status': status,
+            'source': str(self.path),
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'ready_at': self.ready_at,
+            'elapsed_s': round((self.ready_at or time.time()) - self.started_at, 3),
+            'warm': self.warm,
+            'warm_s': round(self.warm_at - self.started_at, 3) if self.warm_at else None,
+            'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+        }
+        if self.error:
+            health['error'] = self.error
+        if self.ready:
+            store = self.dataset.store
+            health.update(version=store.version, rows=store.n_rows, live_rows=int(store.live.sum()),
+                          reloads=sum('version' in event for event in self.dataset.history))
+        return health
+
+    def write_health(self):
+        # 외부 헬스 체크용. 원자적으로 교체해서 읽는 쪽이 반쯤 쓴 파일을 보지 않게 함
+        try:
+            self.health_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.health_path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(json.dumps(self.health(), ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp, self.health_path)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    # 배포 직후 미리 실행해 두면 .npy 캐시가 만들어져 서버의 첫 준비가 파싱 없이 끝남
+    #   python -m core.warmup
+    warmup = Warmup()
+    warmup.wait_warm()
+    print(json.dumps(warmup.health(), ensure_ascii=False, indent=2))
+    raise SystemExit(0 if warmup.ready else 1)
@@ -1,45 +1,56 @@
 import streamlit as st
-import pandas as pd
-
-# 데이터 로드 함수 (캐싱 사용)
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('food.csv', encoding='euc-kr')
-        # 불필요한 공백 제거
-        df.columns = df.columns.str.strip()
-        # 필요한 컬럼만 선택
-        cols = ['식품대분류명', '식품중분류명', '식품소분류명', '식품명', '식품기원명', '에너지(kcal)']
-        return df[cols]
-    except FileNotFoundError:
-        st.error("food.csv 파일을 찾을 수 없습니다. 파일을 현재 디렉토리에 업로드해주세요.")
-        return pd.DataFrame()
-
-# 데이터 로드
-food_df = load_data()
-
-if not food_df.empty:
+
+from core import perf
+from core.basis import BASES
+from core.cache import cached_result
+from core.data import load_store, select_basis
+from core.query import publish, restore
+from core.table import nutrient_filter, paged_table
+
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('1_카테고리_별_음식_탐색')
+
+# 데이터 로드 (모든 페이지가 공유하는 저장소)
+with perf.stage('데이터 로드'):
+    store = load_store()
+
+if store is not None:
+    # 사이드바에서 고른 영양성분 기준으로 환산한 보기 (기준별 집계는 처음 쓸 때 한 번만 계산)
+    store = select_basis(store)
+    basis = BASES[store.basis]
     st.header("🍔 카테고리 별 음식 탐색")
-    st.info("대분류, 중분류, 소분류를 선택하여 원하는 음식의 칼로리 정보를 (100g 기준) 확인하세요.")
+    st.info(f"대분류, 중분류, 소분류를 선택하여 원하는 음식의 칼로리 정보를 ({basis}) 확인하세요.")
 
-    # 대분류 선택
-    unique_dae = food_df['식품대분류명'].unique().tolist()
-    selected_dae = st.selectbox('대분류', unique_dae)
+    # 대분류 → 중분류 → 소분류 옵션과 행 번호는 미리 계산된 카테고리 트리에서 가져옴
+    tree = store.category_tree
+
+    # 대분류 선택 (선택은 URL 의 ?dae=&joong=&so= 로도 복원)
+    unique_dae = tree.options(())
+    restore('explore_dae', 'dae', unique_dae)
+    selected_dae = st.selectbox('대분류', unique_dae, key='explore_dae')
 
     # 중분류 선택 (대분류에 따라 동적 변경)
-    unique_joong = food_df[food_df['식품대분류명'] == selected_dae]['식품중분류명'].unique().tolist()
-    selected_joong = st.selectbox('중분류', unique_joong)
+    unique_joong = tree.options((selected_dae,))
+    restore('explore_joong', 'joong', unique_joong)
+    selected_joong = st.selectbox('중분류', unique_joong, key='explore_joong')
 
     # 소분류 선택 (중분류에 따라 동적 변경)
-    unique_so = food_df[(food_df['식품대분류명'] == selected_dae) & (food_df['식품중분류명'] == selected_joong)]['식품소분류명'].unique().tolist()
-    selected_so = st.selectbox('소분류', unique_so)
+    unique_so = tree.options((selected_dae, selected_joong))
+    restore('explore_so', 'so', unique_so)
+    selected_so = st.selectbox('소분류', unique_so, key='explore_so')
+    query = publish({'dae': selected_dae, 'joong': selected_joong, 'so': selected_so})
+
+    # 영양성분 범위 조건 (정렬 인덱스 + 비트맵으로 카테고리 행과 함께 AND)
+    predicates = nutrient_filter(store, key='explore_filter')
 
-    # 선택된 값에 따라 데이터 필터링
-    filtered_df = food_df[
-        (food_df['식품대분류명'] == selected_dae) &
-        (food_df['식품중분류명'] == selected_joong) &
-        (food_df['식품소분류명'] == selected_so)
-    ]
+    # 선택된 값에 따라 데이터 필터링. 같은 선택이면 다른 세션이 구한 행 번호를 재사용
+    def filter_rows():
+        rows = tree.rows((selected_dae, selected_joong, selected_so))
+        return store.ranges.query(predicates, rows=rows)
+
+    with perf.stage('필터'):
+        filtered_rows = cached_result('1_카테고리_별_음식_탐색', query + tuple(sorted(predicates.items())),
+                                      store, filter_rows)
 
     # 동적으로 제목 생성
     title_parts = [selected_dae]
@@ -49,7 +60,10 @@ if not food_df.empty:
         title_parts.append(selected_so)
     
     dynamic_title = " > ".join(title_parts)
-    st.subheader(f"'{dynamic_title}' 카테고리의 음식 목록 (100g 기준)")
+    st.subheader(f"'{dynamic_title}' 카테고리의 음식 목록 ({basis})")
     
-    # 결과 표시 (상품명, 식품기원명, 에너지(kcal) 컬럼만)
-    st.dataframe(filtered_df[['식품명', '식품기원명', '에너지(kcal)']].reset_index(drop=True))
+    # 결과 표시 (상품명, 식품기원명, 에너지(kcal) 컬럼만, 서버에서 정렬한 뒤 보이는 페이지만 전송)
+    with perf.stage('결과 표'):
+        paged_table(store, filtered_rows, ['식품명', '식품기원명', '에너지(kcal)'], key='explore_table')
+
+perf.finish(perf_run)
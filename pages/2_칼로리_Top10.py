@@ -1,62 +1,68 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-# 데이터 로드 함수 (캐싱 사용)
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('food.csv', encoding='euc-kr')
-        # 불필요한 공백 제거
-        df.columns = df.columns.str.strip()
-        # 필요한 컬럼만 선택
-        cols = ['식품대분류명', '식품명', '식품기원명', '에너지(kcal)']
-        return df[cols]
-    except FileNotFoundError:
-        st.error("food.csv 파일을 찾을 수 없습니다. 파일을 현재 디렉토리에 업로드해주세요.")
-        return pd.DataFrame()
-
-# 데이터 로드
-food_df = load_data()
-
-if not food_df.empty:
+from core import perf
+from core.basis import BASES
+from core.cache import cached_result
+from core.data import load_store, select_basis
+from core.figures import cached_figure
+from core.query import publish, restore
+
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('2_칼로리_Top10')
+
+# 데이터 로드 (모든 페이지가 공유하는 저장소)
+with perf.stage('데이터 로드'):
+    store = load_store()
+
+if store is not None:
+    # 사이드바에서 고른 영양성분 기준으로 환산한 보기 (기준별 집계는 처음 쓸 때 한 번만 계산)
+    store = select_basis(store)
+    basis = BASES[store.basis]
     st.header("🏆 칼로리 Top 10")
-    st.info("대분류를 선택하여 해당 카테고리의 칼로리 랭킹을 (100g 기준) 확인하세요.")
+    st.info(f"대분류를 선택하여 해당 카테고리의 칼로리 랭킹을 ({basis}) 확인하세요.")
 
-    # 대분류 선택
-    unique_dae = food_df['식품대분류명'].unique().tolist()
-    selected_dae = st.selectbox('대분류', unique_dae)
+    # 대분류별 Top 10 은 로드 시점에 미리 계산된 집계 테이블에서 가져옴
+    tree = store.category_tree
+    aggregates = store.aggregates
 
-    # 선택된 대분류에 따라 데이터 필터링 및 정렬
-    top_10_df = food_df[food_df['식품대분류명'] == selected_dae].copy()
-    
-    # '에너지(kcal)' 컬럼을 숫자형으로 변환 (오류 발생 시 NaN으로 처리)
-    top_10_df['에너지(kcal)'] = pd.to_numeric(top_10_df['에너지(kcal)'], errors='coerce')
-    
-    # NaN 값을 가진 행 제거
-    top_10_df.dropna(subset=['에너지(kcal)'], inplace=True)
+    # 대분류 선택
+    unique_dae = tree.options(())
+    restore('top10_dae', 'dae', unique_dae)
+    selected_dae = st.selectbox('대분류', unique_dae, key='top10_dae')
+    query = publish({'dae': selected_dae})
 
-    # 칼로리 기준으로 내림차순 정렬
-    top_10_df = top_10_df.sort_values(by='에너지(kcal)', ascending=False)
+    # 선택된 대분류의 칼로리 내림차순 상위 행 (칼로리 결측 행은 제외됨). 표는 모든 세션이 공유
+    with perf.stage('Top10 조회'):
+        display_df = cached_result('2_칼로리_Top10', query, store, lambda: store.take(
+            aggregates.top((selected_dae,), '에너지(kcal)'), ['식품명', '식품기원명', '에너지(kcal)']))
 
     # 표시할 데이터 개수 결정 (10개 또는 그 미만)
-    display_count = min(10, len(top_10_df))
+    display_count = len(display_df)
     
-    st.subheader(f"'{selected_dae}' 카테고리의 칼로리 Top {display_count} (100g 기준)")
+    st.subheader(f"'{selected_dae}' 카테고리의 칼로리 Top {display_count} ({basis})")
     
     # 결과 표시
-    display_df = top_10_df[['식품명', '식품기원명', '에너지(kcal)']].head(display_count).reset_index(drop=True)
     st.dataframe(display_df)
 
     # 대화형 그래프 추가
-    st.subheader("📊 칼로리 비교 그래프 (100g 기준)")
-    fig = px.bar(
-        display_df.sort_values('에너지(kcal)', ascending=True), 
-        x='에너지(kcal)', 
-        y='식품명',
-        orientation='h',
-        title=f"'{selected_dae}' 칼로리 Top {display_count} 비교 (100g 기준)",
-        labels={'식품명': '음식 이름', '에너지(kcal)': '칼로리(kcal) (100g 기준)'}
-    )
-    fig.update_layout(yaxis_title="", xaxis_title="칼로리(kcal) (100g 기준)")
-    st.plotly_chart(fig)
+    st.subheader(f"📊 칼로리 비교 그래프 ({basis})")
+    def build_figure():
+        fig = px.bar(
+            display_df.sort_values('에너지(kcal)', ascending=True), 
+            x='에너지(kcal)', 
+            y='식품명',
+            orientation='h',
+            title=f"'{selected_dae}' 칼로리 Top {display_count} 비교 ({basis})",
+            labels={'식품명': '음식 이름', '에너지(kcal)': f'칼로리(kcal) ({basis})'}
+        )
+        fig.update_layout(yaxis_title="", xaxis_title=f"칼로리(kcal) ({basis})")
+        return fig
+
+    # 같은 대분류면 이전에 만든 그래프를 재사용 (모든 세션 공유)
+    with perf.stage('그래프 생성'):
+        fig = cached_figure('2_칼로리_Top10', selected_dae, store, build_figure)
+    with perf.stage('그래프 전송'):
+        st.plotly_chart(fig)
+
+perf.finish(perf_run)
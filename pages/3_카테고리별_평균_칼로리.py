@@ -1,52 +1,58 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 
-# 데이터 로드 함수 (캐싱 사용)
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('food.csv', encoding='euc-kr')
-        # 불필요한 공백 제거
-        df.columns = df.columns.str.strip()
-        # 필요한 컬럼만 선택
-        cols = ['식품대분류명', '에너지(kcal)']
-        return df[cols]
-    except FileNotFoundError:
-        st.error("food.csv 파일을 찾을 수 없습니다. 파일을 현재 디렉토리에 업로드해주세요.")
-        return pd.DataFrame()
-
-# 데이터 로드
-food_df = load_data()
-
-if not food_df.empty:
+from core import perf
+from core.basis import BASES
+from core.cache import cached_result
+from core.data import load_store, select_basis
+from core.figures import cached_figure
+
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('3_카테고리별_평균_칼로리')
+
+# 데이터 로드 (모든 페이지가 공유하는 저장소)
+with perf.stage('데이터 로드'):
+    store = load_store()
+
+if store is not None:
+    # 사이드바에서 고른 영양성분 기준으로 환산한 보기 (기준별 집계는 처음 쓸 때 한 번만 계산)
+    store = select_basis(store)
+    basis = BASES[store.basis]
     st.header("📊 카테고리별 평균 칼로리")
-    st.info("각 식품 대분류의 평균 칼로리 정보를 (100g 기준) 확인하세요.")
+    st.info(f"각 식품 대분류의 평균 칼로리 정보를 ({basis}) 확인하세요.")
 
-    # '에너지(kcal)' 컬럼을 숫자형으로 변환 (오류 발생 시 NaN으로 처리)
-    food_df['에너지(kcal)'] = pd.to_numeric(food_df['에너지(kcal)'], errors='coerce')
-    
-    # NaN 값을 가진 행 제거
-    food_df.dropna(subset=['에너지(kcal)'], inplace=True)
+    # 카테고리별 평균 에너지 (로드 시점에 미리 계산된 집계 테이블, 결측값 제외)
+    def average_table():
+        table = store.aggregates.children_table((), '에너지(kcal)')['mean'].dropna().sort_values(ascending=False).reset_index()
+        # 컬럼명 변경
+        table.columns = ['식품대분류명', '평균 에너지(kcal)']
+        return table
 
-    # 카테고리별 평균 에너지 계산
-    avg_calorie_df = food_df.groupby('식품대분류명')['에너지(kcal)'].mean().sort_values(ascending=False).reset_index()
-    
-    # 컬럼명 변경
-    avg_calorie_df.columns = ['식품대분류명', '평균 에너지(kcal)']
+    # 선택 항목이 없으므로 기준(데이터 버전) 마다 한 번만 만들어 모든 세션이 공유
+    with perf.stage('평균 조회'):
+        avg_calorie_df = cached_result('3_카테고리별_평균_칼로리', (), store, average_table)
 
-    st.subheader("🍽️ 식품 대분류별 평균 칼로리 표 (100g 기준)")
+    st.subheader(f"🍽️ 식품 대분류별 평균 칼로리 표 ({basis})")
     st.dataframe(avg_calorie_df)
 
     # 대화형 그래프 추가
-    st.subheader("📈 식품 대분류별 평균 칼로리 그래프 (100g 기준)")
-    fig = px.bar(
-        avg_calorie_df.sort_values('평균 에너지(kcal)', ascending=True),
-        x='평균 에너지(kcal)', 
-        y='식품대분류명',
-        orientation='h',
-        title="식품 대분류별 평균 칼로리 비교 (100g 기준)",
-        labels={'식품대분류명': '식품 대분류', '평균 에너지(kcal)': '평균 칼로리(kcal) (100g 기준)'}
-    )
-    fig.update_layout(yaxis_title="", xaxis_title="평균 칼로리(kcal) (100g 기준)")
-    st.plotly_chart(fig)
+    st.subheader(f"📈 식품 대분류별 평균 칼로리 그래프 ({basis})")
+    def build_figure():
+        fig = px.bar(
+            avg_calorie_df.sort_values('평균 에너지(kcal)', ascending=True),
+            x='평균 에너지(kcal)', 
+            y='식품대분류명',
+            orientation='h',
+            title=f"식품 대분류별 평균 칼로리 비교 ({basis})",
+            labels={'식품대분류명': '식품 대분류', '평균 에너지(kcal)': f'평균 칼로리(kcal) ({basis})'}
+        )
+        fig.update_layout(yaxis_title="", xaxis_title=f"평균 칼로리(kcal) ({basis})")
+        return fig
+
+    # 선택 항목이 없으므로 데이터 버전마다 한 번만 만들어짐
+    with perf.stage('그래프 생성'):
+        fig = cached_figure('3_카테고리별_평균_칼로리', (), store, build_figure)
+    with perf.stage('그래프 전송'):
+        st.plotly_chart(fig)
+
+perf.finish(perf_run)
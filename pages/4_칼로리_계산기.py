@@ -1,14 +1,18 @@
 import streamlit as st
 import pandas as pd
-# --- 상수 및 설정 ---
-NUTRIENT_COLS = [
-    '에너지(kcal)', '수분(g)', '단백질(g)', '지방(g)', '회분(g)', '탄수화물(g)', 
-    '당류(g)', '식이섬유(g)', '칼슘(mg)', '철(mg)', '인(mg)', '칼륨(mg)', 
-    '나트륨(mg)', '비타민 A(μg RAE)', '레티놀(μg)', '베타카로틴(μg)', '티아민(mg)', 
-    '리보플라빈(mg)', '니아신(mg)', '비타민 C(mg)', '비타민 D(μg)', '콜레스테롤(mg)', 
-    '포화지방산(g)', '트랜스지방산(g)'
-]
 
+from core import perf
+from core.cart import MAX_ITEM_GRAMS, Cart, CartFull, cart_arrays, cart_nutrients
+from core.basis import BASES
+from core.cache import cached_result
+from core.data import load_store, select_basis
+from core.optimizer import DEFAULT_MAX_GRAMS, submit_meal_plan
+from core.query import canonical, publish, restore
+from core.reports import FORMATS, available_formats, queued, submit_report
+from core.store import NUTRIENT_COLS
+from core.table import nutrient_filter, paged_table
+
+# --- 상수 및 설정 ---
 # 5대 영양소 및 권장 섭취량 기준 (일반적인 성인 기준, g/mg 단위)
 RECOMMENDED_INTAKE = {
     '탄수화물(g)': 324, # g
@@ -18,32 +22,53 @@ RECOMMENDED_INTAKE = {
     '나트륨(mg)': 2000   # mg
 }
 
+# 음식 검색 결과 최대 개수
+MAX_FOOD_OPTIONS = 200
+# 음식 목록 표에 보여줄 컬럼
+FOOD_TABLE_COLS = ['식품명', '식품기원명', '에너지(kcal)', '탄수화물(g)', '단백질(g)', '지방(g)']
+# 주소창에 싣는 장바구니 코드의 최대 길이 (넘으면 URL 에서 빼고 공유 코드로만 옮김. 항목당 약 28자)
+MAX_CART_PARAM = 2000
+# 필터 상태 키 → URL 파라미터
+FILTER_PARAMS = {
+    'selected_dae_filter': 'dae',
+    'selected_joong_filter': 'joong',
+    'selected_so_filter': 'so',
+    'selected_giwon_filter': 'giwon',
+}
+
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('4_칼로리_계산기')
+
 # --- 데이터 로드 ---
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('food.csv', encoding='euc-kr')
-        df.columns = df.columns.str.strip()
-        for col in NUTRIENT_COLS:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        return df
-    except FileNotFoundError:
-        st.error("food.csv 파일을 찾을 수 없습니다.")
-        return pd.DataFrame()
-
-food_df = load_data()
+with perf.stage('데이터 로드'):
+    store = load_store()
 
 # --- 세션 상태 초기화 ---
-if 'cart' not in st.session_state: st.session_state.cart = {}
-if 'selected_dae_filter' not in st.session_state: st.session_state.selected_dae_filter = '전체'
-# ... (이하 필터 초기화 동일)
-if 'selected_joong_filter' not in st.session_state: st.session_state.selected_joong_filter = '전체'
-if 'selected_so_filter' not in st.session_state: st.session_state.selected_so_filter = '전체'
-if 'selected_giwon_filter' not in st.session_state: st.session_state.selected_giwon_filter = '전체'
+# 새로고침/공유 링크면 URL(?cart=&dae=&joong=&so=&giwon=) 의 값으로. 준비 중 실행에서 기본값을 채워 버리면
+# URL 값을 잃으므로 저장소가 준비된 뒤에만 초기화
+if store is not None:
+    restore('cart', 'cart', parse=lambda token: Cart.from_token(token, store.key_index, live=store.live))
+    for key, param in FILTER_PARAMS.items():
+        restore(key, param)
+    if 'cart' not in st.session_state: st.session_state.cart = Cart()
+    if st.session_state.cart.dropped:
+        # URL 의 장바구니를 만든 뒤 데이터 갱신으로 삭제된 음식은 빼고 복원됨
+        st.toast(f"장바구니에 있던 음식 {st.session_state.cart.dropped}개가 데이터에서 삭제되어 뺐습니다.")
+        st.session_state.cart.dropped = 0
+    if 'selected_dae_filter' not in st.session_state: st.session_state.selected_dae_filter = '전체'
+    # ... (이하 필터 초기화 동일)
+    if 'selected_joong_filter' not in st.session_state: st.session_state.selected_joong_filter = '전체'
+    if 'selected_so_filter' not in st.session_state: st.session_state.selected_so_filter = '전체'
+    if 'selected_giwon_filter' not in st.session_state: st.session_state.selected_giwon_filter = '전체'
+
+def clear_gram_inputs():
+    # 그램 입력칸(num_<ID>) 의 위젯 상태는 장바구니 값보다 우선하므로 장바구니를 통째로 바꿀 때 함께 지움
+    for key in [key for key in st.session_state if str(key).startswith('num_')]:
+        del st.session_state[key]
 
 def reset_all():
-    st.session_state.cart = {}
+    st.session_state.cart = Cart()
+    clear_gram_inputs()
     st.session_state.selected_dae_filter = '전체'
     st.session_state.selected_joong_filter = '전체'
     st.session_state.selected_so_filter = '전체'
@@ -54,8 +79,21 @@ def reset_all():
     st.session_state.user_weight = 0
     st.rerun()
 
+def filter_index(key, options):
+    # URL 을 고쳐 써서 옵션에 없는 값이 들어왔으면 '전체' 로
+    if st.session_state[key] not in options:
+        st.session_state[key] = '전체'
+    return options.index(st.session_state[key])
+
+def get_recommended_calories():
+    # 표준 체중 및 권장 칼로리 계산 (단순화된 공식). 사용자 정보가 없으면 None
+    if st.session_state.get('user_weight', 0) <= 0 or st.session_state.get('user_height', 0) <= 0:
+        return None
+    std_weight = (st.session_state.user_height - 100) * 0.9
+    return std_weight * 30 if st.session_state.user_gender == "남성" else std_weight * 25
+
 # --- 메인 앱 ---
-if not food_df.empty:
+if store is not None and store.n_rows:
     st.header("🧮 스마트 영양성분 계산기")
     st.info("사용자 정보를 입력하고 음식을 추가하여 영양 섭취량을 분석해 보세요.")
 
@@ -75,131 +113,338 @@ if not food_df.empty:
     # --- 필터링 UI (기존과 동일) ---
     st.subheader("음식 필터")
     # ... (필터 UI 코드는 변경 없음)
+    # '전체' 는 카테고리 트리에서 None(필터 없음) 으로 조회
+    tree = store.category_tree
+    filter_path = ()
     col1, col2 = st.columns(2)
     with col1:
-        unique_dae = ['전체'] + food_df['식품대분류명'].unique().tolist()
+        unique_dae = ['전체'] + tree.options(filter_path)
         selected_dae = st.selectbox(
-            '대분류', unique_dae, index=unique_dae.index(st.session_state.selected_dae_filter), key='dae_filter_widget',
+            '대분류', unique_dae, index=filter_index('selected_dae_filter', unique_dae), key='dae_filter_widget',
             on_change=lambda: st.session_state.update(selected_dae_filter=st.session_state.dae_filter_widget, selected_joong_filter='전체', selected_so_filter='전체', selected_giwon_filter='전체')
         )
-    filtered_df1 = food_df[food_df['식품대분류명'] == st.session_state.selected_dae_filter] if st.session_state.selected_dae_filter != '전체' else food_df
+    filter_path += (st.session_state.selected_dae_filter if st.session_state.selected_dae_filter != '전체' else None,)
     with col2:
-        unique_joong = ['전체'] + filtered_df1['식품중분류명'].unique().tolist()
+        unique_joong = ['전체'] + tree.options(filter_path)
         selected_joong = st.selectbox(
-            '중분류', unique_joong, index=unique_joong.index(st.session_state.selected_joong_filter), key='joong_filter_widget',
+            '중분류', unique_joong, index=filter_index('selected_joong_filter', unique_joong), key='joong_filter_widget',
             on_change=lambda: st.session_state.update(selected_joong_filter=st.session_state.joong_filter_widget, selected_so_filter='전체', selected_giwon_filter='전체')
         )
-    filtered_df2 = filtered_df1[filtered_df1['식품중분류명'] == st.session_state.selected_joong_filter] if st.session_state.selected_joong_filter != '전체' else filtered_df1
+    filter_path += (st.session_state.selected_joong_filter if st.session_state.selected_joong_filter != '전체' else None,)
     col3, col4 = st.columns(2)
     with col3:
-        unique_so = ['전체'] + filtered_df2['식품소분류명'].unique().tolist()
+        unique_so = ['전체'] + tree.options(filter_path)
         selected_so = st.selectbox(
-            '소분류', unique_so, index=unique_so.index(st.session_state.selected_so_filter), key='so_filter_widget',
+            '소분류', unique_so, index=filter_index('selected_so_filter', unique_so), key='so_filter_widget',
             on_change=lambda: st.session_state.update(selected_so_filter=st.session_state.so_filter_widget, selected_giwon_filter='전체')
         )
-    filtered_df3 = filtered_df2[filtered_df2['식품소분류명'] == st.session_state.selected_so_filter] if st.session_state.selected_so_filter != '전체' else filtered_df2
+    filter_path += (st.session_state.selected_so_filter if st.session_state.selected_so_filter != '전체' else None,)
     with col4:
-        unique_giwon = ['전체'] + filtered_df3['식품기원명'].unique().tolist()
+        unique_giwon = ['전체'] + tree.options(filter_path)
         selected_giwon = st.selectbox(
-            '식품기원명', unique_giwon, index=unique_giwon.index(st.session_state.selected_giwon_filter), key='giwon_filter_widget',
+            '식품기원명', unique_giwon, index=filter_index('selected_giwon_filter', unique_giwon), key='giwon_filter_widget',
             on_change=lambda: st.session_state.update(selected_giwon_filter=st.session_state.giwon_filter_widget)
         )
-    final_filtered_df = filtered_df3[filtered_df3['식품기원명'] == st.session_state.selected_giwon_filter] if st.session_state.selected_giwon_filter != '전체' else filtered_df3
-    food_list = final_filtered_df['식품명'].unique().tolist()
+    filter_path += (st.session_state.selected_giwon_filter if st.session_state.selected_giwon_filter != '전체' else None,)
+    # URL 과 결과 캐시에 쓰는 필터 상태 ('전체' 는 기본값이라 뺌)
+    filters = {param: st.session_state[key] if st.session_state[key] != '전체' else None
+               for key, param in FILTER_PARAMS.items()}
+    # 표와 범위 조건은 사이드바에서 고른 기준으로, 장바구니 계산은 항상 그램 × 기준량(100g/100ml) 값
+    basis_view = select_basis(store)
+    predicates = nutrient_filter(basis_view, key='food_filter')
+    # 같은 필터 조합이면 다른 세션이 구한 행 번호를 재사용
+    with perf.stage('필터'):
+        final_rows = cached_result('4_칼로리_계산기', canonical(filters) + tuple(sorted(predicates.items())), basis_view,
+                                   lambda: basis_view.ranges.query(predicates, rows=tree.rows(filter_path)))
 
     # --- 음식 선택 및 장바구니 추가 (기존과 동일) ---
     def add_to_cart():
-        selected_foods = st.session_state.food_multiselect_widget
-        for food_name in selected_foods:
-            if food_name not in st.session_state.cart:
-                food_info = food_df[food_df['식품명'] == food_name].iloc[0]
-                st.session_state.cart[food_name] = {'grams': 100, 'nutrients': food_info[NUTRIENT_COLS]}
+        # 위젯과 장바구니는 식품 ID(행 번호) 를 주고받으므로 이름으로 표를 다시 훑지 않음
+        try:
+            for food_id in st.session_state.food_multiselect_widget:
+                if food_id not in st.session_state.cart:
+                    st.session_state.cart[food_id] = 100
+        except CartFull as exc:
+            st.toast(str(exc))
         st.session_state.food_multiselect_widget = []
     st.subheader("음식 선택하여 장바구니에 추가")
-    st.multiselect('음식을 검색하거나 목록에서 선택하세요', food_list, label_visibility="collapsed", key='food_multiselect_widget')
+    food_labels = store.food_labels
+    # 전체 목록 대신 서버에서 검색한 결과만 위젯에 넘김 (초성, 부분 일치, 오타 허용)
+    search_query = st.text_input('음식 이름 검색', key='food_search_widget', placeholder="예: 김치찌개, ㄱㅊㅉㄱ, 아메리카노")
+    table_rows = final_rows
+    if search_query:
+        with perf.stage('음식 검색'):
+            table_rows, _ = store.search.search(search_query, limit=MAX_FOOD_OPTIONS, rows=final_rows)
+    # 필터/검색 결과는 서버에서 정렬·페이지 나누기 후 현재 페이지만 표와 선택 목록으로 보냄
+    st.caption(f"표의 영양성분: {BASES[basis_view.basis]}")
+    with perf.stage('음식 목록 표'):
+        window = paged_table(basis_view, table_rows, FOOD_TABLE_COLS, key='food_table')
+    # 이미 고른 음식은 페이지나 검색어가 바뀌어도 선택이 풀리지 않도록 옵션에 유지
+    food_ids = list(dict.fromkeys(st.session_state.get('food_multiselect_widget', []) + window.tolist()))
+    st.multiselect('표의 현재 페이지에서 음식을 선택하세요', food_ids, format_func=food_labels.__getitem__, label_visibility="collapsed", key='food_multiselect_widget')
     st.button("장바구니에 추가", key='add_to_cart_button', on_click=add_to_cart)
 
-    # --- 장바구니 및 영양성분 계산 (기존과 동일) ---
-    if st.session_state.cart:
-        st.subheader("🛒 나의 장바구니")
-        total_nutrients = pd.Series(0.0, index=NUTRIENT_COLS)
-        # ... (장바구니 UI 및 계산 로직은 변경 없음)
-        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-        col1.write("**음식명**"); col2.write("**그램(g)**"); col3.write("**칼로리(kcal)**")
-        for food_name, details in list(st.session_state.cart.items()):
-            col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-            with col1: st.write(food_name)
+    # --- 식단 자동 구성 (선형 계획, 작업 스레드에서 계산) ---
+    def apply_meal_plan():
+        # 그램 입력칸의 위젯 상태도 함께 바꾼다. 장바구니 음식으로 계산한 식단이면 식단에서 빠진 음식은 장바구니에서도 뺀다
+        plan, cart = st.session_state.meal_plan, st.session_state.cart
+        try:
+            for food_id, grams in plan['grams'].items():
+                cart[food_id] = grams
+                st.session_state[f"num_{food_id}"] = min(grams, MAX_ITEM_GRAMS)
+        except CartFull as exc:
+            st.toast(str(exc))
+        if st.session_state.get('meal_plan_from_cart'):
+            for food_id in [food_id for food_id, _ in cart.items() if food_id not in plan['grams']]:
+                del cart[food_id]
+                st.session_state.pop(f"num_{food_id}", None)
+        # 버튼은 식단 구성 부분에 있지만 장바구니도 바뀌므로 앱 전체를 다시 실행
+        st.rerun()
+
+    @st.fragment(run_every=0.5)
+    def poll_meal_plan():
+        # 계산이 끝날 때까지 이 부분만 주기적으로 다시 그림
+        job = st.session_state.meal_plan_job
+        if job.done():
+            try:
+                st.session_state.meal_plan = job.result()
+            except Exception as exc:
+                # 최적화기나 작업 스레드의 실패는 페이지를 멈추지 않고 안내만
+                st.session_state.meal_plan_error = str(exc) or repr(exc)
+            del st.session_state.meal_plan_job
+            st.rerun()
+        st.info("최적 식단을 계산하는 중입니다...")
+
+    # 목표 입력과 계산은 이 부분만 다시 실행하고, 장바구니 그램을 고칠 때도 다시 그리지 않음
+    @st.fragment
+    def meal_plan_section():
+        with st.expander("🤖 식단 자동 구성"):
+            st.caption("후보 음식의 양을 조절해 목표 칼로리와 주요 영양소 권장량을 허용 오차 안에서 맞춥니다. (당류·나트륨은 상한)")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                calorie_target = st.number_input("목표 칼로리(kcal)", min_value=500, max_value=5000, step=50,
+                                                 value=int(get_recommended_calories() or 2000), key='plan_calories')
             with col2:
-                grams = st.number_input(f"grams_for_{food_name}", min_value=0, value=details['grams'], step=10, key=f"num_{food_name}", label_visibility="collapsed")
-                st.session_state.cart[food_name]['grams'] = grams
-            item_nutrients = (details['nutrients'] / 100) * grams
-            total_nutrients += item_nutrients
-            with col3: st.write(f"{item_nutrients['에너지(kcal)']:,.1f}")
-            with col4:
-                if st.button("삭제", key=f"del_{food_name}"):
-                    del st.session_state.cart[food_name]
-                    st.rerun()
+                tolerance = st.slider("허용 오차(%)", 5, 30, 10, key='plan_tolerance')
+            with col3:
+                max_grams = st.number_input("음식당 최대 그램", min_value=10, max_value=1000, value=DEFAULT_MAX_GRAMS, step=10, key='plan_max_grams')
+            plan_source = st.radio("후보 음식", ["현재 필터 결과", "장바구니 음식 (담은 양이 최대치)"], horizontal=True, key='plan_source')
+            if st.button("최적 식단 계산", key='plan_run', disabled='meal_plan_job' in st.session_state):
+                if plan_source == "현재 필터 결과":
+                    candidates, caps = final_rows, None
+                else:
+                    candidates, caps = st.session_state.cart.ids.copy(), dict(st.session_state.cart.items())
+                targets = {'에너지(kcal)': calorie_target, **RECOMMENDED_INTAKE}
+                st.session_state.meal_plan_job = submit_meal_plan(
+                    store, candidates, targets, tolerance=tolerance / 100, max_grams=max_grams, caps=caps)
+                st.session_state.meal_plan_from_cart = caps is not None
+                st.session_state.pop('meal_plan', None)
+                st.session_state.pop('meal_plan_error', None)
+
+            if 'meal_plan_job' in st.session_state:
+                poll_meal_plan()
+            elif 'meal_plan_error' in st.session_state:
+                st.error(f"최적 식단을 계산하지 못했습니다: {st.session_state.meal_plan_error}")
+            elif 'meal_plan' in st.session_state:
+                plan = st.session_state.meal_plan
+                (st.success if plan['ok'] else st.warning)(plan['status'])
+                st.caption(f"후보 {plan['n_candidates']:,}개 · 계산 {plan['seconds'] * 1000:,.0f} ms")
+                if plan['grams']:
+                    plan_df = store.take(list(plan['grams']), ['식품명', '식품기원명', '에너지(kcal)'])
+                    plan_df.insert(2, '그램(g)', list(plan['grams'].values()))
+                    st.dataframe(plan_df, hide_index=True)
+                    st.dataframe(pd.DataFrame({'목표': {'에너지(kcal)': calorie_target, **RECOMMENDED_INTAKE},
+                                               '결과': plan['totals']}).round(1))
+                    st.button("장바구니에 담기", key='plan_apply', on_click=apply_meal_plan)
+
+    meal_plan_section()
+
+    # --- 장바구니 및 영양성분 계산 ---
+    # 그램을 고치면 이 부분만 다시 실행 (필터, 식단 자동 구성, 보고서는 그대로). 항목 삭제는 앱 전체를 다시 실행
+    @st.fragment
+    def cart_section():
+        token = st.session_state.cart.to_token(store.food_keys) if st.session_state.cart else None
+        if st.session_state.cart:
+            st.subheader("🛒 나의 장바구니")
+            cart = st.session_state.cart
+            col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+            col1.write("**음식명**"); col2.write("**그램(g)**"); col3.write("**칼로리(kcal)**")
+            # 그램 입력을 먼저 모두 받은 뒤 한 번에 계산하고, 칼로리 칸은 나중에 채움
+            kcal_cells = []
+            for food_id, grams in list(cart.items()):
+                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+                with col1: st.write(food_labels[food_id])
+                with col2:
+                    # 입력칸 값은 위젯 상태로만 정함 (value 를 함께 주면 식단 적용 등으로 바꾼 상태와 충돌)
+                    if f"num_{food_id}" not in st.session_state: st.session_state[f"num_{food_id}"] = int(grams)
+                    cart[food_id] = st.number_input(f"grams_for_{food_id}", min_value=0, max_value=MAX_ITEM_GRAMS, step=10, key=f"num_{food_id}", label_visibility="collapsed")
+                kcal_cells.append(col3.empty())
+                with col4:
+                    if st.button("삭제", key=f"del_{food_id}"):
+                        del cart[food_id]
+                        st.rerun()
+
+            with perf.stage('장바구니 계산'):
+                item_nutrients, totals = cart_nutrients(store.nutrient_matrix, *cart_arrays(cart))
+            for cell, kcal in zip(kcal_cells, item_nutrients[:, NUTRIENT_COLS.index('에너지(kcal)')]):
+                cell.write(f"{kcal:,.1f}")
+            total_nutrients = pd.Series(totals, index=NUTRIENT_COLS)
         
-        st.subheader(f"총 칼로리: **{total_nutrients['에너지(kcal)']:,.2f} kcal**")
+            st.subheader(f"총 칼로리: **{total_nutrients['에너지(kcal)']:,.2f} kcal**")
 
-        # --- 개인화된 영양 분석 ---
-        if st.session_state.user_weight > 0 and st.session_state.user_height > 0:
-            st.subheader("📈 내 섭취량 분석")
+            # --- 개인화된 영양 분석 ---
+            if st.session_state.user_weight > 0 and st.session_state.user_height > 0:
+                st.subheader("📈 내 섭취량 분석")
             
-            # 표준 체중 및 권장 칼로리 계산 (단순화된 공식)
-            std_weight = (st.session_state.user_height - 100) * 0.9
-            recommended_calories = std_weight * 30 if st.session_state.user_gender == "남성" else std_weight * 25
+                recommended_calories = get_recommended_calories()
             
-            # 칼로리 분석
-            total_calories_val = total_nutrients['에너지(kcal)']
-            if total_calories_val < recommended_calories * 0.8:
-                st.warning(f"현재 섭취 칼로리는 권장량({recommended_calories:,.0f} kcal)보다 부족합니다.")
-            elif total_calories_val > recommended_calories * 1.2:
-                st.error(f"현재 섭취 칼로리는 권장량({recommended_calories:,.0f} kcal)을 초과합니다.")
-            else:
-                st.success(f"현재 섭취 칼로리가 권장량({recommended_calories:,.0f} kcal)에 가깝습니다.")
-            
-            # 5대 영양소 분석
-            st.write("**주요 영양소 섭취 현황**")
-            for nutrient, rec_val in RECOMMENDED_INTAKE.items():
-                current_val = total_nutrients.get(nutrient, 0)
-                percentage_raw = (current_val / rec_val) * 100 if rec_val > 0 else 0
-
-                # 섭취량에 따른 색상 결정
-                if percentage_raw >= 200:
-                    color = "#ff4b4b"  # 빨강 (2배 초과)
-                elif percentage_raw >= 150:
-                    color = "#ffc400"  # 노랑 (1.5배 초과)
-                elif percentage_raw >= 80:
-                    color = "#28a745"  # 초록 (적절)
+                # 칼로리 분석
+                total_calories_val = total_nutrients['에너지(kcal)']
+                if total_calories_val < recommended_calories * 0.8:
+                    st.warning(f"현재 섭취 칼로리는 권장량({recommended_calories:,.0f} kcal)보다 부족합니다.")
+                elif total_calories_val > recommended_calories * 1.2:
+                    st.error(f"현재 섭취 칼로리는 권장량({recommended_calories:,.0f} kcal)을 초과합니다.")
                 else:
-                    color = "#007bff"  # 파랑 (부족)
+                    st.success(f"현재 섭취 칼로리가 권장량({recommended_calories:,.0f} kcal)에 가깝습니다.")
+            
+                # 5대 영양소 분석
+                st.write("**주요 영양소 섭취 현황**")
+                for nutrient, rec_val in RECOMMENDED_INTAKE.items():
+                    current_val = total_nutrients.get(nutrient, 0)
+                    percentage_raw = (current_val / rec_val) * 100 if rec_val > 0 else 0
+
+                    # 섭취량에 따른 색상 결정
+                    if percentage_raw >= 200:
+                        color = "#ff4b4b"  # 빨강 (2배 초과)
+                    elif percentage_raw >= 150:
+                        color = "#ffc400"  # 노랑 (1.5배 초과)
+                    elif percentage_raw >= 80:
+                        color = "#28a745"  # 초록 (적절)
+                    else:
+                        color = "#007bff"  # 파랑 (부족)
 
-                # 시각적 표시를 위한 퍼센티지 (최대 100%)
-                percentage_display = min(percentage_raw, 100)
+                    # 시각적 표시를 위한 퍼센티지 (최대 100%)
+                    percentage_display = min(percentage_raw, 100)
 
-                # 텍스트 표시
-                st.write(f"**{nutrient.split('(')[0]}** : {current_val:,.1f} / {rec_val:,.0f} {nutrient.split('(')[1].replace(')','')}")
+                    # 텍스트 표시
+                    st.write(f"**{nutrient.split('(')[0]}** : {current_val:,.1f} / {rec_val:,.0f} {nutrient.split('(')[1].replace(')','')}")
                 
-                # 커스텀 진행률 막대 (HTML/CSS)
-                progress_bar_html = f"""
-                <div style="background-color: #e9ecef; border-radius: 5px; height: 10px; width: 100%;">
-                  <div style="background-color: {color}; width: {percentage_display}%; border-radius: 5px; height: 100%;"></div>
-                </div>
-                """
-                st.markdown(progress_bar_html, unsafe_allow_html=True)
-
-        with st.expander("📊 모든 영양성분 합계 보기"):
-            nutrient_df = total_nutrients.reset_index(); nutrient_df.columns = ['영양성분', '함량']
-            nutrient_df['함량'] = nutrient_df['함량'].map('{:,.2f}'.format)
-            col1, col2 = st.columns(2)
-            with col1: st.dataframe(nutrient_df.iloc[:len(NUTRIENT_COLS)//2])
-            with col2: st.dataframe(nutrient_df.iloc[len(NUTRIENT_COLS)//2:])
-    else:
-        st.warning("음식을 선택하고 '장바구니에 추가' 버튼을 눌러주세요.")
-
-    # --- 칼로리 초과 시 동영상 표시 ---
-    if 'total_nutrients' in locals() and total_nutrients['에너지(kcal)'] > 2500:
-        st.subheader("오늘 섭취 칼로리가 높네요! 가벼운 운동은 어떠신가요? 💪")
-        st.video("https://www.youtube.com/watch?v=DCAp0b16kyo")
-        import streamlit as st
+                    # 커스텀 진행률 막대 (HTML/CSS)
+                    progress_bar_html = f"""
+                    <div style="background-color: #e9ecef; border-radius: 5px; height: 10px; width: 100%;">
+                      <div style="background-color: {color}; width: {percentage_display}%; border-radius: 5px; height: 100%;"></div>
+                    </div>
+                    """
+                    st.markdown(progress_bar_html, unsafe_allow_html=True)
+
+            with st.expander("📊 모든 영양성분 합계 보기"):
+                nutrient_df = total_nutrients.reset_index(); nutrient_df.columns = ['영양성분', '함량']
+                nutrient_df['함량'] = nutrient_df['함량'].map('{:,.2f}'.format)
+                col1, col2 = st.columns(2)
+                with col1: st.dataframe(nutrient_df.iloc[:len(NUTRIENT_COLS)//2])
+                with col2: st.dataframe(nutrient_df.iloc[len(NUTRIENT_COLS)//2:])
+
+            # --- 장바구니 공유 (바이트열 → base64url 코드) ---
+            with st.expander("🔗 장바구니 공유"):
+                st.code(token, language=None)
+                st.caption(f"{len(cart)}/{cart.limit}개 · 세션 메모리 {cart.nbytes():,} bytes"
+                           + (f" · 코드가 {MAX_CART_PARAM:,}자를 넘어 주소에는 넣지 않습니다" if len(token) > MAX_CART_PARAM else ""))
+
+            # --- 칼로리 초과 시 동영상 표시 (그램을 고치면 바로 반영되도록 장바구니와 함께 다시 그림) ---
+            if total_nutrients['에너지(kcal)'] > 2500:
+                st.subheader("오늘 섭취 칼로리가 높네요! 가벼운 운동은 어떠신가요? 💪")
+                st.video("https://www.youtube.com/watch?v=DCAp0b16kyo")
+        else:
+            st.warning("음식을 선택하고 '장바구니에 추가' 버튼을 눌러주세요.")
+        # 이번 실행이 끝난 상태를 URL 에 (새로고침해도 장바구니와 필터가 그대로). 너무 긴 코드는 주소에 싣지 않음
+        publish({**filters, 'cart': token if token and len(token) <= MAX_CART_PARAM else None})
+
+    cart_section()
+
+    def import_cart():
+        token = st.session_state.cart_import_widget.strip()
+        try:
+            st.session_state.cart = Cart.from_token(token, store.key_index, live=store.live)
+            clear_gram_inputs()
+            if st.session_state.cart.dropped:
+                st.toast(f"코드에 있던 음식 중 {st.session_state.cart.dropped}개는 데이터에 없어 뺐습니다.")
+                st.session_state.cart.dropped = 0
+        except ValueError as exc:
+            st.toast(f"장바구니를 불러오지 못했습니다: {exc}")
+        st.session_state.cart_import_widget = ''
+    st.text_input("공유받은 장바구니 코드", key='cart_import_widget', on_change=import_cart, placeholder="코드를 붙여넣고 Enter")
+
+    # --- 식단 기록 및 보고서 (작업 스레드에서 파일을 만들고, 내려받을 때 디스크의 파일을 읽음) ---
+    if 'saved_carts' not in st.session_state: st.session_state.saved_carts = {}
+    def save_cart():
+        # 세션에는 장바구니 바이트열만 보관 (식품 키라서 데이터를 다시 열어도 같은 음식으로 복원됨)
+        saved = st.session_state.saved_carts
+        name = st.session_state.save_cart_name.strip() or f"식단 {len(saved) + 1}"
+        if name == '평균':
+            st.toast("'평균' 은 보고서의 요약 행 이름이라 쓸 수 없습니다.")
+            return
+        saved[name] = st.session_state.cart.to_bytes(store.food_keys)
+        st.session_state.save_cart_name = ''
+
+    @st.fragment(run_every=0.5)
+    def poll_report():
+        # 보고서가 완성될 때까지 이 부분만 주기적으로 다시 그림
+        job = st.session_state.report_job
+        if job.done():
+            st.rerun()
+        st.progress(job.progress(), text=f"보고서를 만드는 중입니다... (앞에 대기 중인 작업 {queued()}개)")
+
+    # 식단 저장, 형식 선택, 보고서 만들기는 이 부분만 다시 실행하고, 장바구니 그램을 고칠 때도 다시 그리지 않음
+    @st.fragment
+    def report_section():
+        with st.expander("📄 식단 기록 · 보고서"):
+            saved = st.session_state.saved_carts
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.text_input("식단 이름", key='save_cart_name', label_visibility="collapsed",
+                              placeholder=f"식단 이름 (예: 월요일, 비우면 '식단 {len(saved) + 1}')")
+            with col2:
+                st.button("현재 장바구니 저장", key='save_cart_button', on_click=save_cart, disabled=not st.session_state.cart)
+            if saved:
+                st.caption(' · '.join(f"{name} ({Cart.count(data)}개)" for name, data in saved.items())
+                           + f" · 세션 메모리 {sum(map(len, saved.values())):,} bytes")
+            report_names = st.multiselect("보고서에 넣을 식단", list(saved), key='report_carts',
+                                          placeholder="비우면 저장한 식단 전체") or list(saved)
+            formats = available_formats()
+            report_format = st.radio("형식", formats, format_func=lambda fmt: FORMATS[fmt][0], horizontal=True, key='report_format')
+            missing = [f"{label} ({package} 설치 필요)" for fmt, (label, _, package) in FORMATS.items() if fmt not in formats]
+            if missing:
+                st.caption("사용할 수 없는 형식: " + ', '.join(missing))
+
+            job = st.session_state.get('report_job')
+            if st.button("보고서 만들기", key='report_run', disabled=not report_names or (job is not None and not job.done())):
+                # 작업 중에 저장 목록이 바뀌어도 영향이 없도록 바이트열에서 새 배열로 복원해 넘김
+                carts = []
+                for name in report_names:
+                    # 저장한 뒤 데이터 갱신으로 삭제된 음식은 빼고, 남은 음식이 없으면 식단째 뺌
+                    saved_cart = Cart.from_bytes(saved[name], store.key_index, live=store.live)
+                    if not saved_cart:
+                        st.warning(f"'{name}' 식단의 음식이 모두 데이터에서 삭제되어 보고서에서 뺐습니다.")
+                        continue
+                    if saved_cart.dropped:
+                        st.warning(f"'{name}' 식단에서 데이터에서 삭제된 음식 {saved_cart.dropped}개를 빼고 넣었습니다.")
+                    carts.append((name, saved_cart.ids, saved_cart.grams))
+                if carts:
+                    targets = {'에너지(kcal)': get_recommended_calories() or 2000, **RECOMMENDED_INTAKE}
+                    job = st.session_state.report_job = submit_report(store, carts, targets, report_format)
+
+            if job is not None:
+                if not job.done():
+                    poll_report()
+                elif job.future.exception() is not None:
+                    st.error(f"보고서를 만들지 못했습니다: {job.future.exception()}")
+                elif job.expired():
+                    st.info("보고서 보관 시간이 지났습니다. 다시 만들어 주세요.")
+                else:
+                    st.caption(f"{job.file_name} · {job.nbytes / 1024:,.1f} KB · {job.seconds * 1000:,.0f} ms")
+                    st.download_button("보고서 내려받기", data=job.read, file_name=job.file_name, mime=job.mime,
+                                       on_click='ignore', key='report_download')
+
+    report_section()
+
+perf.finish(perf_run)
@@ -2,103 +2,175 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
+from core import perf
+from core.basis import BASES
+from core.cache import cached_result
+from core.data import load_store, select_basis
+from core.figures import cached_figure
+from core.query import publish, restore
+from core.store import NUTRIENT_INDEX
+
 # --- 상수 및 설정 ---
 NUTRIENT_COLS_FOR_COMPARE = [
     '에너지(kcal)', '탄수화물(g)', '단백질(g)', '지방(g)', '당류(g)', '나트륨(mg)',
     '콜레스테롤(mg)', '포화지방산(g)', '식이섬유(g)'
 ]
+COMPARE_INDEX = [NUTRIENT_INDEX[col] for col in NUTRIENT_COLS_FOR_COMPARE]
+
+# 음식 선택 위젯에 한 번에 보내는 최대 옵션 수
+MAX_FOOD_OPTIONS = 200
+# 비슷한 음식 / 대체 음식 추천 개수
+SIMILAR_K = 10
+SIMILAR_TABLE_COLS = ['식품명', '식품기원명', '식품대분류명', '에너지(kcal)']
+
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('5_음식_vs_음식_비교')
 
 # --- 데이터 로드 ---
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('food.csv', encoding='euc-kr')
-        df.columns = df.columns.str.strip()
-        required_cols = ['식품대분류명', '식품중분류명', '식품소분류명', '식품명'] + NUTRIENT_COLS_FOR_COMPARE
-        for col in required_cols:
-            if col in df.columns:
-                if col in NUTRIENT_COLS_FOR_COMPARE:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            else:
-                st.error(f"'{col}' 컬럼을 food.csv 파일에서 찾을 수 없습니다.")
-                return pd.DataFrame()
-        return df[required_cols]
-    except FileNotFoundError:
-        st.error("food.csv 파일을 찾을 수 없습니다.")
-        return pd.DataFrame()
-
-food_df = load_data()
+with perf.stage('데이터 로드'):
+    store = load_store()
+if store is not None:
+    # 사이드바에서 고른 영양성분 기준으로 환산한 보기
+    store = select_basis(store)
 
 # --- 메인 앱 ---
-if not food_df.empty:
+if store is not None and store.n_rows:
     st.header("🎯 음식 vs 음식 비교 분석기")
-    st.info("필터를 이용해 두 가지 음식을 선택하여 영양성분(100g 기준)을 비교해 보세요.")
-
+    st.info(f"필터를 이용해 두 가지 음식을 선택하여 영양성분({BASES[store.basis]})을 비교해 보세요.")
+
+    # '전체' 는 카테고리 트리에서 None(필터 없음) 으로 조회
+    tree = store.category_tree
+    # 위젯은 식품 ID(행 번호) 를 값으로 쓰고 화면에는 구분 가능한 이름을 표시
+    food_labels = store.food_labels
+
+    def food_param(text):
+        # URL 에는 식품 ID 대신 데이터를 다시 열어도 바뀌지 않는 식품 키를 씀. 살아 있는 식품만 받음 (아니면 restore 가 무시)
+        food_id = store.key_index.get(text)
+        if food_id is None or not store.live[food_id]:
+            raise ValueError(text)
+        return food_id
+
+    # 공유한 링크(?food1=&food2=) 로 열면 고른 두 음식을 바로 복원
+    restore('food1_select', 'food1', parse=food_param)
+    restore('food2_select', 'food2', parse=food_param)
     col1, col2 = st.columns(2)
 
     # --- 음식 1 선택 UI ---
     with col1:
         st.subheader("음식 1")
-        dae1_options = ['전체'] + food_df['식품대분류명'].unique().tolist()
+        dae1_options = ['전체'] + tree.options(())
         dae1 = st.selectbox('대분류', dae1_options, key='dae1')
         
-        df1_filtered = food_df[food_df['식품대분류명'] == dae1] if dae1 != '전체' else food_df
-        joong1_options = ['전체'] + df1_filtered['식품중분류명'].unique().tolist()
+        path1 = (dae1 if dae1 != '전체' else None,)
+        joong1_options = ['전체'] + tree.options(path1)
         joong1 = st.selectbox('중분류', joong1_options, key='joong1')
 
-        df1_filtered = df1_filtered[df1_filtered['식품중분류명'] == joong1] if joong1 != '전체' else df1_filtered
-        so1_options = ['전체'] + df1_filtered['식품소분류명'].unique().tolist()
+        path1 += (joong1 if joong1 != '전체' else None,)
+        so1_options = ['전체'] + tree.options(path1)
         so1 = st.selectbox('소분류', so1_options, key='so1')
 
-        df1_filtered = df1_filtered[df1_filtered['식품소분류명'] == so1] if so1 != '전체' else df1_filtered
-        
-        food1_list = df1_filtered['식품명'].unique().tolist()
-        food1_name = st.selectbox("**음식 선택**", options=food1_list, index=None, placeholder="첫 번째 음식을 선택하세요.", key='food1_select')
+        path1 += (so1 if so1 != '전체' else None,)
+        search1 = st.text_input('음식 이름 검색', key='search1', placeholder="예: 김치찌개, ㄱㅊㅉㄱ")
+        food1_ids, _ = store.search.ids(search1, rows=tree.rows(path1), limit=MAX_FOOD_OPTIONS)
+        if st.session_state.get('food1_select') is not None and st.session_state.food1_select not in food1_ids:
+            food1_ids.insert(0, st.session_state.food1_select)
+        food1_id = st.selectbox("**음식 선택**", options=food1_ids, format_func=food_labels.__getitem__, index=None, placeholder="첫 번째 음식을 선택하세요.", key='food1_select')
 
     # --- 음식 2 선택 UI ---
     with col2:
         st.subheader("음식 2")
-        dae2_options = ['전체'] + food_df['식품대분류명'].unique().tolist()
+        dae2_options = ['전체'] + tree.options(())
         dae2 = st.selectbox('대분류', dae2_options, key='dae2')
 
-        df2_filtered = food_df[food_df['식품대분류명'] == dae2] if dae2 != '전체' else food_df
-        joong2_options = ['전체'] + df2_filtered['식품중분류명'].unique().tolist()
+        path2 = (dae2 if dae2 != '전체' else None,)
+        joong2_options = ['전체'] + tree.options(path2)
         joong2 = st.selectbox('중분류', joong2_options, key='joong2')
 
-        df2_filtered = df2_filtered[df2_filtered['식품중분류명'] == joong2] if joong2 != '전체' else df2_filtered
-        so2_options = ['전체'] + df2_filtered['식품소분류명'].unique().tolist()
+        path2 += (joong2 if joong2 != '전체' else None,)
+        so2_options = ['전체'] + tree.options(path2)
         so2 = st.selectbox('소분류', so2_options, key='so2')
 
-        df2_filtered = df2_filtered[df2_filtered['식품소분류명'] == so2] if so2 != '전체' else df2_filtered
+        path2 += (so2 if so2 != '전체' else None,)
+        search2 = st.text_input('음식 이름 검색', key='search2', placeholder="예: 김치찌개, ㄱㅊㅉㄱ")
+        food2_ids, _ = store.search.ids(search2, rows=tree.rows(path2), limit=MAX_FOOD_OPTIONS)
+        if st.session_state.get('food2_select') is not None and st.session_state.food2_select not in food2_ids:
+            food2_ids.insert(0, st.session_state.food2_select)
+        food2_id = st.selectbox("**음식 선택**", options=food2_ids, format_func=food_labels.__getitem__, index=None, placeholder="두 번째 음식을 선택하세요.", key='food2_select')
 
-        food2_list = df2_filtered['식품명'].unique().tolist()
-        food2_name = st.selectbox("**음식 선택**", options=food2_list, index=None, placeholder="두 번째 음식을 선택하세요.", key='food2_select')
+    query = publish({param: None if food_id is None else store.food_keys[food_id]
+                     for param, food_id in (('food1', food1_id), ('food2', food2_id))})
 
     # --- 비교 분석 ---
-    if food1_name and food2_name:
-        food1_data = food_df[food_df['식품명'] == food1_name].iloc[0]
-        food2_data = food_df[food_df['식품명'] == food2_name].iloc[0]
+    if food1_id is not None and food2_id is not None:
+        # 두 행만 결측을 0 으로 채운 행렬에서 꺼냄
+        food1_data = pd.Series(store.nutrient_matrix[food1_id, COMPARE_INDEX], index=NUTRIENT_COLS_FOR_COMPARE)
+        food2_data = pd.Series(store.nutrient_matrix[food2_id, COMPARE_INDEX], index=NUTRIENT_COLS_FOR_COMPARE)
+        food1_name, food2_name = food_labels[food1_id], food_labels[food2_id]
+        unconvertible = [food_labels[food_id] for food_id in (food1_id, food2_id) if not store.convertible[food_id]]
+        if unconvertible:
+            st.warning(f"{', '.join(unconvertible)} 은(는) 영양성분함량기준량 또는 식품중량 단위가 달라 "
+                       f"'{store.basis}' 기준으로 환산할 수 없어 0 으로 표시됩니다.")
 
         st.subheader("📊 영양성분 비교표")
-        compare_df = pd.DataFrame({
-            '영양성분': NUTRIENT_COLS_FOR_COMPARE,
-            food1_name: food1_data[NUTRIENT_COLS_FOR_COMPARE].values,
-            food2_name: food2_data[NUTRIENT_COLS_FOR_COMPARE].values
-        }).set_index('영양성분')
+        # 같은 두 음식의 비교표는 모든 세션이 공유
+        with perf.stage('비교표'):
+            compare_df = cached_result('5_음식_vs_음식_비교', query, store, lambda: pd.DataFrame({
+                '영양성분': NUTRIENT_COLS_FOR_COMPARE,
+                food1_name: food1_data[NUTRIENT_COLS_FOR_COMPARE].values,
+                food2_name: food2_data[NUTRIENT_COLS_FOR_COMPARE].values
+            }).set_index('영양성분').astype('float64').round(2))
         st.dataframe(compare_df)
 
         st.subheader("📈 영양성분 비교 그래프")
-        fig = go.Figure()
-        fig.add_trace(go.Bar(y=[col.split('(')[0] for col in NUTRIENT_COLS_FOR_COMPARE], x=food1_data[NUTRIENT_COLS_FOR_COMPARE], name=food1_name, orientation='h'))
-        fig.add_trace(go.Bar(y=[col.split('(')[0] for col in NUTRIENT_COLS_FOR_COMPARE], x=food2_data[NUTRIENT_COLS_FOR_COMPARE], name=food2_name, orientation='h'))
-        fig.update_layout(
-            title=f"'{food1_name}' vs '{food2_name}' 영양성분 비교",
-            yaxis_title="영양성분",
-            xaxis_title="함량 (단위는 표 참고)",
-            barmode='group',
-            yaxis={'categoryorder':'total ascending'}
-        )
-        st.plotly_chart(fig)
-
-    elif food1_name or food2_name:
+        def build_figure():
+            fig = go.Figure()
+            fig.add_trace(go.Bar(y=[col.split('(')[0] for col in NUTRIENT_COLS_FOR_COMPARE], x=food1_data[NUTRIENT_COLS_FOR_COMPARE], name=food1_name, orientation='h'))
+            fig.add_trace(go.Bar(y=[col.split('(')[0] for col in NUTRIENT_COLS_FOR_COMPARE], x=food2_data[NUTRIENT_COLS_FOR_COMPARE], name=food2_name, orientation='h'))
+            fig.update_layout(
+                title=f"'{food1_name}' vs '{food2_name}' 영양성분 비교",
+                yaxis_title="영양성분",
+                xaxis_title="함량 (단위는 표 참고)",
+                barmode='group',
+                yaxis={'categoryorder':'total ascending'}
+            )
+            return fig
+
+        # 같은 두 음식을 다시 비교하면 이전 그래프를 재사용
+        with perf.stage('그래프 생성'):
+            fig = cached_figure('5_음식_vs_음식_비교', (food1_id, food2_id), store, build_figure)
+        with perf.stage('그래프 전송'):
+            st.plotly_chart(fig)
+
+    elif food1_id is not None or food2_id is not None:
         st.warning("비교를 위해 두 가지 음식을 모두 선택해주세요.")
+
+    # --- 비슷한 음식 추천 ---
+    base_ids = [food_id for food_id in (food1_id, food2_id) if food_id is not None]
+    if base_ids:
+        st.subheader("🔎 이런 음식은 어떠세요?")
+        base_id = st.radio('기준 음식', base_ids, format_func=food_labels.__getitem__, horizontal=True, key='similar_base')
+        in_category = st.toggle('해당 음식을 고른 카테고리 안에서만 찾기', key='similar_in_category')
+        # 표준화한 영양성분 벡터의 코사인 유사도 (로드 시점에 만든 행렬로 바로 계산)
+        scope = tree.rows(path1 if base_id == food1_id else path2) if in_category else None
+        similar_tab, lighter_tab = st.tabs(["비슷한 영양 구성", "더 가벼운 대체 음식"])
+        with perf.stage('비슷한 음식'):
+            with similar_tab:
+                rows, scores = store.similar.neighbors(base_id, k=SIMILAR_K, rows=scope)
+                similar_df = store.take(rows, SIMILAR_TABLE_COLS)
+                similar_df['유사도'] = scores.astype('float64').round(3)
+                st.dataframe(similar_df, hide_index=True)
+            with lighter_tab:
+                # 유사도 인덱스는 기준 보기끼리 공유하므로 칼로리 비교는 현재 기준의 값으로
+                rows, scores = store.similar.substitutes(base_id, k=SIMILAR_K, rows=scope,
+                                                         kcal=store.column('에너지(kcal)'))
+                if len(rows):
+                    lighter_df = store.take(rows, SIMILAR_TABLE_COLS)
+                    lighter_df['칼로리 차이'] = (lighter_df['에너지(kcal)'] - float(store.column('에너지(kcal)')[base_id])).round(1)
+                    lighter_df['구성비 유사도'] = scores.astype('float64').round(3)
+                    st.dataframe(lighter_df, hide_index=True)
+                else:
+                    st.info("탄수화물·단백질·지방 구성이 비슷하면서 칼로리가 더 낮은 음식을 찾지 못했습니다."
+                            if store.convertible[base_id] else
+                            f"기준 음식을 '{store.basis}' 기준으로 환산할 수 없어 대체 음식을 찾지 못했습니다.")
+
+perf.finish(perf_run)
@@ -2,10 +2,15 @@ import streamlit as st
 from datetime import datetime
 from streamlit_drawable_canvas import st_canvas
 
+from core import perf
+
 methods = [ "신용카드", "계좌이체", "카카오페이", "네이버페이", "휴대폰결제" ]
 
 st.set_page_config(page_title="결제 정보 확인", page_icon="💳")
 
+# 성능 계측 (?perf=1 또는 FOOD_PERF=1 일 때만)
+perf_run = perf.start('6_결제 _페이지')
+
 st.title("💳 결제 정보 확인 페이지")
 
 # 결제 정보 입력 폼
@@ -41,4 +46,6 @@ with st.form("payment_form"):
 # 결과 표시
 if submitted:
    st.success("✅ 결제 정보가 저장되었습니다.")
-   st.toast('저장되었습니다', duration="short")
\ No newline at end of file
+   st.toast('저장되었습니다', duration="short")
+
+perf.finish(perf_run)